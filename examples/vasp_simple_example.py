@@ -13,34 +13,21 @@ import sys
 # 添加项目路径
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from vasp_robot.workflow_simple import run_vasp_calculation
-from vasp_robot.config_manager import get_config, get_hpc_config
 from vasp_robot.errors import handle_errors, ErrorCategory, ConfigError
 
 
 async def main():
     """主函数示例"""
+    # 工作流程依赖完整的SSH/LLM栈，仅在运行时导入
+    from vasp_robot.workflow_simple import run_vasp_calculation, run_vasp_batch
+    from vasp_robot.config_manager import get_hpc_config
+
     print("🚀 VASP简化工作流程示例")
     print("=" * 50)
 
-    # 1. 简单的SCF计算
+    # 1+2. 简单的SCF计算与带自定义参数的结构优化（并发运行）
     print("\n1️⃣ 运行简单的SCF计算")
-    result = await run_vasp_calculation(
-        user_input="计算SiC的自洽场能量",
-        material="SiC",
-        calc_type="scf",
-        submit_to_hpc=False
-    )
-
-    if result.status == "success":
-        print(f"✅ 作业创建成功: {result.job_id}")
-        print(f"📁 本地目录: {result.local_dir}")
-        print(f"📄 生成文件: {', '.join(result.files_created)}")
-    else:
-        print(f"❌ 失败: {result.message}")
-
-    # 2. 带自定义参数的结构优化
-    print("\n2️⃣ 带自定义参数的结构优化")
+    print("2️⃣ 带自定义参数的结构优化")
     custom_params = {
         "incar": {
             "ENCUT": 600,
@@ -52,16 +39,31 @@ async def main():
         }
     }
 
-    result = await run_vasp_calculation(
-        user_input="优化石墨烯的几何结构",
-        material="graphene",
-        calc_type="relax",
-        submit_to_hpc=False,
-        custom_params=custom_params
-    )
-
-    if result.status == "success":
-        print(f"✅ 作业创建成功: {result.job_id}")
+    results = await run_vasp_batch([
+        {
+            "user_input": "计算SiC的自洽场能量",
+            "material": "SiC",
+            "calc_type": "scf",
+            "submit_to_hpc": False
+        },
+        {
+            "user_input": "优化石墨烯的几何结构",
+            "material": "graphene",
+            "calc_type": "relax",
+            "submit_to_hpc": False,
+            "custom_params": custom_params
+        }
+    ], concurrency=8)
+
+    for result in results:
+        if isinstance(result, BaseException):
+            print(f"❌ 失败: {result}")
+        elif result.status == "success":
+            print(f"✅ 作业创建成功: {result.job_id}")
+            print(f"📁 本地目录: {result.local_dir}")
+            print(f"📄 生成文件: {', '.join(result.files_created)}")
+        else:
+            print(f"❌ 失败: {result.message}")
 
     # 3. 提交到HPC（如果配置了）
     print("\n3️⃣ 提交到HPC计算")
@@ -93,6 +95,8 @@ def check_configuration():
     """检查配置示例"""
     print("\n🔍 检查配置...")
 
+    from vasp_robot.config_manager import get_config, get_hpc_config, get_api_config
+
     # 检查基本配置
     incar_defaults = get_config("base.defaults.incar", {})
     if incar_defaults:
@@ -108,7 +112,6 @@ def check_configuration():
         print(f"⚠️ HPC配置错误: {e}")
 
     # 检查API配置
-    from vasp_robot.config_manager import get_api_config
     api_config = get_api_config("kimi")
     if api_config:
         print("✅ Kimi API配置已找到")
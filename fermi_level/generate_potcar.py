@@ -4,11 +4,226 @@ POTCAR生成器 - 解决POTCAR缺失问题
 根据子代理专家建议，创建健壮的POTCAR生成逻辑
 """
 
+import asyncio
 import os
+import re
 import sys
+import json
+import shutil
 import subprocess
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Dict, Optional
+from typing import Callable, List, Dict, Optional, Tuple
+
+try:  # 可选依赖：pyahocorasick，元素较多时单次扫描文件名
+    import ahocorasick
+except ImportError:  # pragma: no cover - 未安装时回退到线性扫描
+    ahocorasick = None
+
+# 默认需要发现的元素
+DEFAULT_ELEMENTS: Tuple[str, ...] = ("Si", "C", "H")
+
+# POTCAR拼接时的拷贝块大小，以及校验时读取的首尾样本大小
+COPY_BUFFER_SIZE = 1 << 20
+SAMPLE_SIZE = 4096
+VALIDATE_CHUNK_SIZE = 1 << 16
+
+# ASCII小写->大写转换表，POTCAR为纯ASCII内容，bytes.translate比upper()更快
+_TO_UPPER = bytes.maketrans(bytes(range(0x61, 0x7b)), bytes(range(0x41, 0x5b)))
+
+# POTCAR必须包含的固定标识符（大写形式）
+_REQUIRED_KEYWORDS: Tuple[bytes, ...] = (b"PAW_PBE", b"TITEL", b"END OF DATASET")
+
+# POTCAR文件名关键字评分：PBE > PAW > PV > SV
+_KEYWORD_SCORES: Dict[str, int] = {"PBE": 40, "PAW": 30, "PV": 20, "SV": 10}
+_KEYWORD_RE = re.compile("|".join(_KEYWORD_SCORES))
+
+# 赝势目录索引的磁盘缓存：记录树中每个目录的st_mtime_ns和每个POTCAR的st_mtime，
+# 任一目录增删文件或任一文件被改写都会使索引失效
+POTCAR_INDEX_CACHE = Path(os.path.expanduser("~/.cache/vasp_robot/potcar_index.json"))
+POTCAR_INDEX_VERSION = 4
+
+# 进程内的索引副本（赝势目录 -> 索引条目），每次使用前仍按stat校验，只省去JSON解析
+_INDEX_MEMO: Dict[str, dict] = {}
+
+
+def _load_index_cache() -> Dict[str, dict]:
+    """读取磁盘上的赝势索引缓存"""
+    try:
+        with open(POTCAR_INDEX_CACHE, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index_cache(cache: Dict[str, dict]) -> None:
+    """写入赝势索引缓存，失败时静默忽略"""
+    try:
+        POTCAR_INDEX_CACHE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = POTCAR_INDEX_CACHE.with_suffix(".tmp")
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f)
+        os.replace(tmp_path, POTCAR_INDEX_CACHE)
+    except OSError:
+        pass
+
+
+def _scan_files(potcar_dir: str, dir_mtimes: Optional[Dict[str, int]] = None):
+    """基于os.scandir的递归遍历，产出 (文件名, DirEntry)
+
+    传入 dir_mtimes 时一并记录遍历到的每个目录的 st_mtime_ns。
+    """
+    stack = [potcar_dir]
+    while stack:
+        directory = stack.pop()
+        try:
+            if dir_mtimes is not None:
+                dir_mtimes[directory] = os.stat(directory).st_mtime_ns
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file():
+                        yield entry.name, entry
+        except OSError:
+            continue
+
+
+def _index_is_current(entry: dict, elements: Tuple[str, ...]) -> bool:
+    """按记录的目录和文件stat校验索引条目是否仍与磁盘一致"""
+    if entry.get("version") != POTCAR_INDEX_VERSION:
+        return False
+    indexed = entry.get("elements", {})
+    if not all(element in indexed for element in elements):
+        return False
+    try:
+        for directory, mtime_ns in entry.get("dirs", {}).items():
+            if os.stat(directory).st_mtime_ns != mtime_ns:
+                return False
+        for element in elements:
+            for path, mtime in indexed[element].items():
+                if os.stat(path).st_mtime != mtime:
+                    return False
+    except OSError:
+        return False
+    return True
+
+
+@lru_cache(maxsize=None)
+def _element_matcher(elements: Tuple[str, ...]) -> Callable[[str], List[str]]:
+    """构建文件名 -> 匹配元素列表 的匹配器（输入为大写文件名）
+
+    安装了 pyahocorasick 时使用 Aho–Corasick 自动机，一次扫描即可匹配所有元素；
+    否则逐个元素做子串判断。
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for element in elements:
+            upper = element.upper()
+            automaton.add_word(upper, automaton.get(upper, ()) + (element,))
+        automaton.make_automaton()
+
+        def match(name: str) -> List[str]:
+            found = set()
+            for _, matched in automaton.iter(name):
+                found.update(matched)
+            return [element for element in elements if element in found]
+
+        return match
+
+    elements_upper = [(element, element.upper()) for element in elements]
+
+    def match(name: str) -> List[str]:
+        return [element for element, element_upper in elements_upper if element_upper in name]
+
+    return match
+
+
+def _index_potcar_dir(
+    potcar_dir: str, elements: Tuple[str, ...] = DEFAULT_ELEMENTS
+) -> Dict[str, Dict[str, float]]:
+    """对赝势目录只遍历一次，按元素归类POTCAR文件
+
+    返回 {元素: {文件路径: mtime}}，mtime在遍历时一并记录，选择文件时无需再次stat。
+    索引会持久化到 POTCAR_INDEX_CACHE；复用前逐个stat记录的子目录和POTCAR文件，
+    目录树中任何增删或改写都会触发重新遍历。
+    """
+    entry = _INDEX_MEMO.get(potcar_dir)
+    if entry is None:
+        entry = _load_index_cache().get(potcar_dir)
+    if entry and _index_is_current(entry, elements):
+        _INDEX_MEMO[potcar_dir] = entry
+        return {element: entry["elements"][element] for element in elements}
+
+    match_elements = _element_matcher(elements)
+    buckets: Dict[str, Dict[str, float]] = {element: {} for element in elements}
+    dir_mtimes: Dict[str, int] = {}
+    for file, dir_entry in _scan_files(potcar_dir, dir_mtimes):
+        name = file.upper()
+        if "POTCAR" not in name:
+            continue
+        matched = match_elements(name)
+        if not matched:
+            continue
+        try:
+            mtime = dir_entry.stat().st_mtime
+        except OSError:
+            mtime = 0.0
+        for element in matched:
+            buckets[element][dir_entry.path] = mtime
+
+    entry = {"version": POTCAR_INDEX_VERSION, "dirs": dir_mtimes, "elements": buckets}
+    _INDEX_MEMO[potcar_dir] = entry
+    cache = _load_index_cache()
+    cache[potcar_dir] = entry
+    _save_index_cache(cache)
+    return buckets
+
+
+@lru_cache(maxsize=None)
+def _keyword_pattern(element: str) -> Tuple["re.Pattern[bytes]", frozenset]:
+    """为元素构建一次性扫描所有关键字的正则（元素放在最后，固定标识符优先匹配）
+
+    正则匹配的是经 _TO_UPPER 转换后的大写内容。
+    """
+    required = _REQUIRED_KEYWORDS + (element.upper().encode(),)
+    pattern = re.compile(b"|".join(re.escape(keyword) for keyword in required))
+    return pattern, frozenset(required)
+
+
+def _read_potcar_sample(infile) -> bytes:
+    """读取POTCAR的首尾片段用于校验（标识符位于文件头，End of Dataset位于文件尾）"""
+    head = infile.read(SAMPLE_SIZE)
+    size = os.fstat(infile.fileno()).st_size
+    if size <= len(head):
+        return head
+    infile.seek(max(len(head), size - SAMPLE_SIZE))
+    return head + infile.read()
+
+
+def _copy_stream(infile, outfile) -> None:
+    """将infile完整追加到outfile，Linux下优先使用os.sendfile在内核态拷贝"""
+    infile.seek(0)
+    outfile.flush()
+    try:
+        in_fd, out_fd = infile.fileno(), outfile.fileno()
+        size = os.fstat(in_fd).st_size
+        offset = 0
+        while offset < size:
+            sent = os.sendfile(out_fd, in_fd, offset, size - offset)
+            if sent == 0:
+                break
+            offset += sent
+        # sendfile不会移动输出文件对象的位置，手动同步
+        outfile.seek(0, os.SEEK_END)
+        if offset == size:
+            return
+        infile.seek(offset)
+    except (AttributeError, OSError):
+        infile.seek(0)
+    shutil.copyfileobj(infile, outfile, COPY_BUFFER_SIZE)
+
 
 class POTCARGenerator:
     """VASP POTCAR文件生成器，包含完整的错误处理和验证"""
@@ -33,42 +248,44 @@ class POTCARGenerator:
     def discover_potentials(self, potcar_dir: str) -> Dict[str, str]:
         """发现可用的POTCAR文件"""
         potentials = {}
-        for element in ["Si", "C", "H"]:
-            element_files = []
-            for root, dirs, files in os.walk(potcar_dir):
-                for file in files:
-                    if element in file.upper() and "POTCAR" in file.upper():
-                        element_files.append(os.path.join(root, file))
+        index = _index_potcar_dir(potcar_dir, DEFAULT_ELEMENTS)
+        for element in DEFAULT_ELEMENTS:
+            element_files = index[element]
 
             if element_files:
                 # 选择最合适的POTCAR文件
-                potentials[element] = self.select_best_potcar(element_files, element)
+                potentials[element] = self.select_best_potcar(
+                    list(element_files), element, mtimes=element_files
+                )
                 print(f"✓ {element} POTCAR: {potentials[element]}")
             else:
                 print(f"✗ 未找到{element}的POTCAR文件")
 
         return potentials
 
-    def select_best_potcar(self, files: List[str], element: str) -> str:
-        """选择最佳的POTCAR文件"""
+    def select_best_potcar(
+        self, files: List[str], element: str, mtimes: Optional[Dict[str, float]] = None
+    ) -> str:
+        """选择最佳的POTCAR文件
+
+        mtimes 为遍历目录时已获得的修改时间，缺失时才回退到 os.path.getmtime。
+        """
         # 优先级：PBE > PAW > 最新版本 > 推荐版本
-        priority_keywords = ["PBE", "PAW", "PV", "SV"]
+        mtimes = mtimes or {}
 
         scored_files = []
         for file in files:
-            score = 0
             filename = os.path.basename(file).upper()
-
-            for i, keyword in enumerate(priority_keywords):
-                if keyword in filename:
-                    score += (len(priority_keywords) - i) * 10
+            score = sum(_KEYWORD_SCORES[keyword] for keyword in set(_KEYWORD_RE.findall(filename)))
 
             # 优先选择较新的文件
-            try:
-                mtime = os.path.getmtime(file)
-                score += mtime / 1e10  # 将时间戳转换为小数分数
-            except:
-                pass
+            mtime = mtimes.get(file)
+            if mtime is None:
+                try:
+                    mtime = os.path.getmtime(file)
+                except OSError:
+                    mtime = 0.0
+            score += mtime / 1e10  # 将时间戳转换为小数分数
 
             scored_files.append((score, file))
 
@@ -97,21 +314,20 @@ class POTCARGenerator:
 
         # 4. 生成POTCAR文件
         try:
-            with open(output_file, 'w') as outfile:
+            with open(output_file, 'wb') as outfile:
                 for element in elements:
                     potcar_file = potentials[element]
                     print(f"  📝 添加 {element} POTCAR: {potcar_file}")
 
-                    with open(potcar_file, 'r') as infile:
-                        content = infile.read()
+                    with open(potcar_file, 'rb') as infile:
+                        # 验证POTCAR文件格式（只读取首尾片段）
+                        if not self.validate_potcar_content(_read_potcar_sample(infile), element):
+                            print(f"❌ {element} POTCAR文件格式无效")
+                            return False
 
-                    # 验证POTCAR文件格式
-                    if not self.validate_potcar_content(content, element):
-                        print(f"❌ {element} POTCAR文件格式无效")
-                        return False
+                        _copy_stream(infile, outfile)
 
-                    outfile.write(content)
-                    outfile.write("\n")  # 添加分隔符
+                    outfile.write(b"\n")  # 添加分隔符
 
             print(f"✅ POTCAR文件生成成功: {output_file}")
 
@@ -127,46 +343,58 @@ class POTCARGenerator:
             print(f"❌ 生成POTCAR文件时出错: {str(e)}")
             return False
 
-    def validate_potcar_content(self, content: str, element: str) -> bool:
-        """验证POTCAR文件内容的正确性"""
-        # 检查关键标识符
-        required_keywords = [
-            "PAW_PBE",
-            element.upper(),
-            "TITEL",
-            "End of Dataset"
-        ]
+    async def generate_potcar_async(self, elements: List[str], output_file: str = "POTCAR") -> bool:
+        """在线程池中生成POTCAR，避免在异步工作流中阻塞事件循环"""
+        return await asyncio.to_thread(self.generate_potcar, elements, output_file)
 
-        content_upper = content.upper()
-        for keyword in required_keywords:
-            if keyword not in content_upper:
-                print(f"❌ POTCAR文件缺少关键字: {keyword}")
-                return False
+    def validate_potcar_content(self, content: bytes, element: str) -> bool:
+        """验证POTCAR文件内容的正确性"""
+        # 单次扫描检查关键标识符
+        pattern, required = _keyword_pattern(element)
+        found = set(pattern.findall(content.translate(_TO_UPPER)))
+        missing = required - found
+        if missing:
+            print(f"❌ POTCAR文件缺少关键字: {', '.join(sorted(k.decode() for k in missing))}")
+            return False
 
         return True
 
     def validate_generated_potcar(self, filename: str, elements: List[str]) -> bool:
-        """验证生成的POTCAR文件"""
+        """验证生成的POTCAR文件（分块流式读取，不整体载入内存）"""
+        marker = b"PAW_PBE"
+        # 保留上一块末尾的字节，避免跨块边界的匹配丢失（元素符号不长于marker）
+        overlap = len(marker) - 1
+        pending = {element: element.upper().encode() for element in elements}
+
         try:
-            with open(filename, 'r') as f:
-                content = f.read()
+            total_size = 0
+            element_count = 0
+            tail = b""
+            with open(filename, 'rb') as f:
+                while chunk := f.read(VALIDATE_CHUNK_SIZE):
+                    total_size += len(chunk)
+                    window = tail + chunk
+                    element_count += window.count(marker)
+                    if pending:
+                        window_upper = window.translate(_TO_UPPER)
+                        for element in [e for e, symbol in pending.items() if symbol in window_upper]:
+                            del pending[element]
+                    tail = window[-overlap:]
 
             # 检查文件大小
-            if len(content) < 1000:  # POTCAR文件应该很大
+            if total_size < 1000:  # POTCAR文件应该很大
                 print("❌ POTCAR文件太小，可能生成不完整")
                 return False
 
             # 检查元素数量
-            element_count = content.count("PAW_PBE")
             if element_count != len(elements):
                 print(f"❌ POTCAR元素数量不匹配，期望{len(elements)}，实际{element_count}")
                 return False
 
             # 检查每个元素是否存在
-            for element in elements:
-                if element.upper() not in content.upper():
-                    print(f"❌ POTCAR中未找到元素: {element}")
-                    return False
+            for element in pending:
+                print(f"❌ POTCAR中未找到元素: {element}")
+                return False
 
             return True
 
@@ -4,13 +4,39 @@
 基于子代理专家建议，提供类型安全的数据结构
 """
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Union, Tuple, Literal
+from collections import defaultdict
+from dataclasses import InitVar, dataclass, field
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Union, Tuple, Literal
 from enum import Enum
 from pathlib import Path
 import re
+import time
 from datetime import datetime
 
+# 计算ID格式校验（预编译，避免每次构造时查询正则缓存）
+_CALC_ID_RE = re.compile(r"[A-Za-z0-9_-]+\Z")
+
+
+def _require_positive(*checks: Tuple[str, float]) -> None:
+    """校验 (名称, 数值) 均为正数，失败时抛出 ValueError("<名称>必须为正数")"""
+    for name, value in checks:
+        if value <= 0:
+            raise ValueError(f"{name}必须为正数")
+
+
+def _to_ns(moment: datetime) -> int:
+    """datetime -> 纳秒时间戳（精确到微秒）"""
+    return round(moment.timestamp() * 1_000_000) * 1000
+
+
+def _created_at_property() -> property:
+    """created_at 的只读视图：由 created_at_ns 转换而来"""
+    def created_at(self) -> datetime:
+        """创建时间（本地时区）"""
+        return datetime.fromtimestamp(self.created_at_ns / 1e9)
+    return property(created_at)
+
 # =============================================================================
 # 枚举类型定义
 # =============================================================================
@@ -35,6 +61,11 @@ class JobState(Enum):
     TIMEOUT = "TIMEOUT"
     PREEMPTED = "PREEMPTED"
 
+# 作业终止状态集合（模块级常量，避免每次判断时重建集合）
+_TERMINAL_STATES: frozenset = frozenset({
+    JobState.COMPLETED, JobState.FAILED, JobState.CANCELLED, JobState.TIMEOUT
+})
+
 class SmearingMethod(Enum):
     """Smearing方法枚举"""
     GAUSSIAN = "gaussian"
@@ -47,7 +78,7 @@ class SmearingMethod(Enum):
 # 值对象 - 不可变的数据容器
 # =============================================================================
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class ConvergenceCriteria:
     """收敛标准值对象"""
     energy_threshold: float = field(metadata={"description": "能量收敛阈值 (eV)"})
@@ -58,18 +89,18 @@ class ConvergenceCriteria:
 
     def __post_init__(self):
         # 验证收敛标准的合理性
-        if self.energy_threshold <= 0:
-            raise ValueError("能量收敛阈值必须为正数")
-        if self.force_threshold <= 0:
-            raise ValueError("力收敛阈值必须为正数")
+        _require_positive(
+            ("能量收敛阈值", self.energy_threshold),
+            ("力收敛阈值", self.force_threshold),
+        )
         if self.stress_threshold < 0:
             raise ValueError("应力阈值不能为负数")
-        if self.electronic_steps <= 0:
-            raise ValueError("电子步数必须为正数")
-        if self.ionic_steps <= 0:
-            raise ValueError("离子步数必须为正数")
+        _require_positive(
+            ("电子步数", self.electronic_steps),
+            ("离子步数", self.ionic_steps),
+        )
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class KPointsConfig:
     """K点配置值对象"""
     mode: Literal["Monkhorst-Pack", "Gamma", "Line-mode", "Reciprocal"]
@@ -83,7 +114,7 @@ class KPointsConfig:
         if self.grid and any(g <= 0 for g in self.grid):
             raise ValueError("k点网格必须为正数")
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class VASPElectronicConfig:
     """VASP电子结构配置"""
     smearing_method: SmearingMethod
@@ -95,14 +126,13 @@ class VASPElectronicConfig:
     kpar: int = 1
 
     def __post_init__(self):
-        if self.smearing_width <= 0:
-            raise ValueError("Smearing宽度必须为正数")
-        if self.energy_cutoff <= 0:
-            raise ValueError("能量截断必须为正数")
-        if self.nedos <= 0:
-            raise ValueError("NEDOS必须为正数")
-
-@dataclass(frozen=True)
+        _require_positive(
+            ("Smearing宽度", self.smearing_width),
+            ("能量截断", self.energy_cutoff),
+            ("NEDOS", self.nedos),
+        )
+
+@dataclass(frozen=True, slots=True)
 class SurfaceConfig:
     """表面配置值对象"""
     miller_indices: Tuple[int, int, int]
@@ -115,8 +145,7 @@ class SurfaceConfig:
     def __post_init__(self):
         if any(index == 0 for index in self.miller_indices):
             raise ValueError("米勒指数不能为0")
-        if self.layers <= 0:
-            raise ValueError("表面层数必须为正数")
+        _require_positive(("表面层数", self.layers))
         if self.vacuum_thickness <= 10:
             raise ValueError("真空层厚度应≥10Å")
 
@@ -124,7 +153,7 @@ class SurfaceConfig:
 # 领域模型 - 核心业务概念
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class MaterialSystem:
     """材料系统领域模型"""
     name: str
@@ -141,7 +170,7 @@ class MaterialSystem:
         if len(self.elements) != len(set(self.elements)):
             raise ValueError("元素列表不能重复")
 
-@dataclass
+@dataclass(slots=True)
 class VASPCalculation:
     """VASP计算领域模型"""
     calculation_id: str
@@ -151,14 +180,23 @@ class VASPCalculation:
     kpoints_config: KPointsConfig
     convergence_criteria: ConvergenceCriteria
     surface_config: Optional[SurfaceConfig] = None
-    created_at: datetime = field(default_factory=datetime.now)
+    # 创建时间以纳秒时间戳存储，仅在读取 created_at 时转换为datetime；
+    # 构造参数 created_at 仍可传入datetime，与旧接口兼容
+    created_at: InitVar[Optional[datetime]] = None
+    created_at_ns: int = field(default_factory=time.time_ns, kw_only=True)
 
-    def __post_init__(self):
+    def __post_init__(self, created_at: Optional[datetime]):
         # 验证计算ID格式
-        if not re.match(r'^[a-zA-Z0-9_-]+$', self.calculation_id):
+        if not _CALC_ID_RE.match(self.calculation_id):
             raise ValueError("计算ID格式无效")
+        if created_at is not None:
+            self.created_at_ns = _to_ns(created_at)
+
 
-@dataclass
+# 覆盖 InitVar 留下的类属性默认值，实例上读取 created_at 得到datetime
+VASPCalculation.created_at = _created_at_property()
+
+@dataclass(slots=True)
 class HPCResources:
     """HPC资源配置领域模型"""
     partition: str
@@ -168,14 +206,13 @@ class HPCResources:
     memory_per_node_gb: Optional[float] = None
 
     def __post_init__(self):
-        if self.nodes <= 0:
-            raise ValueError("节点数必须为正数")
-        if self.ntasks_per_node <= 0:
-            raise ValueError("每节点任务数必须为正数")
-        if self.walltime_minutes <= 0:
-            raise ValueError("运行时间必须为正数")
-
-@dataclass
+        _require_positive(
+            ("节点数", self.nodes),
+            ("每节点任务数", self.ntasks_per_node),
+            ("运行时间", self.walltime_minutes),
+        )
+
+@dataclass(slots=True)
 class HPCJob:
     """HPC作业领域模型"""
     job_id: str
@@ -200,7 +237,7 @@ class HPCJob:
     @property
     def is_completed(self) -> bool:
         """检查作业是否已完成"""
-        return self.status in {JobState.COMPLETED, JobState.FAILED, JobState.CANCELLED, JobState.TIMEOUT}
+        return self.status in _TERMINAL_STATES
 
     @property
     def duration(self) -> Optional[float]:
@@ -213,42 +250,86 @@ class HPCJob:
 # 聚合根 - 管理相关对象的完整性
 # =============================================================================
 
-@dataclass
+@dataclass(slots=True)
 class VASPWorkflow:
     """VASP工作流聚合根"""
     workflow_id: str
     research_title: str
     calculations: List[VASPCalculation] = field(default_factory=list)
     hpc_jobs: List[HPCJob] = field(default_factory=list)
-    created_at: datetime = field(default_factory=datetime.now)
+    created_at: InitVar[Optional[datetime]] = None
+    created_at_ns: int = field(default_factory=time.time_ns, kw_only=True)
+    # 计算ID索引，保证去重与作业校验为O(1)
+    _calc_ids: Set[str] = field(default_factory=set, init=False, repr=False, compare=False)
+    # 按计算类型建立的索引
+    _by_type: Dict[CalculationType, List[VASPCalculation]] = field(
+        default_factory=lambda: defaultdict(list), init=False, repr=False, compare=False
+    )
+
+    def __post_init__(self, created_at: Optional[datetime]):
+        if created_at is not None:
+            self.created_at_ns = _to_ns(created_at)
+        for calc in self.calculations:
+            self._calc_ids.add(calc.calculation_id)
+            self._by_type[calc.calculation_type].append(calc)
 
     def add_calculation(self, calculation: VASPCalculation) -> None:
         """添加计算到工作流"""
         # 验证计算与工作流的一致性
-        if calculation in self.calculations:
+        if calculation.calculation_id in self._calc_ids:
             raise ValueError("计算已存在于工作流中")
+        self._calc_ids.add(calculation.calculation_id)
         self.calculations.append(calculation)
+        self._by_type[calculation.calculation_type].append(calculation)
 
     def add_hpc_job(self, job: HPCJob) -> None:
         """添加HPC作业到工作流"""
         # 验证作业与工作流中计算的一致性
-        calculation_ids = [calc.calculation_id for calc in self.calculations]
-        if job.calculation.calculation_id not in calculation_ids:
+        if job.calculation.calculation_id not in self._calc_ids:
             raise ValueError("作业对应的计算不在工作流中")
         self.hpc_jobs.append(job)
 
     def get_active_jobs(self) -> List[HPCJob]:
         """获取活跃的HPC作业"""
-        return [job for job in self.hpc_jobs if not job.is_completed]
+        terminal = _TERMINAL_STATES
+        return [job for job in self.hpc_jobs if job.status not in terminal]
 
     def get_calculations_by_type(self, calc_type: CalculationType) -> List[VASPCalculation]:
         """按类型获取计算"""
-        return [calc for calc in self.calculations if calc.calculation_type == calc_type]
+        # 返回副本，调用方修改结果不影响索引
+        return list(self._by_type.get(calc_type, ()))
+
+
+VASPWorkflow.created_at = _created_at_property()
 
 # =============================================================================
 # 工厂类 - 创建领域对象
 # =============================================================================
 
+# 不可变配置对象可以安全共享，按参数缓存以免扫描时重复构造和校验
+@lru_cache(maxsize=128)
+def _monkhorst_pack_config(grid: Tuple[int, int, int]) -> KPointsConfig:
+    return KPointsConfig(mode="Monkhorst-Pack", grid=grid)
+
+
+@lru_cache(maxsize=128)
+def _fermi_dirac_config(energy_cutoff: float) -> VASPElectronicConfig:
+    return VASPElectronicConfig(
+        smearing_method=SmearingMethod.FERMI_DIRAC,
+        smearing_width=0.05,
+        energy_cutoff=energy_cutoff
+    )
+
+
+@lru_cache(maxsize=128)
+def _relaxation_criteria(energy_threshold: float) -> ConvergenceCriteria:
+    return ConvergenceCriteria(
+        energy_threshold=energy_threshold,
+        force_threshold=0.015,
+        stress_threshold=0.1
+    )
+
+
 class VASPCalculationFactory:
     """VASP计算工厂类"""
 
@@ -260,22 +341,9 @@ class VASPCalculationFactory:
         energy_cutoff: float = 600.0
     ) -> VASPCalculation:
         """创建块体优化计算"""
-        kpoints_config = KPointsConfig(
-            mode="Monkhorst-Pack",
-            grid=(kpoints_density, kpoints_density, kpoints_density)
-        )
-
-        electronic_config = VASPElectronicConfig(
-            smearing_method=SmearingMethod.FERMI_DIRAC,
-            smearing_width=0.05,
-            energy_cutoff=energy_cutoff
-        )
-
-        convergence_criteria = ConvergenceCriteria(
-            energy_threshold=1e-6,
-            force_threshold=0.015,
-            stress_threshold=0.1
-        )
+        kpoints_config = _monkhorst_pack_config((kpoints_density, kpoints_density, kpoints_density))
+        electronic_config = _fermi_dirac_config(energy_cutoff)
+        convergence_criteria = _relaxation_criteria(1e-6)
 
         return VASPCalculation(
             calculation_id=calc_id,
@@ -294,22 +362,9 @@ class VASPCalculationFactory:
         kpoints_density: int = 8
     ) -> VASPCalculation:
         """创建表面弛豫计算"""
-        kpoints_config = KPointsConfig(
-            mode="Monkhorst-Pack",
-            grid=(kpoints_density, kpoints_density, 1)
-        )
-
-        electronic_config = VASPElectronicConfig(
-            smearing_method=SmearingMethod.FERMI_DIRAC,
-            smearing_width=0.05,
-            energy_cutoff=600.0
-        )
-
-        convergence_criteria = ConvergenceCriteria(
-            energy_threshold=1e-5,
-            force_threshold=0.015,
-            stress_threshold=0.1
-        )
+        kpoints_config = _monkhorst_pack_config((kpoints_density, kpoints_density, 1))
+        electronic_config = _fermi_dirac_config(600.0)
+        convergence_criteria = _relaxation_criteria(1e-5)
 
         return VASPCalculation(
             calculation_id=calc_id,
@@ -325,7 +380,8 @@ class VASPCalculationFactory:
 # 使用示例
 # =============================================================================
 
-if __name__ == "__main__":
+def _demo() -> None:
+    """类型系统使用示例"""
     # 创建材料系统
     si_c_bulk = MaterialSystem(
         name="3C-SiC Bulk",
@@ -369,4 +425,8 @@ if __name__ == "__main__":
     print(f"计算数量: {len(workflow.calculations)}")
     print(f"块体计算: {bulk_calc.calculation_type.value}")
     print(f"表面计算: {surface_calc.calculation_type.value}")
-    print(f"表面配置: {surface_calc.surface_config.miller_indices} {surface_calc.surface_config.layers}层")
\ No newline at end of file
+    print(f"表面配置: {surface_calc.surface_config.miller_indices} {surface_calc.surface_config.layers}层")
+
+
+if __name__ == "__main__":
+    _demo()
@@ -9,11 +9,11 @@ import asyncio
 from pathlib import Path
 from dotenv import load_dotenv
 
-from src.vasp_robot import create_vasp_agent
-
 
 async def main():
     """Main entry point for the VASP orchestrator agent"""
+    # Deferred so importing this module does not load the whole agent stack
+    from src.vasp_robot import create_vasp_agent
 
     # Load environment variables
     load_dotenv()
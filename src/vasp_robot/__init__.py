@@ -1,29 +1,54 @@
-"""Unified package exposing the VASP robot building blocks."""
-
-from .conversation import ConversationManager
-from .hpc_automation import HPCAutomation
-from .hpc_interface import HPCConfig, HPCInterface
-from .orchestrator import (
-    JobSpec,
-    PreparationArtifact,
-    VASPOrchestrator,
-    VaspAgent,
-    create_vasp_agent,
-)
-from .settings import Settings, get_settings
-from .subagents import ClaudeSubagentManager
-
-__all__ = [
-    "ConversationManager",
-    "HPCAutomation",
-    "HPCConfig",
-    "HPCInterface",
-    "JobSpec",
-    "PreparationArtifact",
-    "VASPOrchestrator",
-    "VaspAgent",
-    "create_vasp_agent",
-    "Settings",
-    "get_settings",
-    "ClaudeSubagentManager",
-]
+"""Unified package exposing the VASP robot building blocks.
+
+Submodules are imported on first attribute access (PEP 562), so importing the
+package does not pull in paramiko or openai until they are actually needed.
+"""
+
+from importlib import import_module
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:  # pragma: no cover - static analysers see the eager imports
+    from .conversation import ConversationManager
+    from .hpc_automation import HPCAutomation
+    from .hpc_interface import HPCConfig, HPCInterface
+    from .llm_cache import LLMCache
+    from .orchestrator import (
+        JobSpec,
+        PreparationArtifact,
+        VASPOrchestrator,
+        VaspAgent,
+        create_vasp_agent,
+    )
+    from .settings import Settings, get_settings
+    from .subagents import ClaudeSubagentManager
+
+_LAZY_EXPORTS = {
+    "ConversationManager": ".conversation",
+    "HPCAutomation": ".hpc_automation",
+    "HPCConfig": ".hpc_interface",
+    "HPCInterface": ".hpc_interface",
+    "LLMCache": ".llm_cache",
+    "JobSpec": ".orchestrator",
+    "PreparationArtifact": ".orchestrator",
+    "VASPOrchestrator": ".orchestrator",
+    "VaspAgent": ".orchestrator",
+    "create_vasp_agent": ".orchestrator",
+    "Settings": ".settings",
+    "get_settings": ".settings",
+    "ClaudeSubagentManager": ".subagents",
+}
+
+__all__ = list(_LAZY_EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    module_name = _LAZY_EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module(module_name, __name__), name)
+    globals()[name] = value  # cache so later lookups skip __getattr__
+    return value
+
+
+def __dir__() -> list:
+    return sorted(set(globals()) | set(__all__))
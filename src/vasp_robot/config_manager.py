@@ -5,14 +5,37 @@ Unified Configuration Manager
 合并所有配置加载逻辑，减少重复代码
 """
 
+import copy
+import hashlib
+import json
 import os
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional, Union
+from typing import Dict, Any, Optional, Tuple, Union
 from dataclasses import dataclass
 
+try:  # libyaml的C加载器比纯Python解析快数倍，不可用时回退
+    from yaml import CSafeLoader as _SafeLoader
+except ImportError:
+    from yaml import SafeLoader as _SafeLoader
 
-@dataclass
+
+# YAML解析结果缓存，键为 (路径, st_mtime_ns)，文件修改后自动失效；
+# 各 ConfigManager 拿到的是深拷贝，修改自己的配置不会污染缓存或其他实例
+_yaml_cache: Dict[Tuple[str, int], Any] = {}
+
+# 查找缓存中表示"键不存在"的哨兵
+_MISSING = object()
+
+# 跨进程的磁盘缓存：按 (路径, mtime) 保存解析结果的JSON，启动时免去YAML解析。
+# 用JSON而不是pickle：缓存文件被篡改也只会得到错误的数据，不会执行代码；
+# 无法与JSON无损互转的结果（日期、非字符串键等）不写入磁盘
+YAML_JSON_CACHE_DIR = Path(os.path.expanduser("~/.cache/vasp_robot/yaml"))
+
+
+@dataclass(slots=True)
 class HPCConfig:
     """HPC配置"""
     host: str
@@ -23,7 +46,7 @@ class HPCConfig:
     strict_host_key: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class APIConfig:
     """API配置"""
     base_url: str
@@ -38,6 +61,13 @@ class ConfigManager:
         """初始化配置管理器"""
         self.config_dir = Path(config_dir)
         self._cache: Dict[str, Any] = {}
+        # 环境变量快照，避免每次查询都经过 os.environ 的编解码；reload() 时刷新
+        self._env: Dict[str, str] = dict(os.environ)
+        # 点号路径 -> 值 的扁平索引（含中间层字典），get() 只需一次哈希查找
+        self._flat: Dict[str, Any] = {}
+        # 已构建的配置对象缓存，reload() 时清空
+        self._hpc_config: Optional[HPCConfig] = None
+        self._api_configs: Dict[str, Optional[APIConfig]] = {}
         self._load_all_configs()
 
     def _load_all_configs(self):
@@ -51,10 +81,34 @@ class ConfigManager:
             "subagents": "claude_subagents.yaml"
         }
 
-        # 加载每个配置文件
-        for key, filename in config_files.items():
-            file_path = self.config_dir / filename
-            self._cache[key] = self._load_yaml(file_path, {})
+        items = [(key, self.config_dir / filename) for key, filename in config_files.items()]
+        for _, file_path in items:
+            _advise_willneed(file_path)
+
+        def load(item: Tuple[str, Path]) -> Tuple[str, Any]:
+            key, file_path = item
+            # 密钥文件不写入磁盘缓存，避免在缓存目录留下副本
+            return key, self._load_yaml(file_path, {}, persist=key != "secrets")
+
+        # 并发加载各配置文件，冷缓存时让磁盘读取相互重叠
+        with ThreadPoolExecutor(max_workers=len(items)) as pool:
+            self._cache.update(pool.map(load, items))
+
+        self._flat = {}
+        self._flatten("", self._cache, self._flat)
+
+    @classmethod
+    def _flatten(cls, prefix: str, node: Dict[str, Any], flat: Dict[str, Any]) -> None:
+        """把嵌套字典展开为点号路径索引，中间层字典也保留以支持子树访问"""
+        for key, value in node.items():
+            # 非字符串或自带点号的键无法通过点号路径访问，与逐层查找保持一致
+            if not isinstance(key, str) or "." in key:
+                continue
+            path = prefix + key
+            if prefix:
+                flat[path] = value
+            if isinstance(value, dict):
+                cls._flatten(path + ".", value, flat)
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -69,35 +123,28 @@ class ConfigManager:
         """
         # 尝试从缓存获取
         if "." in key:
-            # 处理嵌套键
-            parts = key.split(".")
-            value = self._cache
-
-            for part in parts:
-                if isinstance(value, dict) and part in value:
-                    value = value[part]
-                else:
-                    return default
-
-            return value
+            # 嵌套键：直接查扁平索引
+            return self._flat.get(key, default)
         else:
             # 直接键
             return self._cache.get(key, default)
 
     def get_hpc_config(self) -> HPCConfig:
-        """获取HPC配置"""
-        # 从workflow配置中读取
-        workflow = self.get("workflow", {})
-        hpc_env = workflow.get("hpc_environment", {})
-        cluster = hpc_env.get("cluster", {})
-
+        """获取HPC配置（构建一次后复用）"""
+        if self._hpc_config is None:
+            self._hpc_config = self._build_hpc_config()
+        return self._hpc_config
+
+    def _build_hpc_config(self) -> HPCConfig:
+        # 从workflow配置中读取，每个字段一次扁平索引查找
+        flat = self._flat
         return HPCConfig(
-            host=cluster.get("host", "localhost"),
-            user=cluster.get("user", ""),
-            port=cluster.get("port", 22),
-            work_dir=cluster.get("work_dir", "~/vasp_calculations"),
-            timeout=hpc_env.get("connection", {}).get("timeout", 30),
-            strict_host_key=hpc_env.get("connection", {}).get("strict_host_key_checking", False)
+            host=flat.get("workflow.hpc_environment.cluster.host", "localhost"),
+            user=flat.get("workflow.hpc_environment.cluster.user", ""),
+            port=flat.get("workflow.hpc_environment.cluster.port", 22),
+            work_dir=flat.get("workflow.hpc_environment.cluster.work_dir", "~/vasp_calculations"),
+            timeout=flat.get("workflow.hpc_environment.connection.timeout", 30),
+            strict_host_key=flat.get("workflow.hpc_environment.connection.strict_host_key_checking", False)
         )
 
     def get_api_config(self, service: str) -> Optional[APIConfig]:
@@ -110,15 +157,21 @@ class ConfigManager:
         Returns:
             API配置对象
         """
+        config = self._api_configs.get(service, _MISSING)
+        if config is _MISSING:
+            config = self._api_configs[service] = self._build_api_config(service)
+        return config
+
+    def _build_api_config(self, service: str) -> Optional[APIConfig]:
         # 优先从环境变量获取
         env_key = f"{service.upper()}_API_KEY"
-        api_key = os.getenv(env_key)
+        api_key = self._env.get(env_key)
 
         if api_key:
             return APIConfig(
-                base_url=os.getenv(f"{service.upper()}_BASE_URL", ""),
+                base_url=self._env.get(f"{service.upper()}_BASE_URL", ""),
                 api_key=api_key,
-                model=os.getenv(f"{service.upper()}_MODEL", "")
+                model=self._env.get(f"{service.upper()}_MODEL", "")
             )
 
         # 从配置文件获取
@@ -147,32 +200,53 @@ class ConfigManager:
 
     def get_incar_defaults(self) -> Dict[str, Any]:
         """获取INCAR默认参数"""
-        base = self.get("base", {})
-        defaults = base.get("defaults", {})
-        return defaults.get("incar", {})
+        return self._flat.get("base.defaults.incar", {})
 
     def get_prompt(self, name: str) -> str:
         """获取系统提示词"""
-        prompts = self.get("prompts", {})
-        return prompts.get(name, "")
+        if "." in name:  # 带点号的键不在扁平索引中
+            return self.get("prompts", {}).get(name, "")
+        return self._flat.get(f"prompts.{name}", "")
 
     def reload(self):
         """重新加载配置"""
         self._cache.clear()
+        self._flat.clear()
+        self._env = dict(os.environ)
+        self._hpc_config = None
+        self._api_configs.clear()
         self._load_all_configs()
+        if self is _config_manager:
+            _clear_lookup_caches()
 
-    def _load_yaml(self, path: Path, default: Any) -> Any:
-        """加载YAML文件"""
-        if not path.exists():
-            return default
+    def _load_yaml(self, path: Path, default: Any, persist: bool = True) -> Any:
+        """加载YAML文件（按修改时间缓存解析结果，persist时同时使用磁盘JSON缓存）
 
+        返回解析结果的深拷贝，调用方可以自由修改。
+        """
         try:
-            with open(path, 'r', encoding='utf-8') as f:
-                return yaml.safe_load(f) or default
-        except Exception as e:
-            print(f"⚠️ 加载配置文件失败 {path}: {e}")
+            mtime_ns = path.stat().st_mtime_ns
+        except OSError:
             return default
 
+        cache_key = (str(path.resolve()), mtime_ns)
+        data = _yaml_cache.get(cache_key, _MISSING)
+        if data is _MISSING:
+            json_path = _json_cache_path(cache_key) if persist else None
+            data = _load_json_cache(json_path) if json_path else _MISSING
+            if data is _MISSING:
+                try:
+                    # 一次性读入整个文件再解析，避免解析器逐块调用read()
+                    data = yaml.load(path.read_bytes(), Loader=_SafeLoader)
+                except Exception as e:
+                    print(f"⚠️ 加载配置文件失败 {path}: {e}")
+                    return default
+                if json_path:
+                    _save_json_cache(json_path, data)
+            _yaml_cache[cache_key] = data
+
+        return copy.deepcopy(data) if data else default
+
     def merge_configs(self, *config_names: str) -> Dict[str, Any]:
         """
         合并多个配置
@@ -191,18 +265,73 @@ class ConfigManager:
         return merged
 
     def _deep_merge(self, dict1: Dict, dict2: Dict) -> Dict:
-        """深度合并字典"""
+        """深度合并字典（迭代实现，只复制两侧都存在的子字典，其余子树按引用共享）"""
         result = dict1.copy()
-
-        for key, value in dict2.items():
-            if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                result[key] = self._deep_merge(result[key], value)
-            else:
-                result[key] = value
+        stack = [(result, dict2)]
+
+        while stack:
+            target, source = stack.pop()
+            for key, value in source.items():
+                current = target.get(key)
+                if isinstance(current, dict) and isinstance(value, dict):
+                    # 两侧都是字典：复制一层后继续合并，保证不修改输入
+                    merged = current.copy()
+                    target[key] = merged
+                    stack.append((merged, value))
+                else:
+                    target[key] = value
 
         return result
 
 
+def _advise_willneed(path: Path) -> None:
+    """提示内核预读整个文件（仅支持posix_fadvise的平台）"""
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _json_cache_path(cache_key: Tuple[str, int]) -> Path:
+    """磁盘缓存文件路径，文件名由 路径:mtime 的哈希构成"""
+    digest = hashlib.blake2b(f"{cache_key[0]}:{cache_key[1]}".encode(), digest_size=16).hexdigest()
+    return YAML_JSON_CACHE_DIR / f"{digest}.json"
+
+
+def _load_json_cache(json_path: Path) -> Any:
+    """读取磁盘缓存，不存在或损坏时返回 _MISSING"""
+    try:
+        with open(json_path, 'rb') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return _MISSING
+
+
+def _save_json_cache(json_path: Path, data: Any) -> None:
+    """原子写入磁盘缓存；结果无法与JSON无损互转或写入失败时静默跳过"""
+    try:
+        text = json.dumps(data, ensure_ascii=False, allow_nan=False)
+    except (TypeError, ValueError):
+        return
+    if json.loads(text) != data:  # 例如 {1: ...} 会变成 {"1": ...}
+        return
+    try:
+        json_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = json_path.with_suffix(f".{os.getpid()}.tmp")
+        tmp_path.write_text(text, encoding='utf-8')
+        os.replace(tmp_path, json_path)
+    except OSError:
+        pass
+
+
 # 全局配置管理器实例
 _config_manager: Optional[ConfigManager] = None
 
@@ -215,16 +344,41 @@ def get_config_manager(config_dir: str = "config") -> ConfigManager:
     return _config_manager
 
 
+# 便捷函数的查询结果缓存
+_config_values: Dict[str, Any] = {}
+
+
 def get_config(key: str, default: Any = None) -> Any:
-    """便捷函数：获取配置值"""
-    return get_config_manager().get(key, default)
+    """便捷函数：获取配置值（结果按键缓存）"""
+    value = _config_values.get(key, _MISSING)
+    if value is _MISSING:
+        value = get_config_manager().get(key, _MISSING)
+        _config_values[key] = value
+    return default if value is _MISSING else value
 
 
+@lru_cache(maxsize=None)
 def get_hpc_config() -> HPCConfig:
-    """便捷函数：获取HPC配置"""
+    """便捷函数：获取HPC配置（每个进程只构建一次）"""
     return get_config_manager().get_hpc_config()
 
 
+@lru_cache(maxsize=None)
 def get_api_config(service: str) -> Optional[APIConfig]:
-    """便捷函数：获取API配置"""
-    return get_config_manager().get_api_config(service)
\ No newline at end of file
+    """便捷函数：获取API配置（每个服务只构建一次）"""
+    return get_config_manager().get_api_config(service)
+
+
+def _clear_lookup_caches() -> None:
+    """清空便捷函数的查询缓存"""
+    _config_values.clear()
+    get_hpc_config.cache_clear()
+    get_api_config.cache_clear()
+
+
+def clear_config_cache() -> None:
+    """清空所有配置缓存并重新加载全局配置（主要用于测试）"""
+    _yaml_cache.clear()
+    _clear_lookup_caches()
+    if _config_manager is not None:
+        _config_manager.reload()
\ No newline at end of file
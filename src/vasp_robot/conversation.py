@@ -4,17 +4,51 @@
 
 import os
 import json
+import threading
 import time
-from datetime import datetime
-from typing import TYPE_CHECKING, Any, Dict, List, Optional
+from collections import deque
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional, Tuple
 from pathlib import Path
-import yaml
-from openai import OpenAI
+try:  # 可选依赖：orjson 序列化速度是标准库的数倍，原生输出UTF-8
+    import orjson
+except ImportError:
+    orjson = None
 
 if TYPE_CHECKING:  # pragma: no cover - used for type hints only
+    from openai import OpenAI
+
     from .settings import Settings
 
 
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """序列化为UTF-8字节串（等价于 ensure_ascii=False），默认输出紧凑单行"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+_loads = orjson.loads if orjson is not None else json.loads
+
+# 按 (api_key, base_url) 共享的OpenAI客户端：客户端不保存对话状态，各会话复用同一HTTP连接池
+_CLIENT_CACHE: Dict[Tuple[str, str], "OpenAI"] = {}
+_CLIENT_LOCK = threading.Lock()
+
+
+def _cached_tokens(usage: Any) -> Optional[int]:
+    """读取前缀缓存命中的token数（OpenAI: prompt_tokens_details.cached_tokens；Moonshot: cached_tokens）"""
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached = getattr(details, "cached_tokens", None) if details is not None else None
+    if cached is None:
+        cached = getattr(usage, "cached_tokens", None)
+    return cached
+
+
 class ConversationManager:
     """管理多轮对话和API调用记录"""
 
@@ -31,7 +65,11 @@ class ConversationManager:
         else:
             self.config = self._load_config(config_path)
             self._secrets = self._load_yaml_file(secrets_path)
-        self.messages: List[Dict[str, str]] = []
+        # 历史记录上限由 deque 的 maxlen 保证，追加时O(1)丢弃最旧的消息
+        self._max_history: Optional[int] = self.config.get("conversation", {}).get("max_history_messages")
+        self.messages: Deque[Dict[str, str]] = deque(maxlen=self._max_history)
+        # 与 messages 并行维护的API视图（不含时间戳），make_messages 直接复用
+        self._api_view: Deque[Dict[str, str]] = deque(maxlen=self._max_history)
         self.client: Optional[OpenAI] = None
         self._service_config = {}
         self._default_model = "kimi-k2-0905-preview"
@@ -45,6 +83,11 @@ class ConversationManager:
         # 设置持久化目录
         self.log_dir = Path("api_logs")
         self.log_dir.mkdir(exist_ok=True)
+        # 日志文件索引（日期 -> 文件列表）；查询前比较目录的 st_mtime_ns，
+        # 其他进程新建或删除日志文件后才重新扫描
+        self._log_index: Dict[str, List[Path]] = {}
+        self._log_dir_mtime_ns: Optional[int] = None
+        self._refresh_log_index()
 
         # 初始化API客户端
         self._init_api_client()
@@ -57,9 +100,13 @@ class ConversationManager:
         return self._get_default_config()
 
     def _load_yaml_file(self, path: str) -> Dict[str, Any]:
+        # 延迟导入：传入settings时无需解析YAML；libyaml的C加载器不可用时回退
+        import yaml
+        loader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
         try:
             with open(path, 'r', encoding='utf-8') as f:
-                loaded = yaml.safe_load(f) or {}
+                loaded = yaml.load(f, Loader=loader) or {}
                 return loaded if isinstance(loaded, dict) else {}
         except FileNotFoundError:
             return {}
@@ -99,7 +146,14 @@ class ConversationManager:
         if base_url:
             client_kwargs["base_url"] = base_url
 
-        self.client = OpenAI(**client_kwargs)
+        key = (api_key, base_url or "")
+        with _CLIENT_LOCK:
+            client = _CLIENT_CACHE.get(key)
+            if client is None:
+                from openai import OpenAI  # 延迟导入：openai 加载较慢，仅在真正创建客户端时导入
+
+                client = _CLIENT_CACHE[key] = OpenAI(**client_kwargs)
+        self.client = client
 
     def _resolve_api_key(self) -> Optional[str]:
         env_key = os.getenv("KIMI_API_KEY")
@@ -114,7 +168,8 @@ class ConversationManager:
                     return candidate
         return None
 
-    def make_messages(self, input_text: str, system_prompt: str = None, n: int = None) -> List[Dict[str, str]]:
+    def make_messages(self, input_text: str, system_prompt: str = None, n: int = None,
+                      now_iso: Optional[str] = None) -> List[Dict[str, str]]:
         """
         构建消息列表，支持多轮对话
 
@@ -122,6 +177,7 @@ class ConversationManager:
             input_text: 用户输入
             system_prompt: 系统提示词（可选）
             n: 最大历史消息数量
+            now_iso: 用户消息的时间戳（可选，由调用方复用已生成的时间戳）
 
         Returns:
             构建的消息列表
@@ -129,37 +185,56 @@ class ConversationManager:
         if n is None:
             n = self.config["conversation"]["max_history_messages"]
 
-        if system_prompt is None:
-            system_prompt = self.config["vasp_orchestrator_prompt"]
+        system_prompt = self.resolve_system_prompt(system_prompt)
 
         # 添加用户消息到历史记录
-        self.messages.append({
-            "role": "user",
-            "content": input_text,
-            "timestamp": datetime.now().isoformat()
-        })
+        self._append_message("user", input_text, now_iso)
 
-        # 构建新的消息列表
-        new_messages = []
+        # 如果历史消息超过限制，只保留最新的n条
+        # 调用方指定的 n 小于 maxlen 时，原地丢弃多余的旧消息
+        while len(self.messages) > n:
+            self.messages.popleft()
+            self._api_view.popleft()
+
+        # 系统消息 + 历史消息（API视图不包含内部时间戳）
+        # 固定的系统提示词必须位于最前且逐字节不变，服务端才能命中前缀缓存
+        return [{"role": "system", "content": system_prompt}, *self._api_view]
+
+    @property
+    def default_model(self) -> str:
+        """未指定 model 时使用的模型名称"""
+        return self._default_model
+
+    def resolve_system_prompt(self, system_prompt: Optional[str] = None) -> str:
+        """返回实际发送的系统提示词（未指定时使用配置中的默认提示词）"""
+        if system_prompt is None:
+            return self.config["vasp_orchestrator_prompt"]
+        return system_prompt
 
-        # 添加系统消息
-        new_messages.append({
-            "role": "system",
-            "content": system_prompt
-        })
+    def api_history(self) -> List[Dict[str, str]]:
+        """返回当前历史消息的API视图副本（不含系统提示词和时间戳）"""
+        return list(self._api_view)
 
-        # 如果历史消息超过限制，只保留最新的n条
-        if len(self.messages) > n:
-            self.messages = self.messages[-n:]
+    def record_exchange(self, input_text: str, response_text: str) -> None:
+        """把一轮对话追加到历史记录而不调用API（例如回复来自缓存时）"""
+        self._append_message("user", input_text)
+        self._append_message("assistant", response_text)
 
-        # 添加历史消息（不包含内部时间戳）
-        for msg in self.messages:
-            new_messages.append({
-                "role": msg["role"],
-                "content": msg["content"]
-            })
+    def _append_message(self, role: str, content: str, timestamp: Optional[str] = None) -> None:
+        """同时追加到带时间戳的历史记录和API视图"""
+        self.messages.append({
+            "role": role,
+            "content": content,
+            "timestamp": timestamp or datetime.now().isoformat()
+        })
+        self._api_view.append({"role": role, "content": content})
 
-        return new_messages
+    def _rebuild_api_view(self) -> None:
+        """根据 messages 重建API视图（整体替换历史记录后调用）"""
+        self._api_view = deque(
+            ({"role": msg["role"], "content": msg["content"]} for msg in self.messages),
+            maxlen=self._max_history,
+        )
 
     def chat(
         self,
@@ -188,12 +263,13 @@ class ConversationManager:
         if model is None:
             model = self._default_model
 
-        # 构建消息
-        messages = self.make_messages(input_text, system_prompt)
+        # 构建消息（用户消息与调用日志共用同一时间戳）
+        now_iso = datetime.now().isoformat()
+        messages = self.make_messages(input_text, system_prompt, now_iso=now_iso)
 
         # 准备API调用日志
         api_log = {
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": now_iso,
             "model": model,
             "temperature": temperature,
             "input": input_text,
@@ -218,6 +294,7 @@ class ConversationManager:
             api_log.update({
                 "response": response_text,
                 "prompt_tokens": usage.prompt_tokens if usage else None,
+                "cached_tokens": _cached_tokens(usage),
                 "completion_tokens": usage.completion_tokens if usage else None,
                 "total_tokens": usage.total_tokens if usage else None,
                 "response_time": time.time() - start_time,
@@ -225,11 +302,7 @@ class ConversationManager:
             })
 
             # 将助手回复添加到历史记录
-            self.messages.append({
-                "role": "assistant",
-                "content": response_text,
-                "timestamp": datetime.now().isoformat()
-            })
+            self._append_message("assistant", response_text)
 
             # 保存日志
             if self.config["persistence"]["enable_logging"]:
@@ -239,6 +312,7 @@ class ConversationManager:
                 "response": response_text,
                 "usage": {
                     "prompt_tokens": usage.prompt_tokens if usage else None,
+                    "cached_tokens": api_log["cached_tokens"],
                     "completion_tokens": usage.completion_tokens if usage else None,
                     "total_tokens": usage.total_tokens if usage else None
                 },
@@ -263,28 +337,44 @@ class ConversationManager:
                 "status": "error"
             }
 
+    def _refresh_log_index(self) -> None:
+        """日志目录有变化时重新扫描（原地更新，子会话共享同一索引）"""
+        try:
+            mtime_ns = self.log_dir.stat().st_mtime_ns
+        except OSError:
+            mtime_ns = None
+        if mtime_ns is not None and mtime_ns == self._log_dir_mtime_ns:
+            return
+        index = self._scan_log_dir()
+        self._log_index.clear()
+        self._log_index.update(index)
+        self._log_dir_mtime_ns = mtime_ns
+
+    def _scan_log_dir(self) -> Dict[str, List[Path]]:
+        """扫描日志目录，按文件名中的日期 api_calls_YYYYMMDD 建立索引"""
+        index: Dict[str, List[Path]] = {}
+        # .jsonl 为逐行记录，.json 为旧版整体数组
+        for pattern in ("api_calls_*.jsonl", "api_calls_*.json"):
+            for log_file in self.log_dir.glob(pattern):
+                file_day = log_file.stem[-8:]
+                if file_day.isdigit():
+                    index.setdefault(file_day, []).append(log_file)
+        return index
+
     def _save_api_log(self, log_data: Dict[str, Any]):
         """保存API调用日志"""
         try:
             timestamp = datetime.now()
-            log_filename = f"api_calls_{timestamp.strftime('%Y%m%d')}.json"
+            day = timestamp.strftime('%Y%m%d')
+            log_filename = f"api_calls_{day}.jsonl"
             log_path = self.log_dir / log_filename
+            day_files = self._log_index.setdefault(day, [])
+            if log_path not in day_files:
+                day_files.append(log_path)
 
-            # 读取现有日志
-            logs = []
-            if log_path.exists():
-                with open(log_path, 'r', encoding='utf-8') as f:
-                    try:
-                        logs = json.load(f)
-                    except json.JSONDecodeError:
-                        logs = []
-
-            # 添加新日志
-            logs.append(log_data)
-
-            # 保存日志
-            with open(log_path, 'w', encoding='utf-8') as f:
-                json.dump(logs, f, ensure_ascii=False, indent=2)
+            # JSON Lines 追加写入，每次调用只写一条记录，无需读回整个文件
+            with open(log_path, 'ab') as f:
+                f.write(_dumps(log_data) + b"\n")
 
         except Exception as e:
             print(f"保存API日志失败: {e}")
@@ -298,8 +388,8 @@ class ConversationManager:
         conversation_path = self.log_dir / filename
 
         try:
-            with open(conversation_path, 'w', encoding='utf-8') as f:
-                json.dump(self.messages, f, ensure_ascii=False, indent=2)
+            with open(conversation_path, 'wb') as f:
+                f.write(_dumps(list(self.messages), indent=True))
             print(f"对话已保存到: {conversation_path}")
         except Exception as e:
             print(f"保存对话失败: {e}")
@@ -309,16 +399,19 @@ class ConversationManager:
         conversation_path = self.log_dir / filename
 
         try:
-            with open(conversation_path, 'r', encoding='utf-8') as f:
-                self.messages = json.load(f)
+            with open(conversation_path, 'rb') as f:
+                self.messages = deque(_loads(f.read()), maxlen=self._max_history)
+            self._rebuild_api_view()
             print(f"对话已从 {conversation_path} 加载")
         except Exception as e:
             print(f"加载对话失败: {e}")
 
-    def clear_conversation(self):
-        """清空对话历史"""
-        self.messages = []
-        print("对话历史已清空")
+    def clear_conversation(self, verbose: bool = True):
+        """清空对话历史（verbose=False 时静默，供复用会话的子代理在每轮前重置）"""
+        self.messages.clear()
+        self._api_view.clear()
+        if verbose:
+            print("对话历史已清空")
 
     def spawn_child(self, keep_history: bool = False) -> "ConversationManager":
         """Create a lightweight child session sharing the same API client.
@@ -341,9 +434,13 @@ class ConversationManager:
 
         child = ConversationManager.__new__(ConversationManager)
         child.config = self.config
-        child.messages = list(self.messages) if keep_history else []
+        child._max_history = self._max_history
+        child.messages = deque(self.messages if keep_history else (), maxlen=self._max_history)
+        child._api_view = deque(self._api_view if keep_history else (), maxlen=self._max_history)
         child.client = self.client
         child.log_dir = self.log_dir
+        child._log_index = self._log_index
+        child._log_dir_mtime_ns = self._log_dir_mtime_ns
         child._secrets = self._secrets
         child._service_config = self._service_config
         child._default_model = self._default_model
@@ -354,13 +451,19 @@ class ConversationManager:
         if not self.messages:
             return {"total_messages": 0}
 
-        user_messages = [msg for msg in self.messages if msg["role"] == "user"]
-        assistant_messages = [msg for msg in self.messages if msg["role"] == "assistant"]
+        # 单次遍历统计各角色消息数
+        user_count = assistant_count = 0
+        for msg in self.messages:
+            role = msg["role"]
+            if role == "user":
+                user_count += 1
+            elif role == "assistant":
+                assistant_count += 1
 
         return {
             "total_messages": len(self.messages),
-            "user_messages": len(user_messages),
-            "assistant_messages": len(assistant_messages),
+            "user_messages": user_count,
+            "assistant_messages": assistant_count,
             "first_message_time": self.messages[0].get("timestamp"),
             "last_message_time": self.messages[-1].get("timestamp")
         }
@@ -368,24 +471,45 @@ class ConversationManager:
     def get_recent_logs(self, days: int = 1) -> List[Dict[str, Any]]:
         """获取最近的API调用日志"""
         recent_logs = []
-        cutoff_time = datetime.now().timestamp() - (days * 24 * 3600)
-
-        # 遍历日志文件
-        for log_file in self.log_dir.glob("api_calls_*.json"):
-            if log_file.stat().st_mtime < cutoff_time:
-                continue
-
-            try:
-                with open(log_file, 'r', encoding='utf-8') as f:
-                    logs = json.load(f)
-                    recent_logs.extend(logs)
-            except Exception:
-                continue
+        cutoff = datetime.now() - timedelta(days=days)
+        cutoff_day = cutoff.strftime("%Y%m%d")
+        # ISO-8601 时间戳按字典序即按时间排序，可直接比较字符串
+        cutoff_stamp = cutoff.isoformat()
+
+        # 按日期倒序遍历索引，早于截止日期即停止；目录未变化时无需重新扫描
+        self._refresh_log_index()
+        for file_day, log_files in sorted(self._log_index.items(), reverse=True):
+            if file_day < cutoff_day:
+                break
+
+            for log_file in log_files:
+                try:
+                    with open(log_file, 'rb') as f:
+                        if log_file.suffix == ".jsonl":
+                            entries = (_loads(line) for line in f if line.strip())
+                        else:
+                            entries = _loads(f.read())
+                        recent_logs.extend(
+                            log for log in entries if log.get("timestamp", "") >= cutoff_stamp
+                        )
+                except Exception:
+                    continue
 
         # 按时间排序
         recent_logs.sort(key=lambda x: x.get("timestamp", ""), reverse=True)
         return recent_logs
 
+    def pretty_print_logs(self, days: int = 1):
+        """以缩进格式打印最近的API调用日志（磁盘上仅保存紧凑的单行记录）"""
+        logs = self.get_recent_logs(days)
+
+        if not logs:
+            print(f"最近{days}天没有API调用记录")
+            return
+
+        for log in logs:
+            print(_dumps(log, indent=True).decode("utf-8"))
+
     def print_api_statistics(self, days: int = 1):
         """打印API使用统计"""
         logs = self.get_recent_logs(days)
@@ -394,13 +518,16 @@ class ConversationManager:
             print(f"最近{days}天没有API调用记录")
             return
 
+        # 单次遍历汇总成功次数、Token数和响应时间
         total_calls = len(logs)
-        successful_calls = len([log for log in logs if log.get("status") == "success"])
+        successful_calls = total_tokens = 0
+        total_time = 0.0
+        for log in logs:
+            successful_calls += log.get("status") == "success"
+            total_tokens += log.get("total_tokens") or 0
+            total_time += log.get("response_time", 0)
         failed_calls = total_calls - successful_calls
 
-        total_tokens = sum(log.get("total_tokens", 0) for log in logs if log.get("total_tokens"))
-        total_time = sum(log.get("response_time", 0) for log in logs)
-
         print(f"\n📊 API使用统计 (最近{days}天):")
         print(f"总调用次数: {total_calls}")
         print(f"成功次数: {successful_calls}")
@@ -6,6 +6,7 @@ Unified Error Handling Module
 """
 
 import sys
+import time
 from typing import Any, Optional, Type, Callable
 from functools import wraps
 from enum import Enum
@@ -23,7 +24,10 @@ class ErrorCategory(Enum):
 
 
 class VASPRobotError(Exception):
-    """VASP Robot基础异常类"""
+    """VASP Robot基础异常类
+
+    __str__ 的结果在首次调用后缓存；此后请勿再修改 message/details/cause。
+    """
 
     def __init__(
         self,
@@ -37,13 +41,17 @@ class VASPRobotError(Exception):
         self.category = category
         self.details = details or {}
         self.cause = cause
+        self._str_cache: Optional[str] = None
 
     def __str__(self) -> str:
+        if self._str_cache is not None:
+            return self._str_cache
         error_msg = f"[{self.category.value.upper()}] {self.message}"
         if self.details:
             error_msg += f"\nDetails: {self.details}"
         if self.cause:
             error_msg += f"\nCaused by: {str(self.cause)}"
+        self._str_cache = error_msg
         return error_msg
 
 
@@ -123,22 +131,26 @@ def handle_errors(
         def wrapper(*args, **kwargs):
             try:
                 return func(*args, **kwargs)
+            except VASPRobotError as e:
+                # 已是项目异常：原样传播，不再重新构造
+                if log_errors:
+                    print(f"❌ 错误: {e}", file=sys.stderr)
+                if reraise:
+                    raise
+                return default_return
             except Exception as e:
                 # 转换为相应的错误类别
-                if isinstance(e, VASPRobotError):
-                    error = e
-                else:
-                    error = VASPRobotError(
-                        message=str(e),
-                        category=category,
-                        cause=e
-                    )
+                error = VASPRobotError(
+                    message=str(e),
+                    category=category,
+                    cause=e
+                )
 
                 if log_errors:
                     print(f"❌ 错误: {error}", file=sys.stderr)
 
                 if reraise:
-                    raise error
+                    raise error from e
                 else:
                     return default_return
 
@@ -194,7 +206,6 @@ def retry_on_error(
                     last_exception = e
                     if attempt < max_attempts - 1:
                         print(f"⚠️ 尝试 {attempt + 1}/{max_attempts} 失败: {str(e)}")
-                        import time
                         time.sleep(current_delay)
                         current_delay *= backoff
                     else:
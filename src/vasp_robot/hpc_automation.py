@@ -5,16 +5,42 @@ HPC Automation Script for Connection and Job Submission
 支持VASP计算的HPC集群自动化操作
 """
 
+import asyncio
+import io
 import os
+import re
 import sys
 import json
 import time
+import queue
+import shlex
+import shutil
 import subprocess
+import tarfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Optional, Tuple, Any
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Any, Union
 from dataclasses import dataclass
-import yaml
+
+if __package__:
+    from .hpc_simple import TERMINAL_STATES, HPCConnection, SimpleHPCClient, sftp_path
+    from .settings import load_yaml
+else:  # 作为脚本直接运行（python src/vasp_robot/hpc_automation.py ...）
+    sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+    from vasp_robot.hpc_simple import TERMINAL_STATES, HPCConnection, SimpleHPCClient, sftp_path
+    from vasp_robot.settings import load_yaml
+
+
+# sbatch 输出中的作业ID
+_SUBMIT_RE = re.compile(r'Submitted batch job (\d+)')
+
+# OpenSSH服务端 MaxSessions 默认值，复用同一主连接的并发会话数不宜超过它
+MAX_SSH_SESSIONS = 10
+
+# rsync 视为成功的退出码：0 正常完成，24 传输期间部分源文件消失
+_RSYNC_OK_CODES = frozenset({0, 24})
 
 
 @dataclass
@@ -61,10 +87,55 @@ class HPCAutomation:
             potcar_path=self.config["hpc_environment"]["vasp_module"]["potcar_path"]
         )
 
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """加载配置文件"""
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        # OpenSSH ControlMaster只服务于ssh/scp/rsync子进程：短命令和SFTP走下面的paramiko
+        # 连接池，只有回退路径和rsync/tar流才会fork ssh，这些子进程之间复用同一主连接。
+        # ControlPath不用%h等占位符，close()据此判断主连接是否真的建立过
+        ssh_dir = Path.home() / ".ssh"
+        ssh_dir.mkdir(mode=0o700, exist_ok=True)
+        self._control_path = str(
+            ssh_dir / f"cm-{self.hpc_config.user}@{self.hpc_config.host}:{self.hpc_config.port}"
+        )
+        control_persist = self.config["hpc_environment"]["connection"].get("control_persist", "10m")
+        self._mux_opts = [
+            "-o", "ControlMaster=auto",
+            "-o", f"ControlPath={self._control_path}",
+            "-o", f"ControlPersist={control_persist}",
+        ]
+
+        # 短命令优先走进程内paramiko长连接（无fork/exec开销），不可用时回退到ssh子进程
+        strict_host_key = self.config["hpc_environment"]["connection"]["strict_host_key_checking"]
+        self._paramiko = SimpleHPCClient(HPCConnection(
+            host=self.hpc_config.host,
+            user=self.hpc_config.user,
+            port=self.hpc_config.port,
+            timeout=self.config["hpc_environment"]["connection"]["timeout"],
+            strict_host_key=str(strict_host_key).lower() in ("yes", "true"),
+            control_persist=None
+        ))
+
+        # 批量状态查询结果缓存：slurm作业ID -> (状态, 查询时刻)
+        self._status_cache: Dict[str, Tuple[HPCJobStatus, float]] = {}
+        # 多个线程等待作业时共用的后台监控线程，按需创建
+        self._watcher: Optional[SlurmJobWatcher] = None
+        self._watcher_lock = threading.Lock()
+
+    @staticmethod
+    def _load_config(config_path: str) -> Dict[str, Any]:
+        """加载配置文件（按文件mtime缓存解析结果，多个实例共享，不可修改）"""
+        return load_yaml(config_path)
+
+    def _build_ssh_command(self, command: str, timeout: int) -> List[str]:
+        """构建SSH命令，使用配置参数"""
+        strict_host_key = self.config["hpc_environment"]["connection"]["strict_host_key_checking"]
+        return [
+            "ssh",
+            "-o", f"ConnectTimeout={timeout}",
+            "-o", f"StrictHostKeyChecking={strict_host_key}",
+            *self._mux_opts,
+            "-p", str(self.hpc_config.port),
+            f"{self.hpc_config.user}@{self.hpc_config.host}",
+            command
+        ]
 
     def _run_ssh_command(self, command: str, timeout: int = None) -> Tuple[bool, str]:
         """执行SSH命令"""
@@ -73,19 +144,12 @@ class HPCAutomation:
             if timeout is None:
                 timeout = self.config["hpc_environment"]["connection"]["timeout"]
 
-            strict_host_key = self.config["hpc_environment"]["connection"]["strict_host_key_checking"]
-
-            # 构建SSH命令，使用配置参数
-            ssh_cmd = [
-                "ssh",
-                "-o", f"ConnectTimeout={timeout}",
-                "-o", f"StrictHostKeyChecking={strict_host_key}",
-                "-p", str(self.hpc_config.port),
-                f"{self.hpc_config.user}@{self.hpc_config.host}",
-                command
-            ]
-
             print(f"🔌 执行SSH命令: {command}")
+            client = self._paramiko.get_client()
+            if client is not None:
+                return self._paramiko.exec_on_client(client, command, timeout)
+
+            ssh_cmd = self._build_ssh_command(command, timeout)
             result = subprocess.run(
                 ssh_cmd,
                 capture_output=True,
@@ -114,6 +178,7 @@ class HPCAutomation:
                     "scp", "-r",
                     "-o", f"ConnectTimeout={timeout}",
                     "-o", f"StrictHostKeyChecking={strict_host_key}",
+                    *self._mux_opts,
                     "-P", str(self.hpc_config.port),
                     local_path,
                     f"{self.hpc_config.user}@{self.hpc_config.host}:{remote_path}"
@@ -124,6 +189,7 @@ class HPCAutomation:
                     "scp", "-r",
                     "-o", f"ConnectTimeout={timeout}",
                     "-o", f"StrictHostKeyChecking={strict_host_key}",
+                    *self._mux_opts,
                     "-P", str(self.hpc_config.port),
                     f"{self.hpc_config.user}@{self.hpc_config.host}:{remote_path}",
                     local_path
@@ -147,6 +213,28 @@ class HPCAutomation:
             print(f"❌ 文件{direction}错误: {str(e)}")
             return False
 
+    def close(self) -> None:
+        """停止共享监控线程，关闭SFTP会话和ControlMaster主连接（如已建立；共享长连接由空闲回收线程关闭）"""
+        if self._watcher is not None:
+            self._watcher.stop()
+            self._watcher = None
+        self._paramiko.close()
+        if not os.path.exists(self._control_path):
+            return  # 没有子进程建立过主连接
+        try:
+            subprocess.run(
+                [
+                    "ssh", "-O", "exit",
+                    "-o", f"ControlPath={self._control_path}",
+                    "-p", str(self.hpc_config.port),
+                    f"{self.hpc_config.user}@{self.hpc_config.host}",
+                ],
+                capture_output=True,
+                timeout=10
+            )
+        except Exception:
+            pass
+
     def test_hpc_connection(self) -> bool:
         """测试HPC连接"""
         print("🔍 测试HPC连接...")
@@ -210,14 +298,106 @@ class HPCAutomation:
             return False
 
         # 上传目录内的所有文件，而不是整个目录
-        upload_success = True
-        for file_path in local_job_dir.glob("*"):
-            if file_path.is_file():
-                if not self._run_scp_command(str(file_path), f"{remote_job_dir}/{file_path.name}", upload=True):
-                    upload_success = False
-                    print(f"❌ 文件上传失败: {file_path.name}")
+        file_names = [entry.name for entry in os.scandir(local_job_dir) if entry.is_file()]
+        if not file_names:
+            return True
+
+        # 用单个 tar | ssh 流一次传完所有文件，避免逐个scp重复握手
+        return self._upload_tar_stream(local_job_dir, file_names, remote_job_dir)
+
+    def _upload_tar_stream(self, local_dir: Path, file_names: List[str], remote_dir: str) -> bool:
+        """通过 tar | ssh 管道批量上传文件"""
+        timeout = self.config["hpc_environment"]["connection"]["timeout"]
+        tar_cmd = ["tar", "-cf", "-", "-C", str(local_dir), "--", *file_names]
+        ssh_cmd = self._build_ssh_command(f"tar -xf - -C {remote_dir}", timeout)
+
+        print(f"📁 上传文件: {local_dir} -> {remote_dir} ({len(file_names)}个文件)")
+        try:
+            with subprocess.Popen(tar_cmd, stdout=subprocess.PIPE) as tar_proc:
+                result = subprocess.run(
+                    ssh_cmd,
+                    stdin=tar_proc.stdout,
+                    capture_output=True,
+                    text=True,
+                    timeout=600
+                )
+
+            if result.returncode == 0 and tar_proc.returncode == 0:
+                print("✅ 文件上传成功")
+                return True
+            else:
+                print(f"❌ 文件上传失败: {result.stderr}")
+                return False
+
+        except subprocess.TimeoutExpired:
+            print("❌ 文件上传超时")
+            return False
+        except Exception as e:
+            print(f"❌ 文件上传错误: {str(e)}")
+            return False
+
+    def upload_job_payload(self, job_id: str, files: Dict[str, Union[str, bytes]]) -> bool:
+        """直接从内存上传作业文件（文件名 -> 内容），不经过本地磁盘"""
+        print(f"📤 上传作业文件: {job_id}")
+
+        remote_job_dir = f"{self.hpc_config.work_dir.rstrip('/')}/{job_id}"
+        success, _ = self._run_ssh_command(f"mkdir -p {remote_job_dir}")
+        if not success:
+            print("❌ 创建远程目录失败")
+            return False
+        if not files:
+            return True
+
+        payload = {
+            name: content.encode("utf-8") if isinstance(content, str) else content
+            for name, content in files.items()
+        }
+
+        # 优先在paramiko长连接的同一SFTP会话上依次 putfo，所有文件共用一个通道
+        client = self._paramiko.get_client()
+        if client is not None:
+            try:
+                with self._paramiko.sftp_session(client) as sftp:
+                    remote_dir = sftp_path(remote_job_dir)
+                    for name, data in payload.items():
+                        sftp.putfo(io.BytesIO(data), f"{remote_dir}/{name}")
+                print(f"✅ 文件上传成功 ({len(payload)}个文件)")
+                return True
+            except Exception as e:
+                print(f"⚠️ SFTP上传失败，改用tar流: {e}")
+
+        return self._upload_tar_bytes(payload, remote_job_dir)
+
+    def _upload_tar_bytes(self, payload: Dict[str, bytes], remote_dir: str) -> bool:
+        """在内存中打包为tar，通过单个 ssh 流上传"""
+        buffer = io.BytesIO()
+        mtime = time.time()
+        with tarfile.open(fileobj=buffer, mode="w") as archive:
+            for name, data in payload.items():
+                info = tarfile.TarInfo(name)
+                info.size = len(data)
+                info.mtime = mtime
+                info.mode = 0o644
+                archive.addfile(info, io.BytesIO(data))
+
+        timeout = self.config["hpc_environment"]["connection"]["timeout"]
+        ssh_cmd = self._build_ssh_command(f"tar -xf - -C {remote_dir}", timeout)
+
+        print(f"📁 上传文件: -> {remote_dir} ({len(payload)}个文件)")
+        try:
+            result = subprocess.run(ssh_cmd, input=buffer.getvalue(), capture_output=True, timeout=600)
+            if result.returncode == 0:
+                print("✅ 文件上传成功")
+                return True
+            print(f"❌ 文件上传失败: {result.stderr.decode('utf-8', errors='replace')}")
+            return False
 
-        return upload_success
+        except subprocess.TimeoutExpired:
+            print("❌ 文件上传超时")
+            return False
+        except Exception as e:
+            print(f"❌ 文件上传错误: {str(e)}")
+            return False
 
     def submit_vasp_job(self, job_id: str) -> Optional[str]:
         """提交VASP作业"""
@@ -229,8 +409,7 @@ class HPCAutomation:
         success, output = self._run_ssh_command(submit_cmd)
         if success:
             # 解析作业ID
-            import re
-            job_id_match = re.search(r'Submitted batch job (\d+)', output)
+            job_id_match = _SUBMIT_RE.search(output)
             if job_id_match:
                 slurm_job_id = job_id_match.group(1)
                 print(f"✅ 作业提交成功，Slurm作业ID: {slurm_job_id}")
@@ -242,11 +421,152 @@ class HPCAutomation:
             print(f"❌ 作业提交失败: {output}")
             return None
 
-    def get_job_status(self, slurm_job_id: str) -> Optional[HPCJobStatus]:
+    def submit_and_wait(self, job_id: str, max_wait: int = 7200) -> bool:
+        """提交作业并阻塞等待其结束（sbatch --wait），期间不再轮询
+
+        sbatch --wait 在作业结束后才返回，退出码即作业的退出码。
+        """
+        print(f"🚀 提交VASP作业并等待完成: {job_id}")
+
+        remote_job_dir = f"{self.hpc_config.work_dir.rstrip('/')}/{job_id}"
+        timeout = self.config["hpc_environment"]["connection"]["timeout"]
+        ssh_cmd = self._build_ssh_command(f"cd {remote_job_dir} && sbatch --wait run.slurm", timeout)
+
+        try:
+            result = subprocess.run(ssh_cmd, capture_output=True, text=True, timeout=max_wait)
+        except subprocess.TimeoutExpired:
+            print(f"⏰ 等待超时 ({max_wait/3600:.1f}小时)")
+            return False
+        except Exception as e:
+            print(f"❌ 作业提交失败: {str(e)}")
+            return False
+
+        job_id_match = _SUBMIT_RE.search(result.stdout)
+        if job_id_match:
+            print(f"✅ 作业已提交，Slurm作业ID: {job_id_match.group(1)}")
+
+        if result.returncode == 0:
+            print("🏁 作业结束，最终状态: COMPLETED")
+            return True
+        print(f"❌ 作业失败，退出代码: {result.returncode}")
+        if result.stderr.strip():
+            print(result.stderr.strip())
+        return False
+
+    def watch_jobs(self, slurm_job_ids: Iterable[str], check_interval: int = 60) -> "SlurmJobWatcher":
+        """启动后台轮询线程，状态变化通过 watcher.events 队列通知"""
+        watcher = SlurmJobWatcher(self, check_interval)
+        watcher.watch(slurm_job_ids)
+        watcher.start()
+        return watcher
+
+    def wait_for_job(self, slurm_job_id: str, check_interval: int = 60, max_wait: int = 7200) -> bool:
+        """等待作业结束，所有调用线程共用一个后台批量轮询线程
+
+        check_interval 只在首次创建共享轮询线程时生效。
+        """
+        with self._watcher_lock:
+            if self._watcher is None:
+                self._watcher = SlurmJobWatcher(self, check_interval, on_change=self._print_status_change)
+                self._watcher.start()
+            watcher = self._watcher
+
+        print(f"👁️ 开始监控作业: {slurm_job_id}")
+        job_status = watcher.wait_for(slurm_job_id, timeout=max_wait)
+        if job_status is None:
+            print(f"⏰ 监控超时 ({max_wait/3600:.1f}小时)")
+            return False
+
+        if job_status.exit_code is not None:
+            print(f"🔢 [{slurm_job_id}] 退出代码: {job_status.exit_code}")
+        return job_status.status == "COMPLETED"
+
+    @staticmethod
+    def _print_status_change(job_status: HPCJobStatus) -> None:
+        print(f"📊 [{job_status.job_id}] 作业状态更新: {job_status.status}")
+
+    def get_job_statuses(self, slurm_job_ids: List[str], max_age: float = 0.0) -> Dict[str, HPCJobStatus]:
+        """批量查询多个作业的状态：一次squeue，必要时再加一次sacct
+
+        squeue是主要数据源；只有已离开队列或处于结束状态的作业才查询sacct，
+        以取得最终状态和退出代码（sacct依赖记账数据库，负载高时可能不可用）。
+
+        Args:
+            slurm_job_ids: Slurm作业ID列表
+            max_age: 缓存有效期（秒），期内的重复查询直接返回缓存结果
+
+        Returns:
+            作业ID到状态的映射，squeue和sacct均暂无记录的作业不在其中
+        """
+        job_ids = [job_id for job_id in dict.fromkeys(slurm_job_ids) if job_id != "unknown"]
+        now = time.monotonic()
+        statuses: Dict[str, HPCJobStatus] = {}
+        stale: List[str] = []
+        for job_id in job_ids:
+            cached = self._status_cache.get(job_id)
+            if cached is not None and now - cached[1] <= max_age:
+                statuses[job_id] = cached[0]
+            else:
+                stale.append(job_id)
+
+        if not stale:
+            return statuses
+
+        print(f"🔍 批量查询作业状态: {','.join(stale)}")
+        finished = list(stale)
+        cmd = f"squeue -h -j {','.join(stale)} -o '%i|%T|%V'"
+        success, output = self._run_ssh_command(cmd)
+        # squeue失败时（例如作业均已从队列中清除，报"Invalid job id"）全部交给sacct
+        if success:
+            wanted = set(stale)
+            for line in output.splitlines():
+                parts = line.strip().split('|', 2)
+                # 队列中已是结束状态（如COMPLETING之后短暂显示的COMPLETED）的作业仍以sacct为准
+                if len(parts) < 3 or parts[0] not in wanted or parts[1] in TERMINAL_STATES:
+                    continue
+                status = HPCJobStatus(job_id=parts[0], status=parts[1], submit_time=parts[2])
+                statuses[parts[0]] = status
+                self._status_cache[parts[0]] = (status, now)
+            finished = [job_id for job_id in stale if job_id not in statuses]
+        if not finished:
+            return statuses
+
+        cmd = f"sacct -j {','.join(finished)} -n -P -X -o JobID,State,Submit,Start,End,ExitCode,AllocNodes"
+        success, output = self._run_ssh_command(cmd)
+        if not success:
+            return statuses
+
+        wanted = set(finished)
+        for line in output.splitlines():
+            parts = line.split('|', 6)
+            if len(parts) < 7 or parts[0] not in wanted:
+                continue
+            job_id, state, submit_time, start_time, end_time, exit_code, nodes = parts
+            # "CANCELLED by 1234" 之类的状态只取首个单词
+            state = state.split()[0] if state.strip() else "UNKNOWN"
+            status = HPCJobStatus(
+                job_id=job_id,
+                status=state,
+                submit_time=submit_time,
+                start_time=start_time if start_time not in ("Unknown", "None", "") else None,
+                end_time=end_time if end_time not in ("Unknown", "None", "") else None,
+                nodes_used=int(nodes) if nodes.isdigit() else 0,
+                exit_code=int(exit_code.split(':')[0]) if ':' in exit_code else None
+            )
+            statuses[job_id] = status
+            self._status_cache[job_id] = (status, now)
+
+        return statuses
+
+    def get_job_status(self, slurm_job_id: str, max_age: float = 0.0) -> Optional[HPCJobStatus]:
         """获取作业状态"""
         if slurm_job_id == "unknown":
             return None
 
+        cached = self._status_cache.get(slurm_job_id)
+        if cached is not None and time.monotonic() - cached[1] <= max_age:
+            return cached[0]
+
         print(f"🔍 查询作业状态: {slurm_job_id}")
 
         # 获取作业基本信息
@@ -266,72 +586,114 @@ class HPCAutomation:
                 )
         else:
             # 作业可能已完成，检查历史
-            history_cmd = f"sacct -j {slurm_job_id} -n -o 'State,Submit,Start,End,ExitCode,AllocNodes'"
+            # -P 输出以 | 分隔，"CANCELLED by 123" 这类含空格的字段也不会错位
+            history_cmd = f"sacct -j {slurm_job_id} -n -P -X -o State,Submit,Start,End,ExitCode,AllocNodes"
             success, output = self._run_ssh_command(history_cmd)
 
-            if success and output.strip():
-                lines = output.strip().split('\n')
-                for line in lines:
-                    if line.strip():
-                        parts = line.strip().split()
-                        if len(parts) >= 6:
-                            state = parts[0]
-                            submit_time = parts[1]
-                            start_time = parts[2]
-                            end_time = parts[3]
-                            exit_code = parts[4]
-                            nodes_used = int(parts[5]) if parts[5].isdigit() else 0
-
-                            # 确定最终状态
-                            if "COMPLETED" in state:
-                                status = "COMPLETED"
-                            elif "FAILED" in state:
-                                status = "FAILED"
-                            elif "CANCELLED" in state:
-                                status = "CANCELLED"
-                            else:
-                                status = "COMPLETED"  # 默认为完成
-
-                            return HPCJobStatus(
-                                job_id=slurm_job_id,
-                                status=status,
-                                submit_time=submit_time,
-                                start_time=start_time if start_time != "Unknown" else None,
-                                end_time=end_time if end_time != "Unknown" else None,
-                                nodes_used=nodes_used,
-                                exit_code=int(exit_code.split(':')[0]) if ':' in exit_code else None
-                            )
+            if success:
+                for line in output.splitlines():
+                    parts = line.split('|', 5)
+                    if len(parts) < 6:
+                        continue
+                    state, submit_time, start_time, end_time, exit_code, nodes = parts
+
+                    # 确定最终状态
+                    if "COMPLETED" in state:
+                        status = "COMPLETED"
+                    elif "FAILED" in state:
+                        status = "FAILED"
+                    elif "CANCELLED" in state:
+                        status = "CANCELLED"
+                    else:
+                        status = "COMPLETED"  # 默认为完成
+
+                    return HPCJobStatus(
+                        job_id=slurm_job_id,
+                        status=status,
+                        submit_time=submit_time,
+                        start_time=start_time if start_time != "Unknown" else None,
+                        end_time=end_time if end_time != "Unknown" else None,
+                        nodes_used=int(nodes) if nodes.isdigit() else 0,
+                        exit_code=int(exit_code.split(':')[0]) if ':' in exit_code else None
+                    )
 
         return None
 
-    def monitor_job(self, slurm_job_id: str, check_interval: int = 60, max_wait: int = 7200) -> bool:
-        """监控作业执行"""
-        print(f"👁️ 开始监控作业: {slurm_job_id}")
+    def monitor_job(self, slurm_job_id: Union[str, List[str]], check_interval: int = 60, max_wait: int = 7200) -> bool:
+        """监控作业执行，可同时监控多个作业（每轮只发一次批量查询）"""
+        job_ids = [slurm_job_id] if isinstance(slurm_job_id, str) else list(slurm_job_id)
+        print(f"👁️ 开始监控作业: {', '.join(job_ids)}")
         print(f"⏰ 检查间隔: {check_interval}秒，最长等待: {max_wait/3600:.1f}小时")
 
-        start_time = time.time()
-        last_status = None
+        deadline = time.time() + max_wait
+        pending = {job_id for job_id in job_ids if job_id != "unknown"}
+        all_completed = len(pending) == len(job_ids)
 
-        while time.time() - start_time < max_wait:
-            job_status = self.get_job_status(slurm_job_id)
+        # 单个后台线程批量轮询，这里只等待状态变化事件
+        watcher = self.watch_jobs(pending, check_interval)
+        try:
+            while pending:
+                remaining = deadline - time.time()
+                if remaining <= 0:
+                    break
+                try:
+                    job_status = watcher.events.get(timeout=remaining)
+                except queue.Empty:
+                    break
 
-            if job_status:
                 current_status = job_status.status
-                if current_status != last_status:
-                    print(f"📊 作业状态更新: {current_status}")
-                    last_status = current_status
+                prefix = f"[{job_status.job_id}] " if len(job_ids) > 1 else ""
+                print(f"📊 {prefix}作业状态更新: {current_status}")
 
-                if current_status in ["COMPLETED", "FAILED", "CANCELLED"]:
-                    print(f"🏁 作业结束，最终状态: {current_status}")
+                if current_status in TERMINAL_STATES:
+                    print(f"🏁 作业 {job_status.job_id} 结束，最终状态: {current_status}")
                     if job_status.exit_code is not None:
                         print(f"🔢 退出代码: {job_status.exit_code}")
-                    return current_status == "COMPLETED"
+                    all_completed = all_completed and current_status == "COMPLETED"
+                    pending.discard(job_status.job_id)
+        finally:
+            watcher.stop()
 
-            time.sleep(check_interval)
+        if not pending:
+            return all_completed
 
         print(f"⏰ 监控超时 ({max_wait/3600:.1f}小时)")
         return False
 
+    async def monitor_job_async(self, slurm_job_id: str, initial_interval: float = 5,
+                                max_interval: float = 60, max_wait: int = 7200) -> bool:
+        """异步监控单个作业，查询间隔指数退避（5s → 10s → 20s → ... 封顶 max_interval）
+
+        SSH查询在线程中执行并复用paramiko长连接，等待期间不阻塞事件循环。
+        """
+        if slurm_job_id == "unknown":
+            return False
+
+        print(f"👁️ 开始监控作业: {slurm_job_id}")
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + max_wait
+        interval = initial_interval
+        last_status = None
+
+        while True:
+            statuses = await asyncio.to_thread(self.get_job_statuses, [slurm_job_id])
+            job_status = statuses.get(slurm_job_id)
+            if job_status is not None and job_status.status != last_status:
+                last_status = job_status.status
+                print(f"📊 作业状态更新: {last_status}")
+                if last_status in TERMINAL_STATES:
+                    print(f"🏁 作业 {slurm_job_id} 结束，最终状态: {last_status}")
+                    if job_status.exit_code is not None:
+                        print(f"🔢 退出代码: {job_status.exit_code}")
+                    return last_status == "COMPLETED"
+
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                print(f"⏰ 监控超时 ({max_wait/3600:.1f}小时)")
+                return False
+            await asyncio.sleep(min(interval, remaining))
+            interval = min(interval * 2, max_interval)
+
     def download_results(self, job_id: str, local_result_dir: str = "vasp_results") -> bool:
         """下载计算结果"""
         print(f"📥 下载计算结果: {job_id}")
@@ -357,6 +719,11 @@ class HPCAutomation:
             "slurm-*.out"
         ]
 
+        # 一次rsync完成远程列目录和选择性传输，未变化的文件不会重复下载
+        if self._rsync_download(remote_dir, local_path, result_files):
+            return True
+
+        # rsync不可用或失败时逐个模式回退到scp
         for file_pattern in result_files:
             # 使用通配符下载文件
             success, _ = self._run_ssh_command(f"cd {remote_dir} && ls {file_pattern} 2>/dev/null")
@@ -370,6 +737,46 @@ class HPCAutomation:
 
         return True
 
+    def _rsync_download(self, remote_dir: str, local_path: Path, patterns: List[str]) -> bool:
+        """用单个rsync下载匹配模式的文件
+
+        Returns:
+            rsync成功完成时返回True；本地没有rsync、超时或以非零状态退出时
+            返回False，由调用方回退到scp。退出码24（传输期间远程文件消失）
+            视为成功。
+        """
+        if shutil.which("rsync") is None:
+            return False
+
+        connection = self.config["hpc_environment"]["connection"]
+        ssh_cmd = shlex.join([
+            "ssh",
+            "-o", f"ConnectTimeout={connection['timeout']}",
+            "-o", f"StrictHostKeyChecking={connection['strict_host_key_checking']}",
+            *self._mux_opts,
+            "-p", str(self.hpc_config.port),
+        ])
+        include_flags = [flag for pattern in patterns for flag in ("--include", pattern)]
+        rsync_cmd = [
+            "rsync", "-az", "-e", ssh_cmd,
+            *include_flags, "--exclude=*",
+            f"{self.hpc_config.user}@{self.hpc_config.host}:{remote_dir}/",
+            f"{local_path}/",
+        ]
+
+        print(f"📁 下载文件: {remote_dir} -> {local_path}")
+        try:
+            result = subprocess.run(rsync_cmd, capture_output=True, text=True, timeout=600)
+        except subprocess.TimeoutExpired:
+            print("⚠️ rsync下载超时，回退到scp")
+            return False
+
+        if result.returncode in _RSYNC_OK_CODES:
+            print("✅ 文件下载成功")
+            return True
+        print(f"⚠️ rsync下载失败 (退出码 {result.returncode})，回退到scp: {result.stderr.strip()}")
+        return False
+
     def cleanup_remote_files(self, job_id: str, keep_results: bool = True) -> bool:
         """清理远程文件"""
         print(f"🧹 清理远程文件: {job_id}")
@@ -416,8 +823,8 @@ class HPCAutomation:
             result["steps"]["submit"] = "completed"
             result["slurm_job_id"] = slurm_job_id
 
-            # 3. 监控作业
-            if not self.monitor_job(slurm_job_id):
+            # 3. 监控作业（run_many 并发时各线程共用同一个轮询线程）
+            if not self.wait_for_job(slurm_job_id):
                 raise Exception("作业监控超时或失败")
             result["steps"]["monitor"] = "completed"
 
@@ -439,18 +846,114 @@ class HPCAutomation:
 
         return result
 
+    def run_many(self, job_ids: List[str], max_workers: int = 8) -> List[Dict[str, Any]]:
+        """并发运行多个作业的完整周期
+
+        每个作业的上传、提交、监控和下载都是网络I/O，多线程可以重叠等待时间。
+        并发数不超过 MAX_SSH_SESSIONS，避免超出服务端每连接的会话上限。
+
+        Returns:
+            与 job_ids 顺序一致的作业周期结果列表
+        """
+        if not job_ids:
+            return []
+
+        workers = max(1, min(max_workers, len(job_ids), MAX_SSH_SESSIONS))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(self.run_complete_job_cycle, job_ids))
+
+
+class SlurmJobWatcher:
+    """Slurm作业后台监控线程
+
+    一个线程每隔 check_interval 秒用一次批量squeue（结束的作业再加一次sacct）查询所有被监控的作业，
+    状态发生变化时把 HPCJobStatus 交给 on_change（默认放入 events 队列）；
+    作业结束后停止跟踪并唤醒 wait_for() 中等待该作业的线程。
+    """
+
+    def __init__(self, hpc: HPCAutomation, check_interval: int = 60,
+                 on_change: Optional[Callable[[HPCJobStatus], None]] = None):
+        self.hpc = hpc
+        self.check_interval = check_interval
+        self.events: "queue.Queue[HPCJobStatus]" = queue.Queue()
+        self._on_change = on_change or self.events.put
+        self._jobs: Set[str] = set()
+        self._last_status: Dict[str, str] = {}
+        self._final: Dict[str, HPCJobStatus] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def watch(self, slurm_job_ids: Iterable[str]) -> None:
+        """添加需要监控的作业，有新作业时立即触发一轮查询"""
+        with self._lock:
+            new_ids = {job_id for job_id in slurm_job_ids if job_id != "unknown"} - self._jobs
+            new_ids.difference_update(self._final)
+            for job_id in new_ids:
+                self._done.setdefault(job_id, threading.Event())
+            self._jobs.update(new_ids)
+        if new_ids:
+            self._wake.set()
+
+    def wait_for(self, slurm_job_id: str, timeout: Optional[float] = None) -> Optional[HPCJobStatus]:
+        """阻塞等待作业结束，返回最终状态；超时返回None"""
+        self.watch([slurm_job_id])
+        with self._lock:
+            done = self._done.get(slurm_job_id)
+        if done is None or not done.wait(timeout):
+            return None
+        return self._final.get(slurm_job_id)
+
+    def start(self) -> None:
+        """启动后台轮询线程"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        """停止后台轮询线程"""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self) -> None:
+        # 首轮立即查询，之后按间隔查询；watch()/stop() 会提前唤醒
+        while not self._stop.is_set():
+            self._wake.clear()
+            with self._lock:
+                job_ids = sorted(self._jobs)
+            if job_ids:
+                statuses = self.hpc.get_job_statuses(job_ids, max_age=self.check_interval / 2)
+                for job_id, job_status in statuses.items():
+                    if job_status.status == self._last_status.get(job_id):
+                        continue
+                    self._last_status[job_id] = job_status.status
+                    self._on_change(job_status)
+                    if job_status.status in TERMINAL_STATES:
+                        with self._lock:
+                            self._jobs.discard(job_id)
+                            self._final[job_id] = job_status
+                            done = self._done.get(job_id)
+                        if done is not None:
+                            done.set()
+            self._wake.wait(self.check_interval)
+
 
 # 命令行接口
 def main():
     """主函数"""
     if len(sys.argv) < 2:
         print("使用方法:")
-        print("  python hpc_automation.py test                    # 测试HPC连接")
-        print("  python hpc_automation.py submit <job_id>        # 提交作业")
-        print("  python hpc_automation.py status <slurm_job_id>  # 查询状态")
-        print("  python hpc_automation.py monitor <slurm_job_id> # 监控作业")
-        print("  python hpc_automation.py download <job_id>      # 下载结果")
-        print("  python hpc_automation.py run <job_id>           # 完整周期")
+        print("  python src/vasp_robot/hpc_automation.py test                     # 测试HPC连接")
+        print("  python src/vasp_robot/hpc_automation.py submit <job_id>          # 提交作业")
+        print("  python src/vasp_robot/hpc_automation.py status <slurm_job_id>    # 查询状态")
+        print("  python src/vasp_robot/hpc_automation.py monitor <slurm_job_id>   # 监控作业")
+        print("  python src/vasp_robot/hpc_automation.py download <job_id>        # 下载结果")
+        print("  python src/vasp_robot/hpc_automation.py run <job_id>             # 完整周期")
+        print("  python src/vasp_robot/hpc_automation.py run <job_id> <job_id>... # 并发运行多个作业")
         sys.exit(1)
 
     command = sys.argv[1]
@@ -493,6 +996,11 @@ def main():
         success = hpc.download_results(job_id)
         sys.exit(0 if success else 1)
 
+    elif command == "run" and len(sys.argv) > 3:
+        results = hpc.run_many(sys.argv[2:])
+        print(f"作业周期结果: {json.dumps(results, indent=2)}")
+        sys.exit(0 if all(result["success"] for result in results) else 1)
+
     elif command == "run" and len(sys.argv) >= 3:
         job_id = sys.argv[2]
         result = hpc.run_complete_job_cycle(job_id)
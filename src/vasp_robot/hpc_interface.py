@@ -3,13 +3,77 @@ HPC Interface for VASP calculations
 Handles SSH connections, file transfers, and job submission to remote clusters.
 """
 
-import paramiko
+from __future__ import annotations
+
 import os
+import shlex
+import socket
+import tarfile
+import threading
 import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
 from dataclasses import dataclass
-import yaml
+from functools import lru_cache
+
+from .hpc_simple import TERMINAL_STATES
+from .settings import load_yaml
+
+if TYPE_CHECKING:  # paramiko is imported lazily; it is slow to load
+    import paramiko
+
+# Largest channel window allowed by RFC 4254, so SFTP is not window-bound
+TRANSPORT_WINDOW_SIZE = 2 ** 31 - 1
+# Postpone key re-exchange during large transfers
+TRANSPORT_REKEY_LIMIT = 2 ** 40
+# Socket buffers sized for a ~1 Gbps x 200 ms bandwidth-delay product
+SOCKET_BUFFER_SIZE = 32 << 20
+# Parallel SFTP sessions used by upload_files/download_results
+TRANSFER_CONCURRENCY = 8
+# Files at least this large are uploaded over SCP when the scp package is installed
+SCP_UPLOAD_THRESHOLD = 16 << 20
+# Local write size when draining a prefetched remote file
+DOWNLOAD_CHUNK_SIZE = 1 << 20
+
+# Result files fetched individually over SFTP
+RESULT_FILES = (
+    "OUTCAR", "vasprun.xml", "vasp.out",
+    "PROCAR", "DOSCAR", "EIGENVAL",
+    "hashes.json", "lineage.json"
+)
+# Multi-GB charge/wavefunction files, only fetched on request via one tar stream
+BULK_RESULT_FILES = ("CHGCAR", "CHG", "WAVECAR")
+
+# Live SSH clients keyed by (hostname, port, username), shared across instances;
+# _CONN_REFS counts the instances holding each cached client
+_CONN_CACHE: Dict[Tuple[str, int, str], paramiko.SSHClient] = {}
+_CONN_REFS: Dict[Tuple[str, int, str], int] = {}
+_CONN_LOCK = threading.Lock()
+
+# Silent check intervals after which the squeue stream is given up on
+STREAM_STALL_INTERVALS = 3
+
+
+@lru_cache(maxsize=None)
+def _scp_client_class():
+    """Return scp.SCPClient if the optional scp package is installed."""
+    try:  # Optional: scp streams large files without SFTP's per-request framing
+        from scp import SCPClient
+    except ImportError:
+        return None
+    return SCPClient
+
+
+def _walk_files(directory: str) -> Iterator[os.DirEntry]:
+    """Yield regular files under ``directory`` using scandir's cached d_type."""
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                yield from _walk_files(entry.path)
+            elif entry.is_file():
+                yield entry
+
 
 @dataclass
 class HPCConfig:
@@ -25,6 +89,7 @@ class HPCConfig:
     nodes: int
     ntasks_per_node: int
     walltime_minutes: int
+    compression: bool = False
 
 
 class HPCInterface:
@@ -34,11 +99,14 @@ class HPCInterface:
         self.config = self._load_config(config_path)
         self.ssh_client = None
         self.connected = False
+        self._conn_key: Optional[Tuple[str, int, str]] = None
+        # Idle SFTP sessions kept open between transfer batches
+        self._sftp_pool: List[paramiko.SFTPClient] = []
+        self._sftp_lock = threading.Lock()
 
     def _load_config(self, config_path: str) -> HPCConfig:
         """Load HPC configuration from YAML"""
-        with open(config_path, 'r') as f:
-            config_data = yaml.safe_load(f)
+        config_data = load_yaml(config_path)
 
         return HPCConfig(
             host=config_data["ssh"]["host"],
@@ -51,15 +119,27 @@ class HPCInterface:
             partition=config_data["hpc"]["partition"],
             nodes=config_data["hpc"]["nodes"],
             ntasks_per_node=config_data["hpc"]["ntasks_per_node"],
-            walltime_minutes=config_data["hpc"]["walltime_minutes"]
+            walltime_minutes=config_data["hpc"]["walltime_minutes"],
+            compression=bool(config_data["ssh"].get("compression", False))
         )
 
+    @staticmethod
+    def _is_active(client: Optional[paramiko.SSHClient]) -> bool:
+        transport = client.get_transport() if client else None
+        return bool(transport and transport.is_active())
+
     def connect(self) -> bool:
-        """Establish SSH connection to HPC cluster using existing SSH config"""
-        try:
-            self.ssh_client = paramiko.SSHClient()
-            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        """Establish SSH connection to HPC cluster using existing SSH config
+
+        Reuses an already authenticated transport to the same host/user when
+        one is alive, skipping the key exchange and authentication round trips.
+        """
+        if self.connected and self._is_active(self.ssh_client):
+            return True
 
+        import paramiko
+
+        try:
             # Use existing SSH configuration from ~/.ssh/config
             ssh_config = paramiko.SSHConfig()
             with open(os.path.expanduser("~/.ssh/config")) as f:
@@ -73,9 +153,25 @@ class HPCInterface:
             username = host_config.get('user', self.config.user)
             key_filename = host_config.get('identityfile', [None])[0]
 
+            conn_key = (hostname, port, username)
+            with _CONN_LOCK:
+                cached_client = _CONN_CACHE.get(conn_key)
+                reused = self._is_active(cached_client)
+                if reused:
+                    _CONN_REFS[conn_key] = _CONN_REFS.get(conn_key, 0) + 1
+            if reused:
+                self.ssh_client = cached_client
+                self._conn_key = conn_key
+                self.connected = True
+                print(f"♻️  Reusing SSH connection to {username}@{hostname}:{port}")
+                return True
+
             print(f"🔌 Connecting to HPC via SSH config: {self.config.host}")
             print(f"   Target: {username}@{hostname}:{port}")
 
+            self.ssh_client = paramiko.SSHClient()
+            self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+
             try:
                 self.ssh_client.connect(
                     hostname=hostname,
@@ -83,7 +179,9 @@ class HPCInterface:
                     username=username,
                     key_filename=key_filename,
                     timeout=10,
-                    allow_agent=True  # Use SSH agent if available
+                    allow_agent=True,  # Use SSH agent if available
+                    compress=self.config.compression,  # zlib for ASCII INCAR/OUTCAR/vasprun.xml
+                    sock=self._open_socket(hostname, port, timeout=10)
                 )
             except paramiko.AuthenticationException as e:
                 print(f"❌ SSH authentication failed: {e}")
@@ -95,6 +193,12 @@ class HPCInterface:
                 return False
 
             self.connected = True
+            self._tune_transport()
+            self._conn_key = conn_key
+            with _CONN_LOCK:
+                # Replaces a dead cached client; holders of that one reconnect on use
+                _CONN_CACHE[conn_key] = self.ssh_client
+                _CONN_REFS[conn_key] = 1
             print(f"✅ Connected to HPC cluster {self.config.host}")
 
             # Test connection and show system info
@@ -110,48 +214,172 @@ class HPCInterface:
             print(f"❌ Failed to connect to HPC cluster: {e}")
             return False
 
+    @staticmethod
+    def _open_socket(hostname: str, port: int, timeout: float) -> socket.socket:
+        """Open the TCP connection with Nagle disabled and large buffers.
+
+        Buffer sizes must be set before connect() so the kernel can advertise
+        a matching TCP window scale during the handshake.
+        """
+        last_error: Optional[OSError] = None
+        for family, socktype, proto, _, address in socket.getaddrinfo(
+                hostname, port, type=socket.SOCK_STREAM):
+            sock = socket.socket(family, socktype, proto)
+            try:
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, SOCKET_BUFFER_SIZE)
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SOCKET_BUFFER_SIZE)
+                sock.settimeout(timeout)
+                sock.connect(address)
+                return sock
+            except OSError as e:
+                sock.close()
+                last_error = e
+        raise last_error or OSError(f"Could not resolve {hostname}:{port}")
+
+    def _tune_transport(self) -> None:
+        """Enlarge channel windows so SFTP streams instead of waiting on acks.
+
+        Must run before any channel (including SFTP) is opened, since the
+        window size is negotiated per channel at open time. ``sftp.put`` and
+        ``sftp.get`` already pipeline their requests; the default 2 MB window
+        is what throttles them on high-latency links.
+        """
+        transport = self.ssh_client.get_transport()
+        if transport is None:
+            return
+        transport.default_window_size = TRANSPORT_WINDOW_SIZE
+        transport.packetizer.REKEY_BYTES = TRANSPORT_REKEY_LIMIT
+        transport.packetizer.REKEY_PACKETS = TRANSPORT_REKEY_LIMIT
+
+    def _acquire_sftp(self) -> paramiko.SFTPClient:
+        """Borrow an idle SFTP session, opening one only when none is left."""
+        with self._sftp_lock:
+            while self._sftp_pool:
+                sftp = self._sftp_pool.pop()
+                if not sftp.get_channel().closed:
+                    return sftp
+        return self.ssh_client.open_sftp()
+
+    def _release_sftp(self, sftp: paramiko.SFTPClient) -> None:
+        with self._sftp_lock:
+            self._sftp_pool.append(sftp)
+
+    def _close_sftp_pool(self) -> None:
+        with self._sftp_lock:
+            sessions, self._sftp_pool = self._sftp_pool, []
+        for sftp in sessions:
+            sftp.close()
+
+    def _ensure_connected(self) -> bool:
+        """Return True when a live connection is available.
+
+        An instance that was connected but whose shared transport has since
+        died reconnects through :meth:`connect` instead of failing on it.
+        """
+        if not self.connected:
+            return False
+        if self._is_active(self.ssh_client):
+            return True
+        return self.connect()
+
     def disconnect(self):
-        """Close SSH connection"""
+        """Release the SSH connection.
+
+        The shared client is closed only when the last instance using it
+        disconnects; other instances keep working on it until then.
+        """
+        self._close_sftp_pool()
         if self.ssh_client:
-            self.ssh_client.close()
+            close = True
+            with _CONN_LOCK:
+                if _CONN_CACHE.get(self._conn_key) is self.ssh_client:
+                    refs = _CONN_REFS.get(self._conn_key, 1) - 1
+                    if refs > 0:
+                        _CONN_REFS[self._conn_key] = refs
+                        close = False
+                    else:
+                        del _CONN_CACHE[self._conn_key]
+                        _CONN_REFS.pop(self._conn_key, None)
+            if close:
+                self.ssh_client.close()
+            self.ssh_client = None
             self.connected = False
             print("🔌 Disconnected from HPC cluster")
 
-    def upload_files(self, local_dir: Path, remote_dir: str) -> bool:
+    def _run_transfers(self, transfers: List[Tuple[str, str]],
+                       transfer: Callable[[paramiko.SFTPClient, str, str], bool],
+                       concurrency: int) -> List[bool]:
+        """Run SFTP transfers on a thread pool, one SFTP session per worker.
+
+        A single SFTP channel is not safe to share between threads, but the
+        underlying transport multiplexes channels, so each worker borrows its
+        own session for the rest of the batch. Sessions go back to the pool
+        afterwards, so later uploads/downloads skip the subsystem handshake.
+        """
+        local = threading.local()
+        sessions: List[paramiko.SFTPClient] = []
+        lock = threading.Lock()
+
+        def run(item: Tuple[str, str]) -> bool:
+            sftp = getattr(local, "sftp", None)
+            if sftp is None:
+                sftp = self._acquire_sftp()
+                local.sftp = sftp
+                with lock:
+                    sessions.append(sftp)
+            return transfer(sftp, *item)
+
+        try:
+            with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+                return list(pool.map(run, transfers))
+        finally:
+            for sftp in sessions:
+                self._release_sftp(sftp)
+
+    def upload_files(self, local_dir: Path, remote_dir: str,
+                     concurrency: int = TRANSFER_CONCURRENCY) -> bool:
         """Upload directory contents to HPC cluster"""
-        if not self.connected:
+        if not self._ensure_connected():
             print("❌ Not connected to HPC cluster")
             return False
 
         try:
-            sftp = self.ssh_client.open_sftp()
-
-            # Create remote directory if it doesn't exist
-            try:
-                sftp.stat(remote_dir)
-            except FileNotFoundError:
-                print(f"📁 Creating remote directory: {remote_dir}")
-                self._execute_remote_command(f"mkdir -p {remote_dir}")
-
-            # Upload files
-            uploaded_files = []
-            for local_file in local_dir.rglob('*'):
-                if local_file.is_file():
-                    relative_path = local_file.relative_to(local_dir)
-                    remote_path = f"{remote_dir}/{relative_path}"
-
-                    # Create remote subdirectories if needed
-                    remote_subdir = str(Path(remote_path).parent)
-                    try:
-                        sftp.stat(remote_subdir)
-                    except FileNotFoundError:
-                        sftp.mkdir(remote_subdir)
-
-                    print(f"📤 Uploading: {relative_path}")
-                    sftp.put(str(local_file), remote_path)
-                    uploaded_files.append(relative_path)
+            transfers = []
+            large_transfers = []
+            scp_client = _scp_client_class()
+            for entry in _walk_files(str(local_dir)):
+                relative_path = os.path.relpath(entry.path, local_dir)
+                transfer = (entry.path, f"{remote_dir}/{relative_path}")
+                if scp_client is not None and entry.stat().st_size >= SCP_UPLOAD_THRESHOLD:
+                    large_transfers.append(transfer)
+                else:
+                    transfers.append(transfer)
+
+            # Create the remote tree with one command instead of a stat/mkdir per directory
+            remote_subdirs = {remote_dir} | {
+                str(Path(remote_path).parent) for _, remote_path in transfers + large_transfers
+            }
+            print(f"📁 Creating remote directory: {remote_dir}")
+            _, error = self._execute_remote_command(
+                "mkdir -p " + " ".join(shlex.quote(d) for d in sorted(remote_subdirs))
+            )
+            if error:
+                print(f"❌ Failed to create remote directories: {error}")
+                return False
 
-            sftp.close()
+            def put(worker_sftp: paramiko.SFTPClient, local_path: str, remote_path: str) -> bool:
+                print(f"📤 Uploading: {Path(local_path).relative_to(local_dir)}")
+                worker_sftp.put(local_path, remote_path)
+                return True
+
+            uploaded_files = self._run_transfers(transfers, put, concurrency)
+            if large_transfers:
+                with scp_client(self.ssh_client.get_transport(), socket_timeout=60) as scp:
+                    for local_path, remote_path in large_transfers:
+                        print(f"📤 Uploading (scp): {Path(local_path).relative_to(local_dir)}")
+                        scp.put(local_path, remote_path)
+                        uploaded_files.append(True)
             print(f"✅ Uploaded {len(uploaded_files)} files to {remote_dir}")
             return True
 
@@ -159,9 +387,26 @@ class HPCInterface:
             print(f"❌ Failed to upload files: {e}")
             return False
 
+    @staticmethod
+    def _get_prefetched(sftp: paramiko.SFTPClient, remote_path: str,
+                        local_path: str, file_size: int) -> None:
+        """Download a file with all read requests issued up front.
+
+        prefetch() keeps many block reads in flight on the channel, so large
+        outputs like CHGCAR/WAVECAR are limited by bandwidth rather than RTT.
+        Reusing the caller's stat saves the extra round trip sftp.get makes.
+        """
+        with sftp.open(remote_path, 'rb') as remote_file, open(local_path, 'wb') as local_file:
+            remote_file.prefetch(file_size)
+            while True:
+                chunk = remote_file.read(DOWNLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                local_file.write(chunk)
+
     def submit_job(self, remote_dir: str, script_name: str = "run.slurm") -> Optional[str]:
         """Submit Slurm job to HPC queue"""
-        if not self.connected:
+        if not self._ensure_connected():
             print("❌ Not connected to HPC cluster")
             return None
 
@@ -171,20 +416,26 @@ class HPCInterface:
             command = f"cd {remote_dir} && sbatch {script_name}"
 
             stdin, stdout, stderr = self.ssh_client.exec_command(command)
-            output = stdout.read().decode().strip()
+
+            # Extract job ID from sbatch output (e.g., "Submitted batch job 12345")
+            job_id = None
+            output_lines = []
+            for line in stdout:
+                if "Submitted batch job" in line:
+                    job_id = line.rsplit(None, 1)[-1]
+                    break
+                output_lines.append(line.strip())
             error = stderr.read().decode().strip()
 
             if error:
                 print(f"❌ Job submission error: {error}")
                 return None
 
-            # Extract job ID from sbatch output (e.g., "Submitted batch job 12345")
-            if "Submitted batch job" in output:
-                job_id = output.split()[-1]
+            if job_id:
                 print(f"✅ Job submitted successfully: {job_id}")
                 return job_id
             else:
-                print(f"❌ Unexpected job submission output: {output}")
+                print(f"❌ Unexpected job submission output: {' '.join(output_lines)}")
                 return None
 
         except Exception as e:
@@ -193,19 +444,20 @@ class HPCInterface:
 
     def check_job_status(self, job_id: str) -> Tuple[str, Optional[str]]:
         """Check job status in Slurm queue"""
-        if not self.connected:
+        if not self._ensure_connected():
             return "UNKNOWN", "Not connected to HPC"
 
         try:
             command = f"squeue -j {job_id} -h -o %T"
             stdin, stdout, stderr = self.ssh_client.exec_command(command)
-            status = stdout.read().decode().strip()
+            status = stdout.readline().strip()
 
             if not status:
-                # Job might be completed
+                # Job might be completed; only the first row (the allocation) matters,
+                # the rows after it are job steps
                 command = f"sacct -j {job_id} -n -o State"
                 stdin, stdout, stderr = self.ssh_client.exec_command(command)
-                final_status = stdout.read().decode().strip()
+                final_status = stdout.readline().strip()
                 return final_status or "COMPLETED", None
 
             return status, None
@@ -213,40 +465,76 @@ class HPCInterface:
         except Exception as e:
             return "ERROR", str(e)
 
-    def download_results(self, remote_dir: str, local_dir: Path) -> bool:
-        """Download calculation results from HPC cluster"""
-        if not self.connected:
+    def check_jobs_status(self, job_ids: Sequence[str]) -> Dict[str, str]:
+        """Check many jobs with one squeue call plus one sacct call for the rest"""
+        job_ids = list(dict.fromkeys(job_ids))
+        if not job_ids:
+            return {}
+        if not self._ensure_connected():
+            return {job_id: "UNKNOWN" for job_id in job_ids}
+
+        states: Dict[str, str] = {}
+        output, _ = self._execute_remote_command(
+            f"squeue -h -o '%i %T' -j {','.join(job_ids)}"
+        )
+        for line in output.splitlines():
+            fields = line.split()
+            if len(fields) >= 2:
+                states[fields[0]] = fields[1]
+
+        missing = [job_id for job_id in job_ids if job_id not in states]
+        if missing:
+            output, _ = self._execute_remote_command(
+                f"sacct -j {','.join(missing)} -n -P -o JobID,State"
+            )
+            for line in output.splitlines():
+                job_id, _, state = line.partition("|")
+                # First row per job is the allocation; later rows are job steps
+                if job_id in missing and job_id not in states and state:
+                    states[job_id] = state.split()[0]  # "CANCELLED by 123" -> "CANCELLED"
+
+        for job_id in missing:
+            states.setdefault(job_id, "COMPLETED")
+        return states
+
+    def download_results(self, remote_dir: str, local_dir: Path,
+                         concurrency: int = TRANSFER_CONCURRENCY,
+                         bulk_files: Sequence[str] = ()) -> bool:
+        """Download calculation results from HPC cluster
+
+        Bulk outputs (e.g. BULK_RESULT_FILES) are skipped unless listed in
+        ``bulk_files``, in which case they arrive through a single tar stream.
+        """
+        if not self._ensure_connected():
             print("❌ Not connected to HPC cluster")
             return False
 
         try:
-            sftp = self.ssh_client.open_sftp()
-
             # Create local directory if it doesn't exist
             local_dir.mkdir(parents=True, exist_ok=True)
 
-            # Files to download
-            result_files = [
-                "OUTCAR", "vasprun.xml", "vasp.out",
-                "PROCAR", "DOSCAR", "EIGENVAL",
-                "CHGCAR", "CHG", "WAVECAR",
-                "hashes.json", "lineage.json"
-            ]
-
-            downloaded_files = []
-            for filename in result_files:
-                remote_path = f"{remote_dir}/{filename}"
-                local_path = local_dir / filename
-
-                try:
-                    sftp.stat(remote_path)  # Check if file exists
-                    print(f"📥 Downloading: {filename}")
-                    sftp.get(remote_path, str(local_path))
-                    downloaded_files.append(filename)
-                except FileNotFoundError:
+            # One directory listing gives existence and sizes for every result file
+            sftp = self._acquire_sftp()
+            try:
+                sizes = {attr.filename: attr.st_size for attr in sftp.listdir_attr(remote_dir)}
+            finally:
+                self._release_sftp(sftp)
+
+            def get(worker_sftp: paramiko.SFTPClient, remote_path: str, local_path: str) -> bool:
+                filename = Path(local_path).name
+                print(f"📥 Downloading: {filename}")
+                self._get_prefetched(worker_sftp, remote_path, local_path, sizes[filename])
+                return True
+
+            transfers = []
+            for filename in RESULT_FILES:
+                if filename in sizes:
+                    transfers.append((f"{remote_dir}/{filename}", str(local_dir / filename)))
+                else:
                     print(f"⚠️  File not found: {filename}")
-
-            sftp.close()
+            downloaded_files = [ok for ok in self._run_transfers(transfers, get, concurrency) if ok]
+            if bulk_files:
+                downloaded_files.extend(self._download_tar_stream(remote_dir, bulk_files, local_dir))
             print(f"✅ Downloaded {len(downloaded_files)} result files")
             return True
 
@@ -254,9 +542,38 @@ class HPCInterface:
             print(f"❌ Failed to download results: {e}")
             return False
 
+    def _download_tar_stream(self, remote_dir: str, filenames: Sequence[str],
+                             local_dir: Path) -> List[str]:
+        """Pull several large files through one ``tar`` pipe on an exec channel.
+
+        Avoids per-file SFTP request framing; missing files are skipped on the
+        remote side so tar never fails on them.
+        """
+        names = " ".join(shlex.quote(name) for name in filenames)
+        command = (
+            f"cd {shlex.quote(remote_dir)} && "
+            f"for f in {names}; do [ -f \"$f\" ] && echo \"$f\"; done | tar -cf - -T -"
+        )
+        stdin, stdout, stderr = self.ssh_client.exec_command(command)
+        wanted = set(filenames)
+        extracted = []
+        with tarfile.open(fileobj=stdout, mode="r|") as archive:
+            for member in archive:
+                if not member.isfile() or member.name not in wanted:
+                    continue
+                print(f"📥 Downloading: {member.name}")
+                source = archive.extractfile(member)
+                with open(local_dir / member.name, 'wb') as target:
+                    while chunk := source.read(DOWNLOAD_CHUNK_SIZE):
+                        target.write(chunk)
+                extracted.append(member.name)
+        for name in wanted.difference(extracted):
+            print(f"⚠️  File not found: {name}")
+        return extracted
+
     def _execute_remote_command(self, command: str) -> Tuple[str, str]:
         """Execute command on remote HPC"""
-        if not self.connected:
+        if not self._ensure_connected():
             return "", "Not connected to HPC"
 
         stdin, stdout, stderr = self.ssh_client.exec_command(command)
@@ -264,29 +581,93 @@ class HPCInterface:
         error = stderr.read().decode().strip()
         return output, error
 
+    def _stream_job_status(self, job_id: str, check_interval: int) -> Optional[str]:
+        """Follow a job through a single ``squeue --iterate`` stream.
+
+        One long-lived RPC replaces a fresh SSH channel and squeue call per
+        poll. Every iteration starts with a timestamp and a header line; once
+        a full iteration passes without the job's row, or squeue writes to
+        stderr (e.g. "Invalid job id" for a purged job), the job has left the
+        queue. A stream that stays silent for several intervals is abandoned
+        too. Closing the channel ends the remote squeue on its next write.
+        Returns the last state seen, or None if the job was never listed.
+        """
+        if not self._ensure_connected():
+            return None
+
+        status = None
+        try:
+            stdin, stdout, stderr = self.ssh_client.exec_command(
+                f"squeue -i {check_interval} -j {job_id} -o '%i %T'"
+            )
+            channel = stdout.channel
+            channel.settimeout(max(check_interval, 1) * STREAM_STALL_INTERVALS)
+            # Timestamp/header lines seen since the job's last row
+            markers = 0
+            try:
+                for line in stdout:
+                    fields = line.split()
+                    if not fields:
+                        continue
+                    if fields[0] == job_id and len(fields) > 1:
+                        markers = 0
+                        if fields[1] != status:
+                            status = fields[1]
+                            print(f"📊 Job {job_id} status: {status}")
+                        if status in TERMINAL_STATES:
+                            break
+                        continue
+                    markers += 1
+                    if markers > 2 or channel.recv_stderr_ready():
+                        break
+            finally:
+                channel.close()
+        except Exception as e:
+            print(f"⚠️  squeue stream failed, falling back to polling: {e}")
+        return status
+
     def monitor_job(self, job_id: str, check_interval: int = 30) -> bool:
         """Monitor job until completion"""
         print(f"👀 Monitoring job {job_id}...")
 
-        while True:
-            status, error = self.check_job_status(job_id)
+        status = self._stream_job_status(job_id, check_interval)
+        if status in TERMINAL_STATES:
+            return status == "COMPLETED"
 
-            if error:
-                print(f"❌ Error checking job status: {error}")
-                return False
+        # Job left the queue (or the stream broke): settle the final state via sacct
+        return self.monitor_jobs([job_id], check_interval).get(job_id, False)
 
-            print(f"📊 Job {job_id} status: {status}")
+    def monitor_jobs(self, job_ids: Sequence[str], check_interval: int = 30) -> Dict[str, bool]:
+        """Monitor a batch of jobs until all finish; one squeue/sacct pair per cycle"""
+        pending = list(dict.fromkeys(job_ids))
+        results: Dict[str, bool] = {}
+        last_seen: Dict[str, str] = {}
 
-            if status in ["COMPLETED", "FAILED", "CANCELLED"]:
+        while pending:
+            try:
+                states = self.check_jobs_status(pending)
+            except Exception as e:
+                print(f"❌ Error checking job status: {e}")
+                results.update((job_id, False) for job_id in pending)
                 break
 
-            time.sleep(check_interval)
+            for job_id in pending:
+                status = states.get(job_id, "UNKNOWN")
+                if last_seen.get(job_id) != status:
+                    print(f"📊 Job {job_id} status: {status}")
+                    last_seen[job_id] = status
+                if status in TERMINAL_STATES:
+                    results[job_id] = status == "COMPLETED"
+
+            pending = [job_id for job_id in pending if job_id not in results]
+            if pending:
+                time.sleep(check_interval)
 
-        return status == "COMPLETED"
+        return results
 
     def get_hpc_info(self) -> Dict[str, str]:
         """Get HPC cluster information"""
-        if not self.connected:
+        if not self._ensure_connected():
             return {"status": "Not connected"}
 
         try:
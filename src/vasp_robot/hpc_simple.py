@@ -5,12 +5,61 @@ Simplified HPC Automation Module
 减少SSH/SCP命令的复杂性，提供更清晰的接口
 """
 
+import asyncio
+import os
+import stat
 import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
 from pathlib import Path
-from typing import Dict, Optional, Tuple, Any
+from typing import TYPE_CHECKING, Dict, Iterable, Iterator, List, Optional, Set, Tuple, Any
 from dataclasses import dataclass
 import json
 
+if TYPE_CHECKING:  # pragma: no cover - used for type hints only
+    import paramiko
+
+
+# 作业结束状态（squeue/sacct State 字段的首个单词）
+TERMINAL_STATES = frozenset({
+    "COMPLETED", "FAILED", "CANCELLED", "TIMEOUT",
+    "OUT_OF_MEMORY", "NODE_FAIL", "PREEMPTED", "BOOT_FAIL", "DEADLINE",
+})
+
+# 进程级SSH连接池：按 (host, user, port) 复用长连接，空闲超时后由后台线程回收
+_POOL: Dict[Tuple[str, str, int], Tuple["paramiko.SSHClient", float]] = {}
+_POOL_LOCK = threading.Lock()
+_POOL_IDLE_TIMEOUT = 600.0
+# 通道窗口取RFC 4254允许的最大值，SFTP不再因等待窗口调整而停顿
+TRANSPORT_WINDOW_SIZE = 2 ** 31 - 1
+# 推迟大文件传输期间的密钥重协商
+TRANSPORT_REKEY_LIMIT = 2 ** 40
+_reaper_thread: Optional[threading.Thread] = None
+
+
+def _reap_idle_connections() -> None:
+    """后台线程：关闭空闲超时的连接"""
+    while True:
+        time.sleep(_POOL_IDLE_TIMEOUT / 4)
+        now = time.monotonic()
+        with _POOL_LOCK:
+            idle = [key for key, (_, last_used) in _POOL.items() if now - last_used > _POOL_IDLE_TIMEOUT]
+            clients = [_POOL.pop(key)[0] for key in idle]
+        for client in clients:
+            client.close()
+
+
+def sftp_path(path: str) -> str:
+    """SFTP不展开 ~，会话默认位于家目录，转为相对路径"""
+    path = str(path)
+    if path == "~":
+        return "."
+    if path.startswith("~/"):
+        return path[2:]
+    return path
+
 
 @dataclass
 class HPCConnection:
@@ -20,6 +69,7 @@ class HPCConnection:
     port: int = 22
     timeout: int = 30
     strict_host_key: bool = False
+    control_persist: Optional[str] = "10m"  # ControlMaster空闲保持时间，None表示不复用连接
 
 
 @dataclass
@@ -30,6 +80,13 @@ class HPCJob:
     status: str = "PENDING"
     submit_time: Optional[str] = None
 
+    def refresh_status(self, cache: "SlurmStatusCache") -> Optional[str]:
+        """从批量状态缓存刷新作业状态"""
+        status = cache.get(self.job_id)
+        if status is not None:
+            self.status = status
+        return status
+
 
 class SimpleHPCClient:
     """简化的HPC客户端"""
@@ -37,6 +94,155 @@ class SimpleHPCClient:
     def __init__(self, connection: HPCConnection):
         """初始化客户端"""
         self.conn = connection
+        self._pool_key = (connection.host, connection.user, connection.port)
+        self._use_pool = True
+        # 长连接上保持的SFTP会话，多次传输复用同一通道
+        self._sftp: Optional["paramiko.SFTPClient"] = None
+        self._sftp_lock = threading.Lock()
+        self._control_path: Optional[str] = None
+        mux_opts: Tuple[str, ...] = ()
+        # config_manager.HPCConfig 也可作为连接配置传入，它没有 control_persist 字段
+        control_persist = getattr(connection, "control_persist", "10m")
+        if control_persist:
+            # OpenSSH ControlMaster只用于paramiko不可用时的ssh/scp子进程回退路径，
+            # 连接池可用时不会建立主连接。ControlPath不用占位符，close()据此判断是否需要关闭
+            ssh_dir = Path.home() / ".ssh"
+            ssh_dir.mkdir(mode=0o700, exist_ok=True)
+            self._control_path = str(ssh_dir / f"cm-{connection.user}@{connection.host}:{connection.port}")
+            mux_opts = (
+                "-o", "ControlMaster=auto",
+                "-o", f"ControlPath={self._control_path}",
+                "-o", f"ControlPersist={control_persist}",
+            )
+
+        # ssh/scp公共参数只构建一次，每次调用只需拼接命令本身
+        self._dest = f"{connection.user}@{connection.host}"
+        self._ssh_common_opts = (
+            "-o", f"StrictHostKeyChecking={'yes' if connection.strict_host_key else 'no'}",
+            *mux_opts,
+        )
+        self._ssh_base_opts = (
+            "-o", f"ConnectTimeout={connection.timeout}",
+            *self._ssh_common_opts,
+            "-p", str(connection.port),
+        )
+        self._scp_base_opts = (
+            "-r",
+            "-o", f"ConnectTimeout={connection.timeout}",
+            *self._ssh_common_opts,
+            "-P", str(connection.port),
+        )
+
+    def get_client(self) -> Optional["paramiko.SSHClient"]:
+        """获取连接池中的paramiko长连接，paramiko不可用或连接失败时返回None"""
+        global _reaper_thread
+        if not self._use_pool:
+            return None
+        try:
+            import paramiko
+        except ImportError:
+            self._use_pool = False
+            return None
+
+        with _POOL_LOCK:
+            cached = _POOL.get(self._pool_key)
+            if cached is not None:
+                client = cached[0]
+                transport = client.get_transport()
+                if transport is not None and transport.is_active():
+                    _POOL[self._pool_key] = (client, time.monotonic())
+                    return client
+                del _POOL[self._pool_key]
+                client.close()
+
+        client = paramiko.SSHClient()
+        client.load_system_host_keys()
+        if self.conn.strict_host_key:
+            client.set_missing_host_key_policy(paramiko.RejectPolicy())
+        else:
+            client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        try:
+            client.connect(
+                self.conn.host,
+                port=self.conn.port,
+                username=self.conn.user,
+                timeout=self.conn.timeout,
+            )
+        except Exception:
+            # 认证或网络失败时不再重试，后续命令回退到ssh子进程
+            client.close()
+            self._use_pool = False
+            return None
+
+        # 窗口大小在通道打开时协商，必须在打开SFTP等通道之前设置
+        transport = client.get_transport()
+        if transport is not None:
+            transport.default_window_size = TRANSPORT_WINDOW_SIZE
+            transport.packetizer.REKEY_BYTES = TRANSPORT_REKEY_LIMIT
+            transport.packetizer.REKEY_PACKETS = TRANSPORT_REKEY_LIMIT
+
+        with _POOL_LOCK:
+            cached = _POOL.get(self._pool_key)
+            if cached is not None:
+                # 其他线程已先建立连接，沿用已有连接
+                client.close()
+                client = cached[0]
+            _POOL[self._pool_key] = (client, time.monotonic())
+            if _reaper_thread is None:
+                _reaper_thread = threading.Thread(target=_reap_idle_connections, daemon=True)
+                _reaper_thread.start()
+        return client
+
+    def _drop_client(self, client: "paramiko.SSHClient") -> None:
+        """连接已失效时将其移出连接池并关闭
+
+        传输仍然存活时不做任何处理（其他调用方可能正在使用）；池中已换成
+        其他线程新建的连接时也不移除。
+        """
+        transport = client.get_transport()
+        if transport is not None and transport.is_active():
+            return
+        with _POOL_LOCK:
+            cached = _POOL.get(self._pool_key)
+            if cached is not None and cached[0] is client:
+                del _POOL[self._pool_key]
+        client.close()
+
+    def _get_sftp(self, client: "paramiko.SSHClient") -> "paramiko.SFTPClient":
+        """返回长连接上的SFTP会话，通道失效或连接更换时重新打开"""
+        sftp = self._sftp
+        if sftp is not None:
+            channel = sftp.get_channel()
+            if channel is not None and not channel.closed and channel.get_transport() is client.get_transport():
+                return sftp
+            sftp.close()
+        self._sftp = client.open_sftp()
+        return self._sftp
+
+    @contextmanager
+    def sftp_session(self, client: "paramiko.SSHClient") -> Iterator["paramiko.SFTPClient"]:
+        """独占长连接上的SFTP会话；SFTP会话不是线程安全的，同一客户端的传输串行进行"""
+        with self._sftp_lock:
+            yield self._get_sftp(client)
+
+    def close(self) -> None:
+        """关闭本实例的SFTP会话和ControlMaster主连接（如已建立）
+
+        连接池中的长连接由所有同目标的实例共享，不在此关闭，空闲超时后由
+        后台线程回收。
+        """
+        if self._sftp is not None:
+            self._sftp.close()
+            self._sftp = None
+        if self._control_path is None or not os.path.exists(self._control_path):
+            return
+        cmd = [
+            "ssh", "-O", "exit",
+            "-o", f"ControlPath={self._control_path}",
+            "-p", str(self.conn.port),
+            self._dest,
+        ]
+        self._execute_subprocess(cmd, timeout=10)
 
     def test_connection(self) -> Tuple[bool, str]:
         """测试HPC连接"""
@@ -87,44 +293,130 @@ class SimpleHPCClient:
         return success
 
     def _run_command(self, command: str, timeout: Optional[int] = None) -> Tuple[bool, str]:
-        """执行SSH命令"""
+        """执行SSH命令，优先使用连接池中的长连接"""
+        client = self.get_client()
+        if client is not None:
+            return self.exec_on_client(client, command, timeout)
+
         ssh_cmd = self._build_ssh_command(command, timeout)
         return self._execute_subprocess(ssh_cmd)
 
+    def exec_on_client(self, client: "paramiko.SSHClient", command: str,
+                        timeout: Optional[int] = None) -> Tuple[bool, str]:
+        """在paramiko长连接上执行命令（直接打开会话通道，不fork子进程）"""
+        timeout = timeout or self.conn.timeout
+        try:
+            transport = client.get_transport()
+            channel = transport.open_session(timeout=timeout)
+            try:
+                channel.settimeout(timeout)
+                channel.exec_command(command)
+                output = channel.makefile("rb").read().decode("utf-8", errors="replace")
+                error = channel.makefile_stderr("rb").read().decode("utf-8", errors="replace")
+                exit_status = channel.recv_exit_status()
+            finally:
+                channel.close()
+            if exit_status == 0:
+                return True, output.strip()
+            return False, error.strip()
+        except TimeoutError:
+            return False, "Command timeout"
+        except Exception as e:
+            # 连接确已失效时移出连接池，下次调用重新建立
+            self._drop_client(client)
+            return False, f"Command error: {str(e)}"
+
     def _transfer_files(self, source: str, destination: str, upload: bool) -> bool:
-        """传输文件"""
+        """传输文件，优先通过长连接上的SFTP会话
+
+        上传时 source 可以是文件（放入远程目录）或目录（只复制其内容）；下载时
+        source 为远程目录，复制其内容。SFTP和scp两条路径产生相同的目录布局。
+        """
+        if upload and not Path(source).exists():
+            print(f"❌ 本地路径不存在: {source}")
+            return False
+
+        client = self.get_client()
+        if client is not None:
+            try:
+                with self.sftp_session(client) as sftp:
+                    if upload:
+                        self._sftp_upload(sftp, Path(source), sftp_path(destination))
+                    else:
+                        self._sftp_download(sftp, sftp_path(source), Path(destination))
+                return True
+            except Exception as e:
+                print(f"⚠️ SFTP传输失败，回退到scp: {e}")
+                with self._sftp_lock:
+                    if self._sftp is not None:
+                        self._sftp.close()
+                        self._sftp = None
+                self._drop_client(client)
+
         scp_cmd = self._build_scp_command(source, destination, upload)
+        if scp_cmd is None:
+            return True  # 空目录，没有需要复制的内容
+        if not upload:
+            Path(destination).mkdir(parents=True, exist_ok=True)
         success, _ = self._execute_subprocess(scp_cmd, timeout=600)
         return success
 
+    @staticmethod
+    def _sftp_upload(sftp: "paramiko.SFTPClient", local_path: Path, remote_dir: str) -> None:
+        """上传单个文件到远程目录，或递归上传本地目录的内容"""
+        if not local_path.is_dir():
+            with open(local_path, "rb") as handle:
+                sftp.putfo(handle, f"{remote_dir}/{local_path.name}")
+            return
+
+        for root, dirs, files in os.walk(local_path):
+            rel = os.path.relpath(root, local_path)
+            target = remote_dir if rel == "." else f"{remote_dir}/{Path(rel).as_posix()}"
+            for name in dirs:
+                try:
+                    sftp.mkdir(f"{target}/{name}")
+                except IOError:
+                    pass  # 目录已存在
+            for name in files:
+                # putfo 在同一通道上流水线发送写请求，不必逐块等待确认
+                with open(os.path.join(root, name), "rb") as handle:
+                    sftp.putfo(handle, f"{target}/{name}")
+
+    @classmethod
+    def _sftp_download(cls, sftp: "paramiko.SFTPClient", remote_dir: str, local_dir: Path) -> None:
+        """递归下载远程目录内容到本地目录"""
+        local_dir.mkdir(parents=True, exist_ok=True)
+        for attr in sftp.listdir_attr(remote_dir):
+            remote_path = f"{remote_dir}/{attr.filename}"
+            if stat.S_ISDIR(attr.st_mode or 0):
+                cls._sftp_download(sftp, remote_path, local_dir / attr.filename)
+            else:
+                with open(local_dir / attr.filename, "wb") as handle:
+                    sftp.getfo(remote_path, handle)
+
     def _build_ssh_command(self, command: str, timeout: Optional[int] = None) -> list:
         """构建SSH命令"""
-        ssh_opts = [
-            "-o", f"ConnectTimeout={timeout or self.conn.timeout}",
-            "-o", f"StrictHostKeyChecking={'yes' if self.conn.strict_host_key else 'no'}",
-            "-p", str(self.conn.port)
-        ]
-
-        return [
-            "ssh",
-            *ssh_opts,
-            f"{self.conn.user}@{self.conn.host}",
-            command
-        ]
-
-    def _build_scp_command(self, source: str, destination: str, upload: bool) -> list:
-        """构建SCP命令"""
-        scp_opts = [
-            "-r",
-            "-o", f"ConnectTimeout={self.conn.timeout}",
-            "-o", f"StrictHostKeyChecking={'yes' if self.conn.strict_host_key else 'no'}",
-            "-P", str(self.conn.port)
-        ]
-
+        if timeout and timeout != self.conn.timeout:
+            return [
+                "ssh", "-o", f"ConnectTimeout={timeout}", *self._ssh_common_opts,
+                "-p", str(self.conn.port), self._dest, command
+            ]
+        return ["ssh", *self._ssh_base_opts, self._dest, command]
+
+    def _build_scp_command(self, source: str, destination: str, upload: bool) -> Optional[list]:
+        """构建SCP命令，本地目录为空时返回None
+
+        ``scp -r dir host:dst`` 会在已存在的 dst 下再嵌套一层 dir，因此目录逐项
+        列出其内容（下载时用远程通配符），与SFTP路径的布局保持一致。
+        """
         if upload:
-            return ["scp", *scp_opts, str(source), f"{self.conn.user}@{self.conn.host}:{destination}"]
+            local = Path(source)
+            sources = sorted(str(entry) for entry in local.iterdir()) if local.is_dir() else [str(local)]
+            if not sources:
+                return None
+            return ["scp", *self._scp_base_opts, *sources, f"{self._dest}:{destination}"]
         else:
-            return ["scp", *scp_opts, f"{self.conn.user}@{self.conn.host}:{source}", str(destination)]
+            return ["scp", *self._scp_base_opts, f"{self._dest}:{source}/*", str(destination)]
 
     def _execute_subprocess(self, cmd: list, timeout: Optional[int] = None) -> Tuple[bool, str]:
         """执行子进程命令"""
@@ -147,6 +439,77 @@ class SimpleHPCClient:
             return False, f"Command error: {str(e)}"
 
 
+class SlurmStatusCache:
+    """Slurm作业状态缓存
+
+    每隔 interval 秒用一条 ``squeue -j id1,id2,...`` 查询所有仍在跟踪的作业，
+    期间的状态查询直接由缓存应答，避免每个作业各发一次SSH请求。作业离开队列
+    或进入结束状态后不再参与查询，其最终状态保留在缓存中。
+    """
+
+    def __init__(self, client: SimpleHPCClient, interval: float = 30.0):
+        self.client = client
+        self.interval = interval
+        self._known_ids: Set[str] = set()
+        self._last: Dict[str, str] = {}
+        # 已结束作业的最终状态：作业ID -> 状态
+        self._final: Dict[str, str] = {}
+        self._ts: Optional[float] = None
+        # 多个线程（如asyncio.to_thread中的监控协程）同时查询时只刷新一次
+        self._lock = threading.Lock()
+
+    def register(self, job_ids: Iterable[str]) -> None:
+        """登记需要跟踪的作业ID（已结束的作业忽略）"""
+        new_ids = set(job_ids) - self._known_ids - self._final.keys()
+        if new_ids:
+            self._known_ids.update(new_ids)
+            # 新作业尚无状态，下次查询时强制刷新
+            self._ts = None
+
+    def invalidate(self) -> None:
+        """使缓存失效"""
+        self._ts = None
+
+    def get(self, job_id: str) -> Optional[str]:
+        """获取作业状态，缓存过期时批量刷新"""
+        with self._lock:
+            final = self._final.get(job_id)
+            if final is not None:
+                return final
+            self.register([job_id])
+            if self._ts is None or time.monotonic() - self._ts > self.interval:
+                self._refresh()
+            return self._last.get(job_id)
+
+    def _refresh(self) -> None:
+        """一次squeue调用刷新所有仍在跟踪的作业状态"""
+        job_ids = sorted(self._known_ids)
+        if not job_ids:
+            self._last = {}
+            self._ts = time.monotonic()
+            return
+        cmd = f"squeue -h -o '%i %T' -j {','.join(job_ids)}"
+        success, output = self.client._run_command(cmd)
+        self._ts = time.monotonic()
+
+        if not success:
+            self._last = {}
+            return
+
+        statuses: Dict[str, str] = {}
+        for line in output.splitlines():
+            parts = line.split()
+            if len(parts) >= 2:
+                statuses[parts[0]] = parts[1]
+
+        # 不在队列中的作业视为已结束，与get_job_status的约定一致
+        self._last = {job_id: statuses.get(job_id, "COMPLETED") for job_id in job_ids}
+        for job_id, status in self._last.items():
+            if job_id not in statuses or status in TERMINAL_STATES:
+                self._known_ids.discard(job_id)
+                self._final[job_id] = status
+
+
 class VASPHPCManager:
     """VASP HPC管理器 - 高级接口"""
 
@@ -154,6 +517,7 @@ class VASPHPCManager:
         """初始化管理器"""
         self.client = SimpleHPCClient(connection)
         self.work_dir = work_dir
+        self.status_cache = SlurmStatusCache(self.client)
 
     def prepare_and_submit(self, job_dir: Path, job_name: str) -> Optional[HPCJob]:
         """准备并提交作业"""
@@ -187,19 +551,17 @@ class VASPHPCManager:
             job_dir=remote_job_dir,
             status="PENDING"
         )
+        self.status_cache.register([slurm_job_id])
 
         print(f"✅ 作业提交成功 (Slurm ID: {slurm_job_id})")
         return job
 
     def monitor_job(self, job: HPCJob, check_interval: int = 60) -> bool:
         """监控作业状态"""
-        import time
-        from datetime import datetime
-
         print(f"👀 监控作业 {job.job_id}...")
 
         while True:
-            status = self.client.get_job_status(job.job_id)
+            status = job.refresh_status(self.status_cache)
             if status is None:
                 print("❌ 无法获取作业状态")
                 return False
@@ -216,6 +578,57 @@ class VASPHPCManager:
 
             time.sleep(check_interval)
 
+    async def prepare_and_submit_async(self, job_dir: Path, job_name: str) -> Optional[HPCJob]:
+        """prepare_and_submit 的异步版本，阻塞的SSH操作在线程中执行"""
+        return await asyncio.to_thread(self.prepare_and_submit, job_dir, job_name)
+
+    async def monitor_job_async(self, job: HPCJob, check_interval: int = 60) -> bool:
+        """异步监控作业状态
+
+        等待期间让出事件循环；多个作业并发监控时共用 status_cache，
+        每个缓存周期只发一次批量squeue。
+        """
+        print(f"👀 监控作业 {job.job_id}...")
+
+        while True:
+            status = await asyncio.to_thread(job.refresh_status, self.status_cache)
+            if status is None:
+                print("❌ 无法获取作业状态")
+                return False
+
+            print(f"[{job.job_id}] 作业状态: {status}")
+
+            if status == "COMPLETED":
+                print(f"✅ 作业 {job.job_id} 完成!")
+                return True
+            elif status in ["FAILED", "CANCELLED", "TIMEOUT"]:
+                print(f"❌ 作业 {job.job_id} 失败: {status}")
+                return False
+
+            await asyncio.sleep(check_interval)
+
+    async def run_jobs_async(
+        self,
+        jobs: Iterable[Tuple[Path, str]],
+        check_interval: int = 60
+    ) -> List[bool]:
+        """并发提交并监控多个作业，一个作业的上传可与另一个作业的轮询重叠
+
+        Args:
+            jobs: (本地作业目录, 作业名) 列表
+            check_interval: 状态检查间隔（秒）
+
+        Returns:
+            与 jobs 顺序一致的完成情况列表
+        """
+        async def run_one(job_dir: Path, job_name: str) -> bool:
+            job = await self.prepare_and_submit_async(job_dir, job_name)
+            if job is None:
+                return False
+            return await self.monitor_job_async(job, check_interval)
+
+        return list(await asyncio.gather(*(run_one(job_dir, job_name) for job_dir, job_name in jobs)))
+
     def download_results(self, job: HPCJob, local_dir: Path) -> bool:
         """下载计算结果"""
         print(f"📥 下载结果到: {local_dir}")
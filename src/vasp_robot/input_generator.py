@@ -5,10 +5,96 @@ Simplified VASP Input File Generator
 统一处理所有VASP输入文件的生成，减少重复代码
 """
 
+import os
+from functools import lru_cache
 from pathlib import Path
-from typing import Dict, Any, Optional
-from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple
+from dataclasses import asdict, dataclass
 import json
+try:  # 可选依赖：orjson 直接输出字节串，序列化速度是标准库的数倍
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def _dumps_indented(data: Any) -> bytes:
+    """序列化为带缩进的JSON字节串"""
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _write_bytes(path: Path, data: bytes) -> None:
+    """直接写文件描述符，省去文本层的编码和缓冲开销"""
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view):]
+    finally:
+        os.close(fd)
+
+
+@lru_cache(maxsize=64)
+def _calc_template(calc_type: str) -> Tuple[Mapping[str, Any], Mapping[str, Any]]:
+    """按计算类型构建INCAR/KPOINTS模板（只读），批量扫描时只构建一次"""
+    # 基础INCAR设置
+    incar = {
+        "ENCUT": 520,
+        "EDIFF": 1E-6,
+        "ISMEAR": 0,
+        "SIGMA": 0.05,
+        "LCHARG": False,
+        "LWAVE": False
+    }
+
+    # 根据计算类型调整参数
+    if calc_type == "relax":
+        incar.update({
+            "IBRION": 2,
+            "NSW": 100,
+            "EDIFFG": -0.01,
+            "ISIF": 3
+        })
+    elif calc_type == "scf":
+        incar.update({
+            "IBRION": -1,
+            "NSW": 0,
+            "NELM": 100
+        })
+    elif calc_type == "band":
+        incar.update({
+            "IBRION": -1,
+            "NSW": 0,
+            "ICHARG": 11
+        })
+    elif calc_type == "dos":
+        incar.update({
+            "IBRION": -1,
+            "NSW": 0,
+            "ISMEAR": -5,
+            "SIGMA": 0.05,
+            "NEDOS": 2000
+        })
+
+    # KPOINTS设置
+    kpoints: Dict[str, Any] = {
+        "mode": "Monkhorst-Pack",
+        "grid": (6, 6, 6)
+    }
+
+    if calc_type in ["band", "dos"]:
+        # 能带和DOS需要更密的k点
+        kpoints["grid"] = (12, 12, 12)
+
+    if calc_type == "band":
+        kpoints = {
+            "mode": "Line-mode",
+            "path": None  # 需要根据结构生成
+        }
+
+    return MappingProxyType(incar), MappingProxyType(kpoints)
 
 
 @dataclass
@@ -23,6 +109,23 @@ class VASPInputSpec:
 class VASPInputGenerator:
     """VASP输入文件生成器 - 简化版"""
 
+    # 按重要性排序的INCAR参数，类级常量只构建一次
+    PRIORITY_ORDER = (
+        "SYSTEM", "ENCUT", "EDIFF", "EDIFFG", "ISMEAR", "SIGMA",
+        "IBRION", "NSW", "ISIF", "NELM", "NELMIN", "ALGO",
+        "LCHARG", "LWAVE", "PREC"
+    )
+    _PRIORITY_SET = frozenset(PRIORITY_ORDER)
+    _INCAR_HEADER = ("VASP INCAR file", "=" * 20)
+
+    # KPOINTS模板，类加载时构建一次
+    _AUTO_MESH_TMPL = "Automatic mesh\n0\n{mode}\n{a} {b} {c} 0 0 0\n"
+    _DEFAULT_KPOINTS_PATH = """Line-mode
+40
+Reciprocal
+# K-point path should be provided based on material structure
+"""
+
     def __init__(self, default_incar: Optional[Dict[str, Any]] = None):
         """初始化生成器"""
         self.default_incar = default_incar or {}
@@ -43,46 +146,49 @@ class VASPInputGenerator:
 
         # 生成INCAR
         incar_path = output_dir / "INCAR"
-        incar_path.write_text(self._generate_incar(spec.incar))
+        _write_bytes(incar_path, self._render_incar_bytes(spec.incar))
         generated_files["INCAR"] = incar_path
 
         # 生成KPOINTS
         kpoints_path = output_dir / "KPOINTS"
-        kpoints_path.write_text(self._generate_kpoints(spec.kpoints))
+        _write_bytes(kpoints_path, self._generate_kpoints(spec.kpoints).encode("utf-8"))
         generated_files["KPOINTS"] = kpoints_path
 
         # 保存输入规范
         spec_path = output_dir / "input_spec.json"
-        spec_path.write_text(json.dumps(spec.__dict__, indent=2))
+        _write_bytes(spec_path, _dumps_indented(asdict(spec)))
         generated_files["input_spec.json"] = spec_path
 
         return generated_files
 
     def _generate_incar(self, incar_params: Dict[str, Any]) -> str:
         """生成INCAR文件内容"""
+        return self._render_incar_bytes(incar_params).decode("utf-8")
+
+    def _render_incar_bytes(self, incar_params: Dict[str, Any]) -> bytes:
+        """渲染INCAR为字节串，相同参数（含顺序）的结果会被复用"""
         # 合并默认参数
         merged_params = {**self.default_incar, **incar_params}
-
-        lines = ["VASP INCAR file", "=" * 20]
-
-        # 按重要性排序的参数
-        priority_order = [
-            "SYSTEM", "ENCUT", "EDIFF", "EDIFFG", "ISMEAR", "SIGMA",
-            "IBRION", "NSW", "ISIF", "NELM", "NELMIN", "ALGO",
-            "LCHARG", "LWAVE", "PREC"
-        ]
-
-        # 添加优先参数
-        for key in priority_order:
-            if key in merged_params:
-                lines.append(f"{key} = {merged_params[key]}")
-
-        # 添加其他参数
-        for key, value in merged_params.items():
-            if key not in priority_order:
-                lines.append(f"{key} = {value}")
-
-        return "\n".join(lines) + "\n"
+        items = tuple(merged_params.items())
+        try:
+            # 键中带上值的类型，避免 True/1/1.0 这类相等值共用同一缓存结果
+            return self._render_incar_cached(tuple((key, type(value), value) for key, value in items))
+        except TypeError:
+            # 参数值不可哈希（如MAGMOM列表），直接渲染不缓存
+            return self._render_incar(items)
+
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _render_incar_cached(cls, typed_items: Tuple[Tuple[str, type, Any], ...]) -> bytes:
+        return cls._render_incar(tuple((key, value) for key, _, value in typed_items))
+
+    @classmethod
+    def _render_incar(cls, items: Tuple[Tuple[str, Any], ...]) -> bytes:
+        merged_params = dict(items)
+        # 先输出优先参数，再按原顺序输出其余参数，最后一次性拼接
+        head = [f"{key} = {merged_params[key]}" for key in cls.PRIORITY_ORDER if key in merged_params]
+        tail = [f"{key} = {value}" for key, value in items if key not in cls._PRIORITY_SET]
+        return "\n".join([*cls._INCAR_HEADER, *head, *tail, ""]).encode("utf-8")
 
     def _generate_kpoints(self, kpoints_params: Dict[str, Any]) -> str:
         """生成KPOINTS文件内容"""
@@ -98,20 +204,11 @@ class VASPInputGenerator:
             return self._generate_kpoints_path(kpoints_params)
 
         # 自动网格模式
-        return f"""Automatic mesh
-0
-{mode}
-{grid[0]} {grid[1]} {grid[2]} 0 0 0
-"""
+        return self._AUTO_MESH_TMPL.format_map({"mode": mode, "a": grid[0], "b": grid[1], "c": grid[2]})
 
     def _generate_kpoints_path(self, kpoints_params: Dict[str, Any]) -> str:
         """生成K点路径（用于能带计算）"""
-        default_path = """Line-mode
-40
-Reciprocal
-# K-point path should be provided based on material structure
-"""
-        return kpoints_params.get("path", default_path)
+        return kpoints_params.get("path", self._DEFAULT_KPOINTS_PATH)
 
     def create_job_specification(
         self,
@@ -132,65 +229,19 @@ Reciprocal
         Returns:
             VASP输入规范
         """
-        # 基础INCAR设置
-        base_incar = {
-            "SYSTEM": f"{material} - {calc_type}",
-            "ENCUT": 520,
-            "EDIFF": 1E-6,
-            "ISMEAR": 0,
-            "SIGMA": 0.05,
-            "LCHARG": False,
-            "LWAVE": False
-        }
+        template_incar, template_kpoints = _calc_template(calc_type)
 
-        # 根据计算类型调整参数
-        if calc_type == "relax":
-            base_incar.update({
-                "IBRION": 2,
-                "NSW": 100,
-                "EDIFFG": -0.01,
-                "ISIF": 3
-            })
-        elif calc_type == "scf":
-            base_incar.update({
-                "IBRION": -1,
-                "NSW": 0,
-                "NELM": 100
-            })
-        elif calc_type == "band":
-            base_incar.update({
-                "IBRION": -1,
-                "NSW": 0,
-                "ICHARG": 11
-            })
-        elif calc_type == "dos":
-            base_incar.update({
-                "IBRION": -1,
-                "NSW": 0,
-                "ISMEAR": -5,
-                "SIGMA": 0.05,
-                "NEDOS": 2000
-            })
+        # 基础INCAR设置（SYSTEM随材料变化，不在模板中）
+        base_incar = {"SYSTEM": f"{material} - {calc_type}", **template_incar}
 
         # 应用覆盖参数
         if incar_overrides:
             base_incar.update(incar_overrides)
 
-        # KPOINTS设置
-        base_kpoints = {
-            "mode": "Monkhorst-Pack",
-            "grid": [6, 6, 6]
-        }
-
-        if calc_type in ["band", "dos"]:
-            # 能带和DOS需要更密的k点
-            base_kpoints["grid"] = [12, 12, 12]
-
-        if calc_type == "band":
-            base_kpoints = {
-                "mode": "Line-mode",
-                "path": None  # 需要根据结构生成
-            }
+        # KPOINTS设置，grid在模板中为元组，这里复制为列表
+        base_kpoints = dict(template_kpoints)
+        if "grid" in base_kpoints:
+            base_kpoints["grid"] = list(base_kpoints["grid"])
 
         # 应用KPOINTS覆盖
         if kpoints_override:
@@ -0,0 +1,136 @@
+"""
+LLM响应缓存 - 对相同提示词的重复调用直接返回磁盘上的历史结果
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Optional, Union
+
+if TYPE_CHECKING:  # pragma: no cover - used for type hints only
+    from .conversation import ConversationManager
+
+DEFAULT_CACHE_DIR = Path("~/.cache/vasp_robot/llm")
+DEFAULT_TTL = 86400  # 秒，缓存条目有效期一天
+# 默认只缓存确定性（temperature=0）的调用，更高温度的采样结果不应被当作固定答案复用
+DEFAULT_MAX_TEMPERATURE = 0.0
+
+
+class LLMCache:
+    """基于内容哈希的LLM响应缓存（精确匹配）
+
+    键为 sha256(model, system_prompt, history, prompt, temperature)，每个条目存为
+    ``<cache_dir>/<key>.json``；只缓存成功的响应。system_prompt 取实际发送的
+    提示词文本，history 为调用前的对话历史（API视图），提示词文件修改后或同一
+    提示词在不同上下文中都不会命中旧结果。temperature 高于 ``max_temperature``
+    的调用直接透传，不读写缓存。缓存目录在首次写入时创建。
+    """
+
+    def __init__(
+        self,
+        cache_dir: Union[str, Path, None] = None,
+        ttl: int = DEFAULT_TTL,
+        max_temperature: float = DEFAULT_MAX_TEMPERATURE,
+    ):
+        self.cache_dir = Path(cache_dir or DEFAULT_CACHE_DIR).expanduser()
+        self.ttl = ttl
+        self.max_temperature = max_temperature
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(
+        system_prompt: Optional[str],
+        prompt: str,
+        temperature: float,
+        model: Optional[str] = None,
+        history: Iterable[Dict[str, str]] = (),
+    ) -> str:
+        """计算缓存键"""
+        payload = json.dumps(
+            {"m": model, "sp": system_prompt, "h": list(history), "u": prompt, "t": temperature},
+            ensure_ascii=False,
+            sort_keys=True,
+            separators=(",", ":"),
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """读取缓存条目，不存在或已过期时返回None"""
+        path = self.cache_dir / f"{key}.json"
+        try:
+            entry = json.loads(path.read_bytes())
+        except (OSError, ValueError):
+            self.misses += 1
+            return None
+
+        if entry.get("expires", 0) < time.time():
+            path.unlink(missing_ok=True)
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return entry.get("value")
+
+    def set(self, key: str, value: Dict[str, Any], ttl: Optional[int] = None) -> None:
+        """写入缓存条目（每次写入独立的临时文件再原子替换，并发写同一键互不干扰）"""
+        entry = {"expires": time.time() + (self.ttl if ttl is None else ttl), "value": value}
+        path = self.cache_dir / f"{key}.json"
+        try:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=path.name + ".", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as handle:
+                    handle.write(json.dumps(entry, ensure_ascii=False))
+                os.replace(tmp_path, path)
+            except BaseException:
+                try:
+                    os.unlink(tmp_path)
+                except FileNotFoundError:
+                    pass
+                raise
+        except OSError as e:
+            print(f"⚠️ 写入LLM缓存失败: {e}")
+
+    def chat(
+        self,
+        conversation_manager: "ConversationManager",
+        input_text: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+    ) -> Dict[str, Any]:
+        """带缓存的 ``ConversationManager.chat``，命中时结果带 ``cached=True``
+
+        命中时同样把用户消息和缓存的回复追加到对话历史，与实际调用API的效果一致。
+        """
+        if temperature > self.max_temperature:
+            result = conversation_manager.chat(
+                input_text=input_text,
+                system_prompt=system_prompt,
+                temperature=temperature,
+            )
+            return {**result, "cached": False}
+
+        key = self.make_key(
+            conversation_manager.resolve_system_prompt(system_prompt),
+            input_text,
+            temperature,
+            model=conversation_manager.default_model,
+            history=conversation_manager.api_history(),
+        )
+        cached = self.get(key)
+        if cached is not None:
+            conversation_manager.record_exchange(input_text, cached["response"])
+            return {**cached, "response_time": 0.0, "cached": True}
+
+        result = conversation_manager.chat(
+            input_text=input_text,
+            system_prompt=system_prompt,
+            temperature=temperature,
+        )
+        if result.get("status") == "success":
+            self.set(key, result)
+        return {**result, "cached": False}
@@ -3,17 +3,93 @@
 from __future__ import annotations
 
 import asyncio
+import copy
 import hashlib
 import json
 import os
+import tempfile
+import threading
+from collections import OrderedDict
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
 
 from .conversation import ConversationManager
 from .settings import Settings, get_settings
 from .subagents import ClaudeSubagentManager
 
+try:  # Optional: orjson is several times faster than the stdlib codec
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+_JSON_DECODER = json.JSONDecoder()
+# Empty SHA-256 state; copy() skips the per-call OpenSSL digest lookup and init
+_SHA256_SEED = hashlib.sha256()
+
+# Rendered INCAR/KPOINTS/run.slurm text, shared by jobs with identical inputs
+_RENDER_CACHE: "OrderedDict[Tuple[str, str], str]" = OrderedDict()
+_RENDER_CACHE_SIZE = 256
+_RENDER_LOCK = threading.Lock()
+
+
+def _dumps_indented(data: Any) -> bytes:
+    """Serialise ``data`` like ``json.dumps(data, indent=2)``, as UTF-8 bytes.
+
+    orjson produces bytes directly, so the manifest is written without a
+    decode/encode round trip.
+    """
+
+    if orjson is not None:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+
+def _memoized_render(kind: str, key: str, render: Callable[[], str]) -> str:
+    """Return the cached rendering for ``(kind, key)``, calling ``render`` on a miss.
+
+    Keys are ``repr`` strings: unlike a JSON dump they keep key order and
+    tell ``True``/``1``/``1.0`` and tuples/lists apart, all of which change
+    the rendered text.
+    """
+
+    cache_key = (kind, key)
+    with _RENDER_LOCK:
+        cached = _RENDER_CACHE.get(cache_key)
+        if cached is not None:
+            _RENDER_CACHE.move_to_end(cache_key)
+            return cached
+
+    content = render()
+    with _RENDER_LOCK:
+        _RENDER_CACHE[cache_key] = content
+        if len(_RENDER_CACHE) > _RENDER_CACHE_SIZE:
+            _RENDER_CACHE.popitem(last=False)
+    return content
+
+
+def _extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """Return the first JSON object embedded in ``text``.
+
+    Decodes in place from each ``{`` with the C-accelerated scanner, so prose
+    or code fences after the object cannot push a greedy match past its end.
+    """
+
+    stripped = text.strip()
+    if orjson is not None and stripped.startswith("{") and stripped.endswith("}"):
+        try:  # Fast path: the whole reply is the JSON object
+            return orjson.loads(stripped)
+        except orjson.JSONDecodeError:
+            pass
+
+    start = text.find("{")
+    while start != -1:
+        try:
+            return _JSON_DECODER.raw_decode(text, start)[0]
+        except ValueError:
+            start = text.find("{", start + 1)
+    return None
+
 
 @dataclass
 class JobSpec:
@@ -38,6 +114,48 @@ class PreparationArtifact:
 class VASPOrchestrator:
     """Core VASP calculation orchestrator."""
 
+    _INCAR_HEADER = "VASP INCAR file\n" + "=" * 20 + "\n"
+    _SLURM_TEMPLATE = (
+        "#!/bin/bash\n"
+        "#SBATCH -p {partition}\n"
+        "#SBATCH -N {nodes}\n"
+        "#SBATCH --ntasks-per-node={ntasks_per_node}\n"
+        "#SBATCH -J {case_id}\n"
+        "#SBATCH -o vasp.out\n"
+        "#SBATCH -t {walltime_minutes}:00:00\n\n"
+        "export OMP_NUM_THREADS=1\n"
+        "module load {vasp_module}\n"
+        "module list -t &> module_snapshot.txt\n\n"
+        "export VASP_PP_PATH={potcar_root}\n\n"
+        "# Build POTCAR for {case_id}\n"
+        "# POTCAR will be built based on the specific elements in the calculation\n"
+        "# Example for SiC: cat $VASP_PP_PATH/Si/POTCAR $VASP_PP_PATH/C/POTCAR > POTCAR\n\n"
+        "mpirun -np $SLURM_NTASKS {vasp_exec}\n"
+    )
+
+    # One format call per job instead of six appends
+    _SUMMARY_HEADER = "VASP Job Submission Summary\n" + "=" * 40 + "\n"
+    _SUMMARY_JOB_TEMPLATE = (
+        "Case ID: {case_id}\n"
+        "System: {system}\n"
+        "INCAR parameters: {incar}\n"
+        "KPOINTS: {kpoints}\n"
+        "HPC resources: {hpc}\n" + "-" * 20
+    )
+    _SUMMARY_FOOTER = (
+        "\nTo approve all jobs, use: approve('all')\n"
+        "To approve specific job, use: approve('case_id')"
+    )
+
+    # Printed in one call: one stdout write instead of five
+    _FALLBACK_HINT = (
+        "⚠️ LLM解析未能生成有效的计算计划\n"
+        "💡 请尝试更详细地描述您的计算需求，例如：\n"
+        "   - 材料名称和结构\n"
+        "   - 计算类型（几何优化、自洽场、能带结构等）\n"
+        "   - 关键参数（截断能、k点密度、收敛标准等）"
+    )
+
     def __init__(
         self,
         config_path: str = "config/vasp_config.yaml",
@@ -55,6 +173,14 @@ class VASPOrchestrator:
         self.local_workspace = Path(os.path.expanduser(self.config["paths"]["local_root"]))
         self.local_workspace.mkdir(parents=True, exist_ok=True)
         self._base_incar_defaults = self.settings.get_incar_defaults()
+        # blake2b(instruction) -> parsed LLM analysis; repeated instructions skip the API
+        self._analysis_cache: Dict[str, Dict[str, Any]] = {}
+        env = self.config["env"]
+        self._slurm_env = {
+            "vasp_module": env["vasp_module"],
+            "vasp_exec": env["vasp_exec"],
+            "potcar_root": env["potcar_root"],
+        }
 
         # Allow dependency injection so the orchestrator can be reused in different workflows.
         self.conversation_manager = conversation_manager or ConversationManager(
@@ -101,7 +227,8 @@ class VASPOrchestrator:
 
         if not ai_analysis:
             ai_analysis = self._analyze_with_ai(instruction)
-        base_params = self._base_incar_defaults.copy()
+        # Read-only view; each job copies it before applying overrides
+        base_params = self._base_incar_defaults
         jobs: List[JobSpec] = []
 
         if ai_analysis.get("material") and ai_analysis.get("calculations"):
@@ -117,39 +244,41 @@ class VASPOrchestrator:
         case_dir = Path(job_spec.paths["local_dir"])
         case_dir.mkdir(parents=True, exist_ok=True)
 
-        rendered_files = self._render_job_files(job_spec)
         generated_files: Dict[str, Path] = {}
         hashes: Dict[str, str] = {}
 
-        for name, content in rendered_files.items():
+        # Each file is rendered, hashed and written before the next is produced.
+        for name, content in self._iter_job_files(job_spec):
             path = case_dir / name
-            self._write_text_if_changed(path, content)
+            # Hash the bytes we are about to write instead of reading the file back.
+            data = content.encode("utf-8")
+            digest = _SHA256_SEED.copy()
+            digest.update(data)
+            hashes[name] = digest.hexdigest()
+            self._write_bytes_if_changed(path, data)
             generated_files[name] = path
-            hashes[name] = self._hash_file(path)
 
         hashes_path = case_dir / "hashes.json"
-        hashes_content = json.dumps(hashes, indent=2)
-        self._write_text_if_changed(hashes_path, hashes_content)
+        self._write_bytes_if_changed(hashes_path, _dumps_indented(hashes))
         generated_files["hashes.json"] = hashes_path
 
         return PreparationArtifact(job=job_spec, hashes=hashes, generated_files=generated_files)
 
     def generate_approval_summary(self, job_specs: Iterable[JobSpec]) -> str:
-        lines = ["VASP Job Submission Summary", "=" * 40, ""]
-
-        for job in job_specs:
-            lines.append(f"Case ID: {job.case_id}")
-            lines.append(f"System: {job.system}")
-            lines.append(f"INCAR parameters: {job.params['incar']}")
-            lines.append(f"KPOINTS: {job.params['kpoints']}")
-            lines.append(f"HPC resources: {job.hpc}")
-            lines.append("-" * 20)
-
-        lines.append("")
-        lines.append("To approve all jobs, use: approve('all')")
-        lines.append("To approve specific job, use: approve('case_id')")
-
-        return "\n".join(lines)
+        template = self._SUMMARY_JOB_TEMPLATE
+        parts = [self._SUMMARY_HEADER]
+        parts.extend(
+            template.format(
+                case_id=job.case_id,
+                system=job.system,
+                incar=job.params["incar"],
+                kpoints=job.params["kpoints"],
+                hpc=job.hpc,
+            )
+            for job in job_specs
+        )
+        parts.append(self._SUMMARY_FOOTER)
+        return "\n".join(parts)
 
     # ------------------------------------------------------------------
     # Internal helpers
@@ -172,32 +301,51 @@ class VASPOrchestrator:
             paths=data["paths"],
         )
 
-    def _hash_file(self, file_path: Path) -> str:
-        with file_path.open("rb") as handle:
-            try:
-                return hashlib.file_digest(handle, "sha256").hexdigest()
-            except AttributeError:  # pragma: no cover - Python < 3.11 fallback
-                handle.seek(0)
-                digest = hashlib.sha256()
-                for chunk in iter(lambda: handle.read(8192), b""):
-                    digest.update(chunk)
-                return digest.hexdigest()
-
     def _write_text_if_changed(self, target: Path, content: str) -> None:
-        if target.exists():
-            current = target.read_text()
-            if current == content:
-                return
-        target.write_text(content)
+        self._write_bytes_if_changed(target, content.encode("utf-8"))
 
-    def _render_job_files(self, job_spec: JobSpec) -> Dict[str, str]:
-        return {
-            "INCAR": self._generate_incar(job_spec.params["incar"]),
-            "KPOINTS": self._generate_kpoints(job_spec.params["kpoints"]),
-            "run.slurm": self._generate_slurm_script(job_spec),
-        }
+    def _write_bytes_if_changed(self, target: Path, data: bytes) -> None:
+        try:
+            if target.read_bytes() == data:
+                return
+        except FileNotFoundError:
+            pass
+        # Write a per-writer temp file beside the target and rename: readers never
+        # see a half-written file and concurrent writers cannot swap each other's temp.
+        fd, tmp = tempfile.mkstemp(dir=target.parent, prefix=target.name + ".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(data)
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, target)
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except FileNotFoundError:
+                pass
+            raise
+
+    def _iter_job_files(self, job_spec: JobSpec) -> Iterator[Tuple[str, str]]:
+        incar = job_spec.params["incar"]
+        kpoints = job_spec.params["kpoints"]
+        yield "INCAR", _memoized_render(
+            "INCAR", repr(incar), lambda: self._generate_incar(incar)
+        )
+        yield "KPOINTS", _memoized_render(
+            "KPOINTS", repr(kpoints), lambda: self._generate_kpoints(kpoints)
+        )
+        yield "run.slurm", _memoized_render(
+            "run.slurm",
+            repr((job_spec.case_id, job_spec.hpc, self._slurm_env)),
+            lambda: self._generate_slurm_script(job_spec),
+        )
 
     def _analyze_with_ai(self, instruction: str) -> Dict[str, Any]:
+        cache_key = hashlib.blake2b(instruction.encode("utf-8"), digest_size=16).hexdigest()
+        cached = self._analysis_cache.get(cache_key)
+        if cached is not None:
+            print("✅ AI分析命中缓存")
+            return copy.deepcopy(cached)
         try:
             system_prompt = self.conversation_manager.config["vasp_analysis_prompt"]
             result = self.conversation_manager.chat(
@@ -213,11 +361,11 @@ class VASPOrchestrator:
             response_text = result["response"]
             print(f"✅ AI分析完成 (耗时: {result['response_time']:.2f}s)")
 
-            import re
-
-            json_match = re.search(r"\{.*\}", response_text, re.DOTALL)
-            if json_match:
-                return json.loads(json_match.group())
+            analysis = _extract_json_object(response_text)
+            if analysis is not None:
+                # Only successful parses are cached; failures retry on the next call.
+                self._analysis_cache[cache_key] = copy.deepcopy(analysis)
+                return analysis
             print("⚠️ AI回复中未找到JSON格式，使用回退方案")
             return {}
         except Exception as exc:  # pragma: no cover - defensive logging
@@ -225,7 +373,7 @@ class VASPOrchestrator:
             return {}
 
     def _create_jobs_from_ai_analysis(
-        self, analysis: Dict[str, Any], base_params: Dict[str, Any]
+        self, analysis: Dict[str, Any], base_params: Mapping[str, Any]
     ) -> List[JobSpec]:
         jobs: List[JobSpec] = []
         material = analysis.get("material", "Unknown")
@@ -234,12 +382,17 @@ class VASPOrchestrator:
         for calc in calculations:
             calc_type = calc.get("type", "scf")
             case_id = f"{material}_{calc_type}"
+            # dict.copy() clones the hash table directly; the splat merge re-inserts every key
+            incar = base_params.copy()
+            overrides = calc.get("parameters")
+            if overrides:
+                incar.update(overrides)
 
             job_spec = JobSpec(
                 case_id=case_id,
                 system=material,
                 params={
-                    "incar": {**base_params, **calc.get("parameters", {})},
+                    "incar": incar,
                     "kpoints": calc.get(
                         "kpoints", {"mode": "Monkhorst-Pack", "grid": [6, 6, 6]}
                     ),
@@ -258,19 +411,16 @@ class VASPOrchestrator:
 
         return jobs
 
-    def _fallback_parse(self, instruction: str, base_params: Dict[str, Any]) -> List[JobSpec]:
-        print("⚠️ LLM解析未能生成有效的计算计划")
-        print("💡 请尝试更详细地描述您的计算需求，例如：")
-        print("   - 材料名称和结构")
-        print("   - 计算类型（几何优化、自洽场、能带结构等）")
-        print("   - 关键参数（截断能、k点密度、收敛标准等）")
+    def _fallback_parse(self, instruction: str, base_params: Mapping[str, Any]) -> List[JobSpec]:
+        print(self._FALLBACK_HINT)
         return []
 
     def _generate_incar(self, incar_params: Dict[str, Any]) -> str:
-        lines = ["VASP INCAR file", "=" * 20]
-        for key, value in incar_params.items():
-            lines.append(f"{key} = {value}")
-        return "\n".join(lines) + "\n"
+        # A list comprehension, not a generator: str.join materialises its
+        # argument into a sequence first, so the generator only adds overhead.
+        return self._INCAR_HEADER + "".join(
+            [f"{key} = {value}\n" for key, value in incar_params.items()]
+        )
 
     def _generate_kpoints(self, kpoints_params: Dict[str, Any]) -> str:
         if "content" in kpoints_params:
@@ -304,68 +454,94 @@ class VASPOrchestrator:
 
     def _generate_slurm_script(self, job_spec: JobSpec) -> str:
         hpc = job_spec.hpc
-        case_id = job_spec.case_id
-        vasp_module = self.config["env"]["vasp_module"]
-        vasp_exec = self.config["env"]["vasp_exec"]
-        potcar_root = self.config["env"]["potcar_root"]
-
-        return (
-            "#!/bin/bash\n"
-            f"#SBATCH -p {hpc['partition']}\n"
-            f"#SBATCH -N {hpc['nodes']}\n"
-            f"#SBATCH --ntasks-per-node={hpc['ntasks_per_node']}\n"
-            f"#SBATCH -J {case_id}\n"
-            "#SBATCH -o vasp.out\n"
-            f"#SBATCH -t {hpc['walltime_minutes']}:00:00\n\n"
-            "export OMP_NUM_THREADS=1\n"
-            f"module load {vasp_module}\n"
-            "module list -t &> module_snapshot.txt\n\n"
-            f"export VASP_PP_PATH={potcar_root}\n\n"
-            f"# Build POTCAR for {case_id}\n"
-            "# POTCAR will be built based on the specific elements in the calculation\n"
-            "# Example for SiC: cat $VASP_PP_PATH/Si/POTCAR $VASP_PP_PATH/C/POTCAR > POTCAR\n\n"
-            f"mpirun -np $SLURM_NTASKS {vasp_exec}\n"
+        return self._SLURM_TEMPLATE.format(
+            partition=hpc["partition"],
+            nodes=hpc["nodes"],
+            ntasks_per_node=hpc["ntasks_per_node"],
+            walltime_minutes=hpc["walltime_minutes"],
+            case_id=job_spec.case_id,
+            **self._slurm_env,
         )
 
 
 class VaspAgent:
     """High-level asynchronous agent facade wrapping :class:`VASPOrchestrator`."""
 
+    _REPORT_TEMPLATE = (
+        "• {case_id}\n"
+        "   - Local dir: {local_dir}\n"
+        "   - Remote dir: {remote_dir}\n"
+        "{hash_lines}"
+        "   - HPC: partition={partition}, nodes={nodes}, ntasks_per_node={ntasks_per_node}"
+    )
+
     def __init__(self, orchestrator: VASPOrchestrator) -> None:
         self._orchestrator = orchestrator
 
+    @property
+    def orchestrator(self) -> VASPOrchestrator:
+        """The orchestrator this agent drives."""
+        return self._orchestrator
+
     async def __call__(self, instruction: str) -> str:
-        return await asyncio.to_thread(self._process_instruction, instruction)
+        return await self._process_instruction(instruction)
 
     # ------------------------------------------------------------------
-    # Synchronous processing pipeline executed in a worker thread.
+    # Processing pipeline; blocking steps run in worker threads.
     # ------------------------------------------------------------------
-    def _process_instruction(self, instruction: str) -> str:
-        jobs = self._orchestrator.plan_jobs(instruction)
+    async def _process_instruction(self, instruction: str) -> str:
+        jobs = await asyncio.to_thread(self._orchestrator.plan_jobs, instruction)
         if not jobs:
             return "未能根据输入生成VASP作业计划，请提供更详细的计算需求。"
 
-        artifacts = [self._orchestrator.prepare_inputs(job) for job in jobs]
+        artifacts = await self._prepare_all(jobs)
         summary = self._orchestrator.generate_approval_summary(jobs)
         details = self._format_preparation_report(artifacts)
         return f"{summary}\n\n{details}"
 
+    async def _prepare_all(self, jobs: List[JobSpec]) -> List[PreparationArtifact]:
+        """Prepare inputs concurrently across case directories.
+
+        Jobs that share a ``local_dir`` (e.g. an ENCUT sweep of several ``scf``
+        jobs for one material) write the same files, so each directory's jobs
+        run sequentially in plan order within a single worker thread.
+        """
+
+        groups: Dict[str, List[int]] = {}
+        for index, job in enumerate(jobs):
+            groups.setdefault(str(Path(job.paths["local_dir"])), []).append(index)
+
+        prepare = self._orchestrator.prepare_inputs
+
+        def prepare_group(indices: List[int]) -> List[Tuple[int, PreparationArtifact]]:
+            return [(index, prepare(jobs[index])) for index in indices]
+
+        results = await asyncio.gather(
+            *(asyncio.to_thread(prepare_group, indices) for indices in groups.values())
+        )
+        artifacts: List[Optional[PreparationArtifact]] = [None] * len(jobs)
+        for group in results:
+            for index, artifact in group:
+                artifacts[index] = artifact
+        return artifacts  # type: ignore[return-value]
+
     def _format_preparation_report(self, artifacts: Iterable[PreparationArtifact]) -> str:
-        lines = ["Prepared job inputs:", ""]
-        for artifact in artifacts:
-            lines.append(f"• {artifact.job.case_id}")
-            lines.append(f"   - Local dir: {artifact.job.paths['local_dir']}")
-            lines.append(f"   - Remote dir: {artifact.job.paths['remote_dir']}")
-            for name, digest in artifact.hashes.items():
-                lines.append(f"   - {name}: {digest}")
-            lines.append(
-                "   - HPC: "
-                f"partition={artifact.job.hpc['partition']}, "
-                f"nodes={artifact.job.hpc['nodes']}, "
-                f"ntasks_per_node={artifact.job.hpc['ntasks_per_node']}"
+        template = self._REPORT_TEMPLATE
+        blocks = [
+            template.format(
+                case_id=artifact.job.case_id,
+                local_dir=artifact.job.paths["local_dir"],
+                remote_dir=artifact.job.paths["remote_dir"],
+                hash_lines="".join(
+                    [f"   - {name}: {digest}\n" for name, digest in artifact.hashes.items()]
+                ),
+                partition=artifact.job.hpc["partition"],
+                nodes=artifact.job.hpc["nodes"],
+                ntasks_per_node=artifact.job.hpc["ntasks_per_node"],
             )
-            lines.append("")
-        return "\n".join(lines).strip()
+            for artifact in artifacts
+        ]
+        return ("Prepared job inputs:\n\n" + "\n\n".join(blocks)).strip()
 
 
 def create_vasp_agent(
@@ -374,7 +550,13 @@ def create_vasp_agent(
     secrets_path: str = "config/secrets.yaml",
     settings: Optional[Settings] = None,
 ) -> VaspAgent:
-    """Factory that wires together the orchestrator and exposes an async agent."""
+    """Factory that wires together the orchestrator and exposes an async agent.
+
+    Every call returns a fresh agent with its own conversation history. Only
+    stateless pieces are shared: settings come from ``get_settings`` (keyed on
+    each file's mtime, so edits on disk are picked up) and the OpenAI client is
+    reused per API key and base URL by ``ConversationManager``.
+    """
 
     orchestrator = VASPOrchestrator(
         config_path=config_path,
@@ -6,10 +6,34 @@ import os
 from dataclasses import dataclass
 from functools import lru_cache
 from pathlib import Path
-from typing import Any, Dict, Optional
+from types import MappingProxyType
+from typing import Any, Dict, Mapping, Optional, Tuple
 
 import yaml
 
+# libyaml-backed loader when PyYAML was built with it; same semantics as safe_load.
+_YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+try:  # Optional: RapidYAML, selected with VASP_ROBOT_YAML_ENGINE=ryml
+    import ryml
+except ImportError:  # pragma: no cover - libyaml/PyYAML fallback
+    ryml = None
+
+_YAML_ENGINE_ENV = "VASP_ROBOT_YAML_ENGINE"
+# Plain scalars are typed with PyYAML's own resolver/constructors, so both
+# engines agree on ints, floats, bools, nulls and timestamps.
+_SCALAR_RESOLVER = yaml.resolver.Resolver()
+_SCALAR_CONSTRUCTOR = yaml.constructor.SafeConstructor()
+_STR_TAG = "tag:yaml.org,2002:str"
+if ryml is not None:
+    _RYML_CONTAINER = ryml.MAP | ryml.SEQ
+    _RYML_UNSUPPORTED = (
+        ryml.KEYANCH | ryml.VALANCH | ryml.KEYREF | ryml.VALREF | ryml.KEYTAG | ryml.VALTAG
+    )
+
+
+_EMPTY_MAPPING: Mapping[str, Any] = MappingProxyType({})
+
 
 @dataclass(frozen=True)
 class Settings:
@@ -19,30 +43,34 @@ class Settings:
     prompts: Dict[str, Any]
     secrets: Dict[str, Any]
 
-    def get_incar_defaults(self) -> Dict[str, Any]:
-        """Return a copy of the configured INCAR defaults."""
+    def get_incar_defaults(self) -> Mapping[str, Any]:
+        """Return a read-only view of the configured INCAR defaults.
+
+        Callers that need to modify the parameters take ``dict(view)`` or
+        ``view.copy()`` first.
+        """
 
-        defaults = {}
+        defaults: Dict[str, Any] = {}
         config_defaults = self.base.get("defaults", {})
         if isinstance(config_defaults, dict):
             incar_defaults = config_defaults.get("incar", {})
             if isinstance(incar_defaults, dict):
                 defaults = incar_defaults
-        return defaults.copy()
+        return MappingProxyType(defaults)
 
-    def get_service_config(self, service: str) -> Dict[str, Any]:
-        """Return a copy of the service configuration stored in secrets."""
+    def get_service_config(self, service: str) -> Mapping[str, Any]:
+        """Return a read-only view of the service configuration stored in secrets."""
 
         services = self.secrets.get("services", {})
         if not isinstance(services, dict):
-            return {}
+            return _EMPTY_MAPPING
         service_config = services.get(service, {})
-        return service_config.copy() if isinstance(service_config, dict) else {}
+        return MappingProxyType(service_config) if isinstance(service_config, dict) else _EMPTY_MAPPING
 
     def get_api_key(self, service: str, *, env_var: Optional[str] = None) -> Optional[str]:
         """Resolve an API key using environment variables as override."""
 
-        env_name = env_var or f"{service.upper()}_API_KEY"
+        env_name = env_var or _api_key_env_name(service)
         api_key = os.getenv(env_name)
         if api_key:
             return api_key
@@ -55,46 +83,153 @@ class Settings:
         return None
 
 
+@lru_cache(maxsize=None)
+def _api_key_env_name(service: str) -> str:
+    return f"{service.upper()}_API_KEY"
+
+
 def get_settings(
     base_config_path: str = "config/vasp_config.yaml",
     prompts_path: str = "config/system_prompts.yaml",
     secrets_path: str = "config/secrets.yaml",
 ) -> Settings:
-    """Load and cache configuration bundles for orchestrator components."""
+    """Load and cache configuration bundles for orchestrator components.
 
-    base_config = _resolve_path(base_config_path)
-    prompts_config = _resolve_path(prompts_path)
-    secrets_config = _resolve_path(secrets_path)
-    return _load_settings_cached(base_config, prompts_config, secrets_config)
+    The cache is keyed on each file's (path, mtime, size), so editing a
+    config on disk yields fresh settings on the next call.
+    """
 
+    return _load_settings_cached(
+        _stat_key(base_config_path),
+        _stat_key(prompts_path),
+        _stat_key(secrets_path),
+    )
 
-@lru_cache(maxsize=None)
+
+_StatKey = Optional[Tuple[str, int, int]]
+
+
+@lru_cache(maxsize=32)
 def _load_settings_cached(
-    base_config_path: Optional[str],
-    prompts_path: Optional[str],
-    secrets_path: Optional[str],
+    base_key: _StatKey,
+    prompts_key: _StatKey,
+    secrets_key: _StatKey,
 ) -> Settings:
-    base = _read_yaml(base_config_path)
-    prompts = _read_yaml(prompts_path)
-    secrets = _read_yaml(secrets_path)
+    base = _read_yaml(base_key)
+    prompts = _read_yaml(prompts_key)
+    secrets = _read_yaml(secrets_key)
     return Settings(base=base, prompts=prompts, secrets=secrets)
 
 
-def _resolve_path(path: Optional[str]) -> Optional[str]:
+def _stat_key(path: Optional[str]) -> _StatKey:
+    """Return (absolute path, st_mtime_ns, st_size) from one stat, or None if missing."""
+
     if not path:
         return None
-    resolved = Path(path).expanduser().resolve()
-    return str(resolved)
+    # abspath is pure string work; Path.resolve() would walk every component for symlinks.
+    absolute = os.path.abspath(os.path.expanduser(path))
+    try:
+        stat = os.stat(absolute)
+    except FileNotFoundError:
+        return None
+    return absolute, stat.st_mtime_ns, stat.st_size
 
 
-def _read_yaml(path: Optional[str]) -> Dict[str, Any]:
-    if not path:
-        return {}
-    file_path = Path(path)
-    if not file_path.exists():
+def load_yaml(path: str) -> Any:
+    """Parse a YAML file, reusing the result until the file's mtime or size changes.
+
+    The returned object is shared between callers and must not be mutated.
+    """
+
+    file_path = Path(path).expanduser().resolve()
+    stat = file_path.stat()
+    return _load_yaml_cached(str(file_path), stat.st_mtime_ns, stat.st_size, _yaml_engine())
+
+
+def _yaml_engine() -> str:
+    return "ryml" if ryml is not None and os.getenv(_YAML_ENGINE_ENV) == "ryml" else "libyaml"
+
+
+@lru_cache(maxsize=None)
+def _load_yaml_cached(path: str, mtime_ns: int, size: int, engine: str = "libyaml") -> Any:
+    # Raw bytes: libyaml detects the encoding and decodes in C, skipping the
+    # Python-level text decode of a text-mode handle.
+    with open(path, "rb") as handle:
+        data = handle.read()
+    if engine == "ryml":
+        try:
+            return _load_with_ryml(data)
+        except _RymlUnsupported:
+            pass
+    return yaml.load(data, Loader=_YAML_LOADER)
+
+
+class _RymlUnsupported(Exception):
+    """Input uses tags, anchors or several documents; defer to PyYAML."""
+
+
+def _load_with_ryml(data: bytes) -> Any:
+    tree = ryml.parse_in_arena(data)
+    root = tree.root_id()
+    if tree.is_stream(root):
+        if tree.num_children(root) != 1:
+            raise _RymlUnsupported
+        root = tree.first_child(root)
+    flags = tree.type(root)
+    if not flags & _RYML_CONTAINER:
+        return _ryml_scalar(tree, root, flags) if flags & ryml.VAL else None
+
+    none = ryml.NONE
+    unsupported = _RYML_UNSUPPORTED
+    result: Any = {} if flags & ryml.MAP else []
+    # Iterative walk: containers are inserted when first seen, which keeps
+    # mapping order, and filled when popped. One type() call per node; the
+    # is_*() helpers would each cross into the extension separately.
+    stack = [(root, result)]
+    while stack:
+        node, container = stack.pop()
+        is_map = isinstance(container, dict)
+        child = tree.first_child(node)
+        while child != none:
+            flags = tree.type(child)
+            if flags & unsupported:
+                raise _RymlUnsupported
+            if flags & _RYML_CONTAINER:
+                value: Any = {} if flags & ryml.MAP else []
+                stack.append((child, value))
+            else:
+                value = _ryml_scalar(tree, child, flags)
+            if is_map:
+                key = bytes(tree.key(child)).decode("utf-8")
+                container[_resolve_scalar(key) if flags & ryml.KEY_PLAIN else key] = value
+            else:
+                container.append(value)
+            child = tree.next_sibling(child)
+    return result
+
+
+def _ryml_scalar(tree: Any, node: int, flags: int) -> Any:
+    raw = tree.val(node)
+    text = "" if raw is None else bytes(raw).decode("utf-8")
+    return _resolve_scalar(text) if flags & ryml.VAL_PLAIN else text
+
+
+@lru_cache(maxsize=4096)
+def _resolve_scalar(text: str) -> Any:
+    """Type a plain scalar exactly as SafeLoader would (results are immutable)."""
+
+    tag = _SCALAR_RESOLVER.resolve(yaml.ScalarNode, text, (True, False))
+    if tag == _STR_TAG:
+        return text
+    node = yaml.ScalarNode(tag, text)
+    return _SCALAR_CONSTRUCTOR.yaml_constructors[tag](_SCALAR_CONSTRUCTOR, node)
+
+
+def _read_yaml(key: _StatKey) -> Dict[str, Any]:
+    if key is None:
         return {}
-    with file_path.open("r", encoding="utf-8") as handle:
-        data = yaml.safe_load(handle) or {}
-        if not isinstance(data, dict):
-            raise ValueError(f"Expected mapping at {file_path}, got {type(data).__name__}")
-        return data
+    path, mtime_ns, size = key
+    data = _load_yaml_cached(path, mtime_ns, size, _yaml_engine()) or {}
+    if not isinstance(data, dict):
+        raise ValueError(f"Expected mapping at {path}, got {type(data).__name__}")
+    return data
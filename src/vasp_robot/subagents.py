@@ -4,16 +4,191 @@ from __future__ import annotations
 
 import json
 import re
-from dataclasses import dataclass
+import string
+import threading
+from dataclasses import dataclass, field
 from pathlib import Path
-from typing import Any, Callable, Dict, Iterable, Optional
-
-import yaml
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 from .conversation import ConversationManager
+from .settings import load_yaml
+
+try:  # Optional: orjson parses LLM JSON several times faster than the stdlib
+    import orjson
+except ImportError:  # pragma: no cover - stdlib fallback
+    orjson = None
+
+# orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers catch one type
+_loads = orjson.loads if orjson is not None else json.loads
+
+
+def _dumps_context(value: Any, pretty: bool = False) -> str:
+    """Serialise a prompt context value; compact unless the spec asks for indentation."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if pretty else 0)
+        return orjson.dumps(value, option=option).decode("utf-8")
+    if pretty:
+        return json.dumps(value, ensure_ascii=False, indent=2)
+    # Compact separators keep the stdlib on its C encoder and the prompt short
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"))
+
+# Patterns are compiled once at import instead of going through re's cache on every response
+# Only the characters that change the scanner state; re skips everything else in C
+_JSON_TOKEN_RE = re.compile(r'[{}"\\]')
+_MD_FENCE_OPEN_RE = re.compile(r"```json\s*", re.IGNORECASE)
+_MD_FENCE_CLOSE_RE = re.compile(r"```\s*$")
+
+# Characters that open/close a nesting level or change the string state
+_JSON_NESTING_RE = re.compile(r'[{}\[\]"\\]')
+_JSON_CLOSERS = {"{": "}", "[": "]"}
+# Tails tried after the truncation point: complete value, dangling key, dangling colon
+_JSON_TAILS = ("", ": null", " null")
+
+# Element symbols in free text, minus common words that look like symbols
+_ELEMENT_RE = re.compile(r'\b([A-Z][a-z]?)\b')
+_ELEMENT_IGNORE = frozenset({"H", "He", "Be", "PBE", "HSE", "GW", "BSE"})
+
+# Common material patterns
+_MATERIAL_PATTERNS = tuple(
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r'(SiC|silicon\s*carbide)',
+        r'(Si|silicon)',
+        r'(C|carbon|graphene|diamond)',
+        r'([A-Z][a-z]?\d*[A-Z]?)',  # Simple chemical formula pattern
+    )
+)
+
+
+def _find_first_json_object(text: str) -> Optional[Tuple[int, Optional[int]]]:
+    """Locate the first JSON object in ``text`` in a single linear pass.
+
+    Returns ``(start, end)`` for the first balanced ``{...}``, ``(start, None)``
+    when the object is truncated before its closing brace, or ``None`` when
+    there is no ``{`` at all. Braces inside strings and escaped characters
+    are ignored.
+    """
+
+    start = text.find("{")
+    if start == -1:
+        return None
+
+    depth = 0
+    in_string = False
+    skip_at = -1
+    for match in _JSON_TOKEN_RE.finditer(text, start):
+        pos = match.start()
+        if pos == skip_at:
+            continue
+        char = match.group()
+        if char == "\\":
+            skip_at = pos + 1
+        elif char == '"':
+            in_string = not in_string
+        elif not in_string:
+            if char == "{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return start, pos + 1
+    return start, None
+
+
+def _extract_json(text: str) -> Optional[Any]:
+    """Extract the first JSON object from ``text``, repairing truncated responses.
+
+    Shared by ClaudeSubagent and ClaudeSubagentManager.
+    """
+    if not text:
+        return None
+
+    # Try to find JSON object in the text
+    span = _find_first_json_object(text)
+    if span is None:
+        return None
 
+    start, end = span
+    json_str = text[start:end]
 
-@dataclass
+    # Remove common markdown formatting
+    json_str = _MD_FENCE_OPEN_RE.sub("", json_str)
+    json_str = _MD_FENCE_CLOSE_RE.sub("", json_str)
+    json_str = json_str.strip()
+
+    try:
+        return _loads(json_str)
+    except json.JSONDecodeError as e:
+        # Handle truncated JSON responses intelligently
+        print(f"🔧 Attempting to repair truncated JSON: {e}")
+        return _repair_truncated_json(json_str)
+
+
+def _repair_truncated_json(json_str: str) -> Optional[Any]:
+    """Attempt to repair truncated JSON by completing missing structure.
+
+    ``json_str`` is already cut at the first balanced object (or runs to
+    the end of the response when truncated), so there is no balanced
+    prefix left to try; go straight to structural repair.
+    """
+
+    for repaired in _smart_json_repair(json_str):
+        try:
+            parsed = _loads(repaired)
+        except json.JSONDecodeError:
+            continue
+        print("✅ Successfully repaired JSON structure")
+        return parsed
+
+    # If repair fails, return error with partial info
+    return {
+        "error": "JSON response was truncated and could not be fully repaired",
+        "truncated_at": len(json_str),
+        "partial_preview": json_str[:300] + "..." if len(json_str) > 300 else json_str
+    }
+
+
+def _smart_json_repair(json_str: str) -> Iterator[str]:
+    """Yield candidate completions of a truncated JSON document.
+
+    One pass tracks open strings and the stack of open objects/arrays; the
+    candidates close an unterminated string, drop a trailing comma, try the
+    tails in ``_JSON_TAILS`` and then close every open level innermost first.
+    """
+
+    stack: List[str] = []
+    in_string = False
+    skip_at = -1
+    for match in _JSON_NESTING_RE.finditer(json_str):
+        pos = match.start()
+        if pos == skip_at:
+            continue
+        char = match.group()
+        if char == "\\":
+            skip_at = pos + 1
+        elif char == '"':
+            in_string = not in_string
+        elif not in_string:
+            if char in _JSON_CLOSERS:
+                stack.append(_JSON_CLOSERS[char])
+            elif stack and stack[-1] == char:
+                stack.pop()
+            else:
+                return  # mismatched closer: not a truncation we can fix
+
+    body = json_str
+    if in_string:
+        # A dangling backslash would escape the closing quote
+        body = (body[:-1] if skip_at == len(body) else body) + '"'
+    body = body.rstrip()
+    if body.endswith(","):
+        body = body[:-1]
+    closers = "".join(reversed(stack))
+    for tail in _JSON_TAILS:
+        yield body + tail + closers
+
+
+@dataclass(frozen=True, slots=True)
 class SubagentSpec:
     """Configuration for a Claude Code sub-agent."""
 
@@ -23,6 +198,22 @@ class SubagentSpec:
     task_template: str
     temperature: float = 0.2
     expect_json: bool = True
+    # Reuse one session (history reset per run) instead of spawning a child each call
+    reuse_session: bool = False
+    # Indent JSON context in prompts; compact by default to save tokens
+    pretty_context: bool = False
+    # Root names of the replacement fields in task_template, parsed once
+    template_fields: Tuple[str, ...] = field(init=False, repr=False, compare=False)
+
+    def __post_init__(self) -> None:
+        names = []
+        for _, field_name, _, _ in string.Formatter().parse(self.task_template):
+            if field_name:
+                # "analysis[material]" / "plan.name" look up the root variable
+                root = field_name.partition(".")[0].partition("[")[0]
+                if root not in names:
+                    names.append(root)
+        object.__setattr__(self, "template_fields", tuple(names))
 
 
 class ClaudeSubagent:
@@ -35,6 +226,8 @@ class ClaudeSubagent:
     ) -> None:
         self.spec = spec
         self._conversation_factory = conversation_factory
+        self._session: Optional[ConversationManager] = None
+        self._session_lock = threading.Lock()
 
     # ------------------------------------------------------------------
     # Public API
@@ -47,12 +240,16 @@ class ClaudeSubagent:
         """Execute the sub-agent task and return structured results."""
 
         prompt = self._build_prompt(instruction, context)
-        session = self._conversation_factory()
-        result = session.chat(
-            input_text=prompt,
-            system_prompt=self.spec.system_prompt,
-            temperature=self.spec.temperature,
-        )
+        if self.spec.reuse_session:
+            # The shared session is not thread-safe; runs on it are serialised.
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._conversation_factory()
+                else:
+                    self._session.clear_conversation(verbose=False)
+                result = self._chat(self._session, prompt)
+        else:
+            result = self._chat(self._conversation_factory(), prompt)
 
         output: Dict[str, Any] = {
             "status": result.get("status", "error"),
@@ -66,7 +263,7 @@ class ClaudeSubagent:
 
             if self.spec.expect_json:
                 # Try to extract JSON, but don't fail if we can't
-                parsed = self._extract_json(response_text)
+                parsed = _extract_json(response_text)
                 if parsed is not None:
                     output["parsed"] = parsed
                 else:
@@ -82,147 +279,37 @@ class ClaudeSubagent:
     # ------------------------------------------------------------------
     # Internal helpers
     # ------------------------------------------------------------------
+    def _chat(self, session: ConversationManager, prompt: str) -> Dict[str, Any]:
+        return session.chat(
+            input_text=prompt,
+            system_prompt=self.spec.system_prompt,
+            temperature=self.spec.temperature,
+        )
+
     def _build_prompt(
         self,
         instruction: str,
         context: Optional[Dict[str, Any]],
     ) -> str:
-        variables: Dict[str, Any] = {"instruction": instruction}
-
-        if context:
-            for key, value in context.items():
-                if isinstance(value, str):
-                    variables[key] = value
-                else:
-                    variables[key] = json.dumps(value, ensure_ascii=False, indent=2)
-
-        try:
-            return self.spec.task_template.format(**variables)
-        except KeyError as exc:  # pragma: no cover - defensive guard
-            raise KeyError(
-                f"Missing template variable {exc!s} for subagent '{self.spec.name}'"
-            ) from exc
-
-    def _extract_json(self, text: str) -> Optional[Any]:
-        """Extract JSON from text, handling truncated responses intelligently."""
-        if not text:
-            return None
-
-        # Try to find JSON object in the text
-        match = re.search(r"\{.*\}", text, re.DOTALL)
-        if not match:
-            return None
-
-        json_str = match.group()
-
-        # Remove common markdown formatting
-        json_str = re.sub(r"```json\s*", "", json_str, flags=re.IGNORECASE)
-        json_str = re.sub(r"```\s*$", "", json_str)
-        json_str = json_str.strip()
-
-        try:
-            return json.loads(json_str)
-        except json.JSONDecodeError as e:
-            # Handle truncated JSON responses intelligently
-            print(f"🔧 Attempting to repair truncated JSON: {e}")
-            return self._repair_truncated_json(json_str)
-
-    def _repair_truncated_json(self, json_str: str) -> Optional[Any]:
-        """Attempt to repair truncated JSON by completing missing structure."""
-
-        # Find balanced braces
-        brace_count = 0
-        in_string = False
-        escape_next = False
-        end_pos = 0
-
-        for i, char in enumerate(json_str):
-            if escape_next:
-                escape_next = False
-                continue
-
-            if char == '\\':
-                escape_next = True
-                continue
-
-            if char == '"' and not escape_next:
-                in_string = not in_string
-                continue
-
-            if not in_string:
-                if char == '{':
-                    brace_count += 1
-                elif char == '}':
-                    brace_count -= 1
-                    if brace_count == 0:
-                        end_pos = i + 1
-                        break
-
-        # Extract the complete portion
-        if end_pos > 0:
-            try:
-                truncated_json = json_str[:end_pos]
-                parsed = json.loads(truncated_json)
-                print("✅ Successfully parsed truncated JSON")
-                return parsed
-            except json.JSONDecodeError:
-                pass
-
-        # Try more aggressive repair for truncated arrays/objects
-        try:
-            # Find the last complete key-value pair or array element
-            repaired = self._smart_json_repair(json_str)
-            if repaired:
-                parsed = json.loads(repaired)
-                print("✅ Successfully repaired JSON structure")
-                return parsed
-        except Exception:
-            pass
-
-        # If repair fails, return error with partial info
-        return {
-            "error": "JSON response was truncated and could not be fully repaired",
-            "truncated_at": len(json_str),
-            "partial_preview": json_str[:300] + "..." if len(json_str) > 300 else json_str
-        }
-
-    def _smart_json_repair(self, json_str: str) -> Optional[str]:
-        """Intelligently repair common JSON truncation patterns."""
-
-        # Common truncation patterns and their fixes
-        repairs = [
-            # Truncated in the middle of a string
-            (r'"[^"]*$', '"'),
-            # Truncated after a colon (missing value)
-            (r':\s*$', '": null"'),
-            # Truncated in an array (missing closing bracket/brace)
-            (r',\s*$', ']'),
-            # Truncated after comma in object
-            (r',\s*([^"}\s]+)\s*$', r': "\1"}'),
-        ]
-
-        repaired = json_str
-        for pattern, replacement in repairs:
-            if re.search(pattern, repaired):
-                repaired = re.sub(pattern, replacement, repaired)
-                break
-
-        # Ensure balanced braces
-        open_braces = repaired.count('{')
-        close_braces = repaired.count('}')
-        if open_braces > close_braces:
-            repaired += '}' * (open_braces - close_braces)
-
-        # Ensure balanced brackets
-        open_brackets = repaired.count('[')
-        close_brackets = repaired.count(']')
-        if open_brackets > close_brackets:
-            repaired += ']' * (open_brackets - close_brackets)
-
-        # Remove trailing commas before closing brackets/braces
-        repaired = re.sub(r',(\s*[}\]])', r'\1', repaired)
-
-        return repaired if repaired != json_str else None
+        context = context or {}
+        variables: Dict[str, Any] = {}
+
+        # Only the fields the template references are serialised; a context
+        # entry still takes precedence over the instruction of the same name.
+        for name in self.spec.template_fields:
+            if name in context:
+                value = context[name]
+                variables[name] = (
+                    value if isinstance(value, str)
+                    else _dumps_context(value, self.spec.pretty_context)
+                )
+            elif name == "instruction":
+                variables[name] = instruction
+            else:
+                raise KeyError(
+                    f"Missing template variable '{name}' for subagent '{self.spec.name}'"
+                )
+        return self.spec.task_template.format_map(variables)
 
 
 class ClaudeSubagentManager:
@@ -253,21 +340,13 @@ class ClaudeSubagentManager:
             return
 
         try:
-            with open(self.config_path, "r", encoding="utf-8") as handle:
-                config = yaml.safe_load(handle) or {}
+            # libyaml loader, parsed once per file mtime across orchestrator instances
+            config = load_yaml(str(self.config_path)) or {}
 
             loaded_count = 0
             for name, spec_data in config.get("subagents", {}).items():
                 try:
-                    spec = SubagentSpec(
-                        name=name,
-                        description=spec_data.get("description", ""),
-                        system_prompt=spec_data.get("system_prompt", ""),
-                        task_template=spec_data.get("task_template", ""),
-                        temperature=float(spec_data.get("temperature", 0.2)),
-                        expect_json=bool(spec_data.get("expect_json", True)),
-                    )
-
+                    spec = self._build_spec(name, spec_data)
                     self.subagents[name] = ClaudeSubagent(spec, self._conversation_factory)
                     loaded_count += 1
                 except Exception as e:
@@ -278,6 +357,20 @@ class ClaudeSubagentManager:
         except Exception as e:
             print(f"❌ Failed to load subagent config: {e}")
 
+    @staticmethod
+    def _build_spec(name: str, spec_data: Dict[str, Any]) -> SubagentSpec:
+        """Build an immutable spec from one ``subagents`` YAML entry."""
+        return SubagentSpec(
+            name=name,
+            description=spec_data.get("description", ""),
+            system_prompt=spec_data.get("system_prompt", ""),
+            task_template=spec_data.get("task_template", ""),
+            temperature=float(spec_data.get("temperature", 0.2)),
+            expect_json=bool(spec_data.get("expect_json", True)),
+            reuse_session=bool(spec_data.get("reuse_session", False)),
+            pretty_context=bool(spec_data.get("pretty_context", False)),
+        )
+
     # ------------------------------------------------------------------
     # Convenience helpers
     # ------------------------------------------------------------------
@@ -317,7 +410,7 @@ class ClaudeSubagentManager:
         content = result.get("content")
         if content:
             print("🔄 Extracting structured data from content...")
-            extracted = self._extract_json(content)
+            extracted = _extract_json(content)
             if extracted and isinstance(extracted, dict):
                 return extracted
 
@@ -335,18 +428,8 @@ class ClaudeSubagentManager:
 
     def _extract_material_from_content(self, content: str) -> str:
         """Extract material system from content text."""
-        import re
-
-        # Common material patterns
-        patterns = [
-            r'(SiC|silicon\s*carbide)',
-            r'(Si|silicon)',
-            r'(C|carbon|graphene|diamond)',
-            r'([A-Z][a-z]?\d*[A-Z]?)',  # Simple chemical formula pattern
-        ]
-
-        for pattern in patterns:
-            match = re.search(pattern, content, re.IGNORECASE)
+        for pattern in _MATERIAL_PATTERNS:
+            match = pattern.search(content)
             if match:
                 return match.group(1)
 
@@ -450,11 +533,8 @@ class ClaudeSubagentManager:
 
         # Fallback: look for element symbols in content
         if not elements:
-            import re
-            element_pattern = r'\b([A-Z][a-z]?)\b'
-            found_elements = re.findall(element_pattern, content)
             # Filter common words
-            elements = [el for el in found_elements if el not in ["H", "He", "Be", "PBE", "HSE", "GW", "BSE"]][:5]
+            elements = [el for el in _ELEMENT_RE.findall(content) if el not in _ELEMENT_IGNORE][:5]
 
         return elements if elements else ["Si"]  # Default to Si
 
@@ -0,0 +1,53 @@
+"""
+通用工具函数
+"""
+
+import json
+import threading
+import time
+from typing import Any, Dict, Optional
+
+_JSON_DECODER = json.JSONDecoder()
+# 允许字符串内出现未转义的换行/制表符（LLM输出中常见）
+_LENIENT_JSON_DECODER = json.JSONDecoder(strict=False)
+
+# unique_timestamp 的进程内状态：上一次的秒级时间戳及同一秒内的序号
+_stamp_lock = threading.Lock()
+_last_stamp = ""
+_stamp_seq = 0
+
+
+def extract_json(text: str, strict: bool = True) -> Optional[Dict[str, Any]]:
+    """从每个 '{' 处原地解码，线性扫描取第一个完整JSON对象（避免贪婪正则回溯）
+
+    Args:
+        text: 可能夹杂说明文字或代码块的文本
+        strict: 为False时容忍字符串中的原始控制字符
+
+    Returns:
+        解析出的对象，未找到时返回None
+    """
+    decoder = _JSON_DECODER if strict else _LENIENT_JSON_DECODER
+    start = text.find("{")
+    while start != -1:
+        try:
+            return decoder.raw_decode(text, start)[0]
+        except ValueError:
+            start = text.find("{", start + 1)
+    return None
+
+
+def unique_timestamp() -> str:
+    """返回 %Y%m%d_%H%M%S 格式的作业时间戳，进程内保证唯一
+
+    同一秒内的重复调用依次追加 _001、_002 …，结果仍按字典序递增。
+    """
+    global _last_stamp, _stamp_seq
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    with _stamp_lock:
+        if stamp == _last_stamp:
+            _stamp_seq += 1
+            return f"{stamp}_{_stamp_seq:03d}"
+        _last_stamp = stamp
+        _stamp_seq = 0
+    return stamp
@@ -6,16 +6,24 @@ Simplified Workflow Orchestrator
 """
 
 import asyncio
-import json
-from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List
-from dataclasses import dataclass, asdict
+from typing import Dict, Any, Iterable, Optional, List, Union
+from dataclasses import dataclass, asdict, field
 
 from .input_generator import VASPInputGenerator, VASPInputSpec
 from .hpc_simple import VASPHPCManager, HPCJob
 from .config_manager import get_config_manager, get_api_config
 from .conversation import ConversationManager
+from .llm_cache import LLMCache
+from .utils import extract_json, unique_timestamp
+
+# 规则解析关键词表（顺序即优先级）
+_MATERIAL_KEYWORDS = ("sic", "graphene", "mos2", "bn", "graphite", "diamond")
+_CALC_TYPE_KEYWORDS = (
+    ("relax", ("optimize", "relax", "relaxation")),
+    ("band", ("band", "bandstructure")),
+    ("dos", ("dos", "density")),
+)
 
 
 @dataclass
@@ -36,14 +44,8 @@ class WorkflowResult:
     message: str
     local_dir: str
     hpc_job: Optional[HPCJob] = None
-    files_created: List[str] = None
-    next_steps: List[str] = None
-
-    def __post_init__(self):
-        if self.files_created is None:
-            self.files_created = []
-        if self.next_steps is None:
-            self.next_steps = []
+    files_created: List[str] = field(default_factory=list)
+    next_steps: List[str] = field(default_factory=list)
 
 
 class SimpleVASPWorkflow:
@@ -52,7 +54,7 @@ class SimpleVASPWorkflow:
     def __init__(self, workspace_dir: str = "vasp_jobs"):
         """初始化工作流程"""
         self.workspace = Path(workspace_dir)
-        self.workspace.mkdir(exist_ok=True)
+        self.workspace.mkdir(parents=True, exist_ok=True)
 
         # 初始化组件
         self.config_manager = get_config_manager()
@@ -70,15 +72,23 @@ class SimpleVASPWorkflow:
         else:
             self.conversation_manager = None
 
+        # LLM响应缓存（相同需求不重复调用API）；需求解析以低温采样提取结构化字段，结果可以复用
+        self.llm_cache = LLMCache(max_temperature=0.3)
+
         # HPC管理器（按需初始化）
         self.hpc_manager: Optional[VASPHPCManager] = None
 
-    async def run(self, request: WorkflowRequest) -> WorkflowResult:
+    async def run(
+        self,
+        request: WorkflowRequest,
+        conversation_manager: Optional[ConversationManager] = None,
+    ) -> WorkflowResult:
         """
         运行VASP工作流程
 
         Args:
             request: 工作流程请求
+            conversation_manager: 本次运行使用的对话会话（默认使用实例自带的对话管理器）
 
         Returns:
             工作流程结果
@@ -86,12 +96,15 @@ class SimpleVASPWorkflow:
         try:
             # 1. 解析请求
             if not request.material or not request.calculation_type:
-                parsed = await self._parse_request(request.user_input)
+                parsed = await self._parse_request(
+                    request.user_input,
+                    conversation_manager or self.conversation_manager,
+                )
                 request.material = parsed.get("material", request.material)
                 request.calculation_type = parsed.get("calculation_type", request.calculation_type)
 
             # 2. 生成作业ID
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+            timestamp = unique_timestamp()
             job_id = f"{request.material}_{request.calculation_type}_{timestamp}"
 
             # 3. 准备本地工作目录
@@ -114,7 +127,7 @@ class SimpleVASPWorkflow:
                 message="VASP作业准备完成",
                 local_dir=str(job_dir),
                 hpc_job=hpc_job,
-                files_created=list(files.keys()),
+                files_created=list(files),
                 next_steps=self._get_next_steps(request.submit_to_hpc, job_id, hpc_job)
             )
 
@@ -129,10 +142,14 @@ class SimpleVASPWorkflow:
                 local_dir=""
             )
 
-    async def _parse_request(self, user_input: str) -> Dict[str, str]:
+    async def _parse_request(
+        self,
+        user_input: str,
+        conversation_manager: Optional[ConversationManager],
+    ) -> Dict[str, str]:
         """解析用户输入"""
         # 如果没有对话管理器，使用简单解析
-        if not self.conversation_manager:
+        if not conversation_manager:
             return self._simple_parse(user_input)
 
         # 使用AI解析
@@ -153,18 +170,22 @@ class SimpleVASPWorkflow:
 """
 
         try:
-            result = self.conversation_manager.chat(
+            # LLM调用为阻塞请求，放到线程中执行，批量运行时多个作业的解析可以重叠
+            result = await asyncio.to_thread(
+                self.llm_cache.chat,
+                conversation_manager,
                 input_text=prompt,
                 system_prompt="你是VASP专家，擅长解析计算需求",
                 temperature=0.3
             )
+            if result.get("cached"):
+                print("♻️ 命中LLM缓存，跳过API调用")
 
             if result["status"] == "success":
                 # 提取JSON
-                import re
-                json_match = re.search(r'\{.*\}', result["response"], re.DOTALL)
-                if json_match:
-                    return json.loads(json_match.group())
+                parsed = extract_json(result["response"])
+                if parsed is not None:
+                    return parsed
 
         except Exception as e:
             print(f"⚠️ AI解析失败: {e}")
@@ -176,22 +197,14 @@ class SimpleVASPWorkflow:
         """简单的规则解析"""
         user_input = user_input.lower()
 
-        # 检测材料
-        materials = ["sic", "graphene", "mos2", "bn", "graphite", "diamond"]
-        material = "unknown"
-        for m in materials:
-            if m in user_input:
-                material = m
-                break
+        # 检测材料（按表中顺序取第一个命中）
+        material = next((m for m in _MATERIAL_KEYWORDS if m in user_input), "unknown")
 
         # 检测计算类型
-        calc_type = "scf"
-        if any(word in user_input for word in ["optimize", "relax", "relaxation"]):
-            calc_type = "relax"
-        elif any(word in user_input for word in ["band", "bandstructure"]):
-            calc_type = "band"
-        elif any(word in user_input for word in ["dos", "density"]):
-            calc_type = "dos"
+        calc_type = next(
+            (calc for calc, words in _CALC_TYPE_KEYWORDS if any(word in user_input for word in words)),
+            "scf",
+        )
 
         return {
             "material": material,
@@ -219,7 +232,8 @@ class SimpleVASPWorkflow:
                 work_dir=hpc_config.work_dir
             )
 
-        return self.hpc_manager.prepare_and_submit(job_dir, job_id)
+        # SSH/SCP为阻塞调用，放到线程中执行以免阻塞事件循环上的其他作业
+        return await asyncio.to_thread(self.hpc_manager.prepare_and_submit, job_dir, job_id)
 
     def _get_next_steps(self, submitted: bool, job_id: str, hpc_job: Optional[HPCJob]) -> List[str]:
         """获取下一步操作"""
@@ -240,12 +254,26 @@ class SimpleVASPWorkflow:
 
 
 # 便捷函数
+# 便捷函数共享的工作流程实例（首次调用时创建，免去重复初始化配置和API客户端），
+# 其对话管理器只作为子会话的模板，本身不承载对话历史
+_shared_workflow: Optional[SimpleVASPWorkflow] = None
+
+
+def _get_shared_workflow() -> SimpleVASPWorkflow:
+    """获取共享的工作流程实例"""
+    global _shared_workflow
+    if _shared_workflow is None:
+        _shared_workflow = SimpleVASPWorkflow()
+    return _shared_workflow
+
+
 async def run_vasp_calculation(
     user_input: str,
     material: str = "",
     calc_type: str = "scf",
     submit_to_hpc: bool = False,
-    custom_params: Optional[Dict[str, Any]] = None
+    custom_params: Optional[Dict[str, Any]] = None,
+    workflow: Optional[SimpleVASPWorkflow] = None,
 ) -> WorkflowResult:
     """
     运行VASP计算的便捷函数
@@ -256,11 +284,14 @@ async def run_vasp_calculation(
         calc_type: 计算类型
         submit_to_hpc: 是否提交到HPC
         custom_params: 自定义参数
+        workflow: 使用的工作流程实例（默认使用共享实例）
 
     Returns:
         工作流程结果
     """
-    workflow = SimpleVASPWorkflow()
+    workflow = workflow or _get_shared_workflow()
+    # 每次便捷调用使用独立的空白子会话（共享配置和API客户端），并发调用互不干扰
+    conversation = workflow.conversation_manager.spawn_child() if workflow.conversation_manager else None
 
     request = WorkflowRequest(
         user_input=user_input,
@@ -270,4 +301,47 @@ async def run_vasp_calculation(
         custom_params=custom_params
     )
 
-    return await workflow.run(request)
\ No newline at end of file
+    return await workflow.run(request, conversation_manager=conversation)
+
+
+async def run_vasp_batch(
+    specs: Iterable[Dict[str, Any]],
+    concurrency: int = 4,
+    workflow: Optional[SimpleVASPWorkflow] = None,
+) -> List[Union[WorkflowResult, BaseException]]:
+    """
+    并发运行一批VASP计算
+
+    使用 asyncio.Queue 和固定数量的工作协程，避免逐个 await 串行执行。
+
+    Args:
+        specs: run_vasp_calculation 的关键字参数列表
+        concurrency: 最大并发数
+        workflow: 使用的工作流程实例（默认使用共享实例）
+
+    Returns:
+        与 specs 顺序一致的结果列表，未捕获的异常按原样放入对应位置
+    """
+    specs = list(specs)
+    results: List[Union[WorkflowResult, BaseException, None]] = [None] * len(specs)
+
+    queue: asyncio.Queue = asyncio.Queue()
+    for index, spec in enumerate(specs):
+        queue.put_nowait((index, spec))
+
+    async def worker() -> None:
+        while True:
+            try:
+                index, spec = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            try:
+                results[index] = await run_vasp_calculation(**spec, workflow=workflow)
+            except Exception as e:
+                results[index] = e
+            finally:
+                queue.task_done()
+
+    workers = [asyncio.create_task(worker()) for _ in range(max(1, min(concurrency, len(specs))))]
+    await asyncio.gather(*workers)
+    return results
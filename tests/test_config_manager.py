@@ -0,0 +1,97 @@
+"""Tests for the unified configuration manager's YAML caches."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot import config_manager
+from vasp_robot.config_manager import ConfigManager
+
+_WORKFLOW = """\
+hpc_environment:
+  cluster:
+    host: cluster.example.org
+    user: vasp
+  connection:
+    timeout: 45
+"""
+
+
+class YamlCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.config_dir = self.root / "config"
+        self.config_dir.mkdir()
+        (self.config_dir / "workflow_config.yaml").write_text(_WORKFLOW, encoding="utf-8")
+        self.cache_dir = self.root / "yaml_cache"
+
+        for patcher in (
+            mock.patch.object(config_manager, "YAML_JSON_CACHE_DIR", self.cache_dir),
+            mock.patch.dict(config_manager._yaml_cache, clear=True),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _cache_files(self):
+        return sorted(p.suffix for p in self.cache_dir.iterdir()) if self.cache_dir.exists() else []
+
+    def test_mutating_one_manager_does_not_leak(self):
+        first = ConfigManager(str(self.config_dir))
+        first.get("workflow")["hpc_environment"]["cluster"]["host"] = "changed"
+
+        second = ConfigManager(str(self.config_dir))
+
+        self.assertEqual(second.get("workflow.hpc_environment.cluster.host"), "cluster.example.org")
+        self.assertEqual(second.get_hpc_config().timeout, 45)
+
+    def test_disk_cache_is_json_and_reused(self):
+        ConfigManager(str(self.config_dir))
+        self.assertEqual(self._cache_files(), [".json"])
+        cached = json.loads(next(self.cache_dir.iterdir()).read_text(encoding="utf-8"))
+        self.assertEqual(cached["hpc_environment"]["cluster"]["user"], "vasp")
+
+        config_manager._yaml_cache.clear()
+        with mock.patch.object(config_manager.yaml, "load", side_effect=AssertionError("parsed again")):
+            manager = ConfigManager(str(self.config_dir))
+
+        self.assertEqual(manager.get("workflow.hpc_environment.cluster.user"), "vasp")
+
+    def test_corrupt_cache_file_is_ignored(self):
+        ConfigManager(str(self.config_dir))
+        next(self.cache_dir.iterdir()).write_bytes(b"\x80\x05not json")
+        config_manager._yaml_cache.clear()
+
+        manager = ConfigManager(str(self.config_dir))
+
+        self.assertEqual(manager.get("workflow.hpc_environment.cluster.host"), "cluster.example.org")
+
+    def test_values_json_cannot_round_trip_stay_off_disk(self):
+        (self.config_dir / "workflow_config.yaml").write_text("released: 2026-10-14\n1: int key\n", encoding="utf-8")
+
+        manager = ConfigManager(str(self.config_dir))
+
+        self.assertEqual(str(manager.get("workflow.released")), "2026-10-14")
+        self.assertEqual(self._cache_files(), [])
+
+    def test_secrets_are_not_written_to_disk(self):
+        (self.config_dir / "workflow_config.yaml").unlink()
+        (self.config_dir / "secrets.yaml").write_text("api_keys:\n  kimi: secret\n", encoding="utf-8")
+
+        with mock.patch.dict(os.environ):
+            os.environ.pop("KIMI_API_KEY", None)
+            manager = ConfigManager(str(self.config_dir))
+
+        self.assertEqual(manager.get_api_config("kimi").api_key, "secret")
+        self.assertEqual(self._cache_files(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
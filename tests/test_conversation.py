@@ -0,0 +1,66 @@
+"""Tests for ConversationManager's API log index."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from datetime import datetime
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.conversation import ConversationManager
+
+
+class LogIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        self._cwd = os.getcwd()
+        os.chdir(self.root)
+        self.log_dir = self.root / "api_logs"
+        self.log_dir.mkdir()
+        # Backdate the directory so a file created within the same clock tick still changes its mtime
+        os.utime(self.log_dir, ns=(0, 0))
+
+        prompts = self.root / "system_prompts.yaml"
+        prompts.write_text(json.dumps({"persistence": {"enable_logging": False}}), encoding="utf-8")
+        with mock.patch.dict(os.environ, {"KIMI_API_KEY": "test-key"}):
+            self.manager = ConversationManager(str(prompts), secrets_path=str(self.root / "secrets.yaml"))
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def _write_log(self, day: str, **entry) -> Path:
+        path = self.log_dir / f"api_calls_{day}.jsonl"
+        with open(path, "a", encoding="utf-8") as handle:
+            handle.write(json.dumps({"timestamp": datetime.now().isoformat(), **entry}) + "\n")
+        return path
+
+    def test_log_written_by_another_process_is_found(self):
+        self.assertEqual(self.manager.get_recent_logs(), [])
+
+        self._write_log(datetime.now().strftime("%Y%m%d"), status="success")
+
+        self.assertEqual([log["status"] for log in self.manager.get_recent_logs()], ["success"])
+
+    def test_child_sees_refreshed_index(self):
+        child = self.manager.spawn_child()
+
+        self._write_log(datetime.now().strftime("%Y%m%d"), status="success")
+
+        self.assertEqual(len(self.manager.get_recent_logs()), 1)
+        self.assertEqual(len(child.get_recent_logs()), 1)
+
+    def test_unchanged_directory_is_not_rescanned(self):
+        self.manager.get_recent_logs()
+
+        with mock.patch.object(self.manager, "_scan_log_dir", side_effect=AssertionError("rescanned")):
+            self.assertEqual(self.manager.get_recent_logs(), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for the POTCAR directory index."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "fermi_level"))
+
+import generate_potcar
+from generate_potcar import POTCARGenerator
+
+
+class PotcarIndexTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+        self.potcar_dir = self.root / "potentials"
+        self._write("potpaw_PBE/Si/POTCAR_Si_PBE", 1_000_000_000)
+        self._write("potpaw_PBE/C/POTCAR_C_PBE", 1_000_000_000)
+
+        for name, value in (
+            ("POTCAR_INDEX_CACHE", self.root / "cache" / "potcar_index.json"),
+            ("_INDEX_MEMO", {}),
+        ):
+            patcher = mock.patch.object(generate_potcar, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.generator = POTCARGenerator()
+
+    def _write(self, relative: str, mtime: int) -> Path:
+        path = self.potcar_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("PAW_PBE TITEL End of Dataset\n")
+        os.utime(path, (mtime, mtime))
+        return path
+
+    def _discover(self):
+        with mock.patch("builtins.print"):
+            return self.generator.discover_potentials(str(self.potcar_dir))
+
+    def test_file_added_to_nested_directory_is_found(self):
+        self.assertNotIn("H", self._discover())
+
+        # Only potpaw_PBE/H changes; the top-level directory's mtime stays put
+        self._write("potpaw_PBE/H/POTCAR_H_PBE", 1_000_000_000)
+
+        self.assertTrue(self._discover()["H"].endswith("POTCAR_H_PBE"))
+
+    def test_newer_file_in_existing_bucket_wins(self):
+        self._write("potpaw_PBE/Si/POTCAR_Si_PBE_old", 900_000_000)
+        first = self._discover()["Si"]
+        self.assertTrue(first.endswith("POTCAR_Si_PBE"))
+
+        self._write("potpaw_PBE/Si/POTCAR_Si_PBE_old", 1_100_000_000)
+
+        self.assertTrue(self._discover()["Si"].endswith("POTCAR_Si_PBE_old"))
+
+    def test_removed_file_is_dropped(self):
+        self._write("potpaw_PBE/H/POTCAR_H_PBE", 1_000_000_000)
+        self.assertIn("H", self._discover())
+
+        (self.potcar_dir / "potpaw_PBE" / "H" / "POTCAR_H_PBE").unlink()
+
+        self.assertNotIn("H", self._discover())
+
+    def test_index_persists_across_processes(self):
+        self._discover()
+        generate_potcar._INDEX_MEMO.clear()
+
+        with mock.patch.object(generate_potcar, "_scan_files", side_effect=AssertionError("rescanned")):
+            self.assertEqual(set(self._discover()), {"Si", "C"})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+"""Tests for Slurm status polling in HPCAutomation."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from typing import Dict, Tuple
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.hpc_automation import HPCAutomation
+
+CONFIG_PATH = str(Path(__file__).parent.parent / "config" / "workflow_config.yaml")
+
+
+class JobStatusTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        with mock.patch.dict(os.environ, {"HOME": self._tmp.name}):
+            self.hpc = HPCAutomation(CONFIG_PATH)
+        self.squeue = (True, "")
+        self.sacct = (True, "")
+        self.commands = []
+
+        def run_ssh_command(command: str, timeout: int = None) -> Tuple[bool, str]:
+            self.commands.append(command)
+            return self.squeue if command.startswith("squeue") else self.sacct
+
+        for patcher in (
+            mock.patch.object(self.hpc, "_run_ssh_command", side_effect=run_ssh_command),
+            mock.patch("builtins.print"),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _states(self, *job_ids: str) -> Dict[str, str]:
+        return {job_id: status.status for job_id, status in self.hpc.get_job_statuses(list(job_ids)).items()}
+
+    def test_queued_jobs_skip_sacct(self):
+        self.squeue = (True, "1|RUNNING|2026-10-14T12:00:00\n2|PENDING|2026-10-14T12:01:00")
+
+        self.assertEqual(self._states("1", "2"), {"1": "RUNNING", "2": "PENDING"})
+        self.assertEqual(len(self.commands), 1)
+        self.assertTrue(self.commands[0].startswith("squeue"))
+
+    def test_sacct_settles_jobs_that_left_the_queue(self):
+        self.squeue = (True, "1|RUNNING|2026-10-14T12:00:00\n3|COMPLETED|2026-10-14T12:00:00")
+        self.sacct = (True, "\n".join([
+            "2|CANCELLED by 1234|2026-10-14T11:00:00|Unknown|Unknown|0:15|1",
+            "3|COMPLETED|2026-10-14T12:00:00|2026-10-14T12:00:05|2026-10-14T12:30:00|0:0|2",
+        ]))
+
+        statuses = self.hpc.get_job_statuses(["1", "2", "3"])
+
+        self.assertEqual({k: v.status for k, v in statuses.items()}, {"1": "RUNNING", "2": "CANCELLED", "3": "COMPLETED"})
+        self.assertEqual(statuses["3"].nodes_used, 2)
+        self.assertEqual(statuses["2"].exit_code, 0)
+        self.assertIsNone(statuses["2"].start_time)
+        self.assertTrue(self.commands[1].startswith("sacct -j 2,3 "))
+
+    def test_failed_squeue_falls_back_to_sacct(self):
+        self.squeue = (False, "slurm_load_jobs error: Invalid job id specified")
+        self.sacct = (True, "4|TIMEOUT|2026-10-14T11:00:00|2026-10-14T11:00:05|2026-10-14T13:00:05|0:1|1")
+
+        self.assertEqual(self._states("4"), {"4": "TIMEOUT"})
+        self.assertTrue(self.commands[1].startswith("sacct -j 4 "))
+
+    def test_wait_for_job_returns_final_state(self):
+        self.sacct = (True, "5|OUT_OF_MEMORY|2026-10-14T11:00:00|2026-10-14T11:00:05|2026-10-14T11:10:00|0:125|1")
+
+        self.assertFalse(self.hpc.wait_for_job("5", check_interval=0, max_wait=5))
+        self.assertTrue(any(command.startswith("squeue") for command in self.commands))
+
+
+if __name__ == "__main__":
+    unittest.main()
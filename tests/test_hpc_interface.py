@@ -0,0 +1,170 @@
+"""Tests for Slurm job tracking in HPCInterface."""
+
+import sys
+import unittest
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.hpc_interface import HPCInterface
+
+CONFIG_PATH = str(Path(__file__).parent.parent / "config" / "vasp_config.yaml")
+
+
+class _FakeChannel:
+    def __init__(self, stderr: bytes) -> None:
+        self._stderr = stderr
+        self.closed = False
+
+    def settimeout(self, timeout: float) -> None:
+        self.timeout = timeout
+
+    def recv_stderr_ready(self) -> bool:
+        return bool(self._stderr)
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakeStream:
+    """Mimics paramiko's ChannelFile: iterable lines plus ``read``."""
+
+    def __init__(self, lines: List[str], stderr: bytes = b"") -> None:
+        self._lines = lines
+        self.channel = _FakeChannel(stderr)
+        self.consumed = 0
+
+    def __iter__(self):
+        for line in self._lines:
+            self.consumed += 1
+            yield line
+
+    def read(self) -> bytes:
+        return "".join(self._lines).encode()
+
+
+class _FakeTransport:
+    def is_active(self) -> bool:
+        return True
+
+
+class _FakeClient:
+    """Answers commands by prefix and records what was run."""
+
+    def __init__(self, responses: Dict[str, _FakeStream]) -> None:
+        self._responses = responses
+        self.commands: List[str] = []
+
+    def get_transport(self) -> _FakeTransport:
+        return _FakeTransport()
+
+    def exec_command(self, command: str):
+        self.commands.append(command)
+        for prefix, stream in self._responses.items():
+            if command.startswith(prefix):
+                return None, stream, _FakeStream([])
+        return None, _FakeStream([]), _FakeStream([])
+
+
+def _forever(lines: List[str]) -> List[str]:
+    """A squeue -i stream never ends on its own; cap it so a hang fails loudly."""
+    return lines * 1000
+
+
+def _interface(client: _FakeClient) -> HPCInterface:
+    interface = HPCInterface(CONFIG_PATH)
+    interface.ssh_client = client
+    interface.connected = True
+    return interface
+
+
+class StreamJobStatusTest(unittest.TestCase):
+    def test_job_reaching_terminal_state(self):
+        stream = _FakeStream([
+            "Wed Oct 14 12:00:00 2026\n", "JOBID STATE\n", "42 RUNNING\n",
+            "Wed Oct 14 12:00:30 2026\n", "JOBID STATE\n", "42 COMPLETED\n",
+            "Wed Oct 14 12:01:00 2026\n",
+        ])
+        interface = _interface(_FakeClient({"squeue -i": stream}))
+
+        self.assertTrue(interface.monitor_job("42", check_interval=0))
+        self.assertEqual(stream.consumed, 6)
+        self.assertTrue(stream.channel.closed)
+
+    def test_job_leaving_queue_falls_back_to_sacct(self):
+        stream = _FakeStream(
+            ["Wed Oct 14 12:00:00 2026\n", "JOBID STATE\n", "42 RUNNING\n"]
+            + _forever(["Wed Oct 14 12:00:30 2026\n", "JOBID STATE\n"])
+        )
+        client = _FakeClient({
+            "squeue -i": stream,
+            "sacct": _FakeStream(["42|FAILED\n", "42.batch|FAILED\n"]),
+        })
+
+        self.assertFalse(_interface(client).monitor_job("42", check_interval=0))
+        self.assertLess(stream.consumed, 10)
+        self.assertTrue(any(command.startswith("sacct") for command in client.commands))
+
+    def test_purged_job_without_header_does_not_hang(self):
+        stream = _FakeStream(
+            _forever(["Wed Oct 14 12:00:00 2026\n"]),
+            stderr=b"slurm_load_jobs error: Invalid job id specified\n",
+        )
+        client = _FakeClient({
+            "squeue -i": stream,
+            "sacct": _FakeStream(["42|COMPLETED\n"]),
+        })
+
+        self.assertTrue(_interface(client).monitor_job("42", check_interval=0))
+        self.assertEqual(stream.consumed, 1)
+        self.assertTrue(stream.channel.closed)
+
+    def test_unknown_job_without_stderr_stops_after_one_iteration(self):
+        stream = _FakeStream(_forever(["Wed Oct 14 12:00:00 2026\n"]))
+        client = _FakeClient({"squeue -i": stream, "sacct": _FakeStream([])})
+
+        self.assertTrue(_interface(client).monitor_job("42", check_interval=0))
+        self.assertLessEqual(stream.consumed, 3)
+
+
+class MonitorJobsTest(unittest.TestCase):
+    def test_sacct_states_end_monitoring(self):
+        client = _FakeClient({
+            "squeue -h": _FakeStream(["1 RUNNING\n"]),
+            "sacct": _FakeStream([
+                "2|TIMEOUT\n", "2.batch|CANCELLED\n",
+                "3|OUT_OF_MEMORY\n", "4|NODE_FAIL\n",
+                "5|CANCELLED by 1234\n", "6|COMPLETED\n",
+            ]),
+        })
+
+        states = _interface(client).check_jobs_status(["1", "2", "3", "4", "5", "6"])
+
+        self.assertEqual(states, {
+            "1": "RUNNING", "2": "TIMEOUT", "3": "OUT_OF_MEMORY",
+            "4": "NODE_FAIL", "5": "CANCELLED", "6": "COMPLETED",
+        })
+
+    def test_timed_out_jobs_are_reported_failed(self):
+        client = _FakeClient({
+            "squeue -h": _FakeStream([]),
+            "sacct": _FakeStream(["2|TIMEOUT\n", "3|OUT_OF_MEMORY\n", "4|COMPLETED\n"]),
+        })
+
+        results = _interface(client).monitor_jobs(["2", "3", "4"], check_interval=0)
+
+        self.assertEqual(results, {"2": False, "3": False, "4": True})
+        self.assertEqual(sum(command.startswith("sacct") for command in client.commands), 1)
+
+    def test_stream_stops_on_timeout_state(self):
+        stream = _FakeStream(_forever(["Wed Oct 14 12:00:00 2026\n", "JOBID STATE\n", "42 TIMEOUT\n"]))
+        client = _FakeClient({"squeue -i": stream})
+
+        self.assertFalse(_interface(client).monitor_job("42", check_interval=0))
+        self.assertEqual(stream.consumed, 3)
+        self.assertFalse(any(command.startswith("sacct") for command in client.commands))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,194 @@
+"""Tests for the simplified HPC client."""
+
+import os
+import stat
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.hpc_simple import HPCConnection, SimpleHPCClient, SlurmStatusCache
+
+# Stands in for scp: copies with `cp -r`, whose directory semantics match scp -r,
+# and expands remote globs the way the remote shell would.
+_FAKE_SCP = """#!/bin/sh
+while [ "$#" -gt 0 ]; do
+  case "$1" in
+    -r) shift ;;
+    -o|-P) shift 2 ;;
+    *) break ;;
+  esac
+done
+dest=""
+for arg in "$@"; do dest="$arg"; done
+set -- $(for arg in "$@"; do [ "$arg" = "$dest" ] || echo "${arg#*:}"; done)
+exec cp -r "$@" "${dest#*:}"
+"""
+
+
+class _FakeSFTP:
+    """SFTP client backed by a local directory."""
+
+    def get_channel(self):
+        return None
+
+    def close(self) -> None:
+        pass
+
+    def mkdir(self, path: str) -> None:
+        os.mkdir(path)
+
+    def putfo(self, handle, path: str) -> None:
+        Path(path).write_bytes(handle.read())
+
+    def getfo(self, path: str, handle) -> None:
+        handle.write(Path(path).read_bytes())
+
+    def listdir_attr(self, path: str):
+        return [
+            SimpleNamespace(filename=entry.name, st_mode=entry.stat().st_mode)
+            for entry in os.scandir(path)
+        ]
+
+
+class _FakeClient:
+    def open_sftp(self) -> _FakeSFTP:
+        return _FakeSFTP()
+
+    def get_transport(self):
+        return SimpleNamespace(is_active=lambda: True)
+
+
+def _tree(root: Path):
+    return sorted(str(p.relative_to(root)) for p in root.rglob("*"))
+
+
+class TransferLayoutTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        bin_dir = self.root / "bin"
+        bin_dir.mkdir()
+        scp = bin_dir / "scp"
+        scp.write_text(_FAKE_SCP)
+        scp.chmod(scp.stat().st_mode | stat.S_IEXEC)
+        env = mock.patch.dict(os.environ, {
+            "HOME": str(self.root),
+            "PATH": f"{bin_dir}{os.pathsep}{os.environ['PATH']}",
+        })
+        env.start()
+        self.addCleanup(env.stop)
+
+        self.job_dir = self.root / "job"
+        (self.job_dir / "inputs").mkdir(parents=True)
+        (self.job_dir / "INCAR").write_text("ENCUT = 520\n")
+        (self.job_dir / "inputs" / "POSCAR").write_text("SiC\n")
+        self.client = SimpleHPCClient(HPCConnection(host="cluster", user="vasp", control_persist=None))
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def _remote(self, name: str) -> Path:
+        remote = self.root / name
+        remote.mkdir()
+        return remote
+
+    def test_upload_layout_matches_between_sftp_and_scp(self):
+        via_sftp = self._remote("via_sftp")
+        via_scp = self._remote("via_scp")
+
+        with mock.patch.object(self.client, "get_client", return_value=_FakeClient()):
+            self.assertTrue(self.client.upload_job(self.job_dir, str(via_sftp)))
+        with mock.patch.object(self.client, "get_client", return_value=None):
+            self.assertTrue(self.client.upload_job(self.job_dir, str(via_scp)))
+
+        self.assertEqual(_tree(via_sftp), ["INCAR", "inputs", "inputs/POSCAR"])
+        self.assertEqual(_tree(via_scp), _tree(via_sftp))
+
+    def test_download_layout_matches_between_sftp_and_scp(self):
+        via_sftp = self.root / "down_sftp"
+        via_scp = self.root / "down_scp"
+
+        with mock.patch.object(self.client, "get_client", return_value=_FakeClient()):
+            self.assertTrue(self.client.download_results(str(self.job_dir), via_sftp))
+        with mock.patch.object(self.client, "get_client", return_value=None):
+            self.assertTrue(self.client.download_results(str(self.job_dir), via_scp))
+
+        self.assertEqual(_tree(via_sftp), ["INCAR", "inputs", "inputs/POSCAR"])
+        self.assertEqual(_tree(via_scp), _tree(via_sftp))
+
+    def test_upload_single_file(self):
+        remote = self._remote("single")
+
+        with mock.patch.object(self.client, "get_client", return_value=_FakeClient()):
+            self.assertTrue(self.client.upload_job(self.job_dir / "INCAR", str(remote)))
+
+        self.assertEqual((remote / "INCAR").read_text(), "ENCUT = 520\n")
+
+    def test_upload_missing_path_fails(self):
+        remote = self._remote("missing")
+
+        with mock.patch.object(self.client, "get_client", return_value=_FakeClient()):
+            self.assertFalse(self.client.upload_job(self.root / "nope", str(remote)))
+
+
+class SlurmStatusCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self.client = SimpleHPCClient(HPCConnection(host="cluster", user="vasp", control_persist=None))
+        self.queue = {}
+        self.commands = []
+
+        def exec_on_client(client, command, timeout=None):
+            self.commands.append(command)
+            requested = command.rsplit("-j ", 1)[1].split(",")
+            rows = [f"{job_id} {self.queue[job_id]}" for job_id in requested if job_id in self.queue]
+            return True, "\n".join(rows)
+
+        for name, value in (("get_client", lambda: _FakeClient()), ("exec_on_client", exec_on_client)):
+            patcher = mock.patch.object(self.client, name, side_effect=value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.cache = SlurmStatusCache(self.client, interval=0)
+
+    def test_one_squeue_call_covers_all_registered_jobs(self):
+        self.queue = {"1": "RUNNING", "2": "PENDING"}
+        self.cache.interval = 60
+        self.cache.register(["1", "2"])
+
+        self.assertEqual(self.cache.get("1"), "RUNNING")
+        self.assertEqual(self.cache.get("2"), "PENDING")
+        self.assertEqual(self.commands, ["squeue -h -o '%i %T' -j 1,2"])
+
+    def test_finished_jobs_leave_the_query(self):
+        self.queue = {"1": "RUNNING", "2": "RUNNING", "3": "RUNNING"}
+        self.cache.register(["1", "2", "3"])
+        self.cache.get("1")
+
+        del self.queue["1"]
+        self.queue["2"] = "TIMEOUT"
+        self.assertEqual(self.cache.get("3"), "RUNNING")
+        self.assertEqual(self.cache.get("3"), "RUNNING")
+
+        self.assertEqual(self.commands[-1], "squeue -h -o '%i %T' -j 3")
+        self.assertEqual(self.cache.get("1"), "COMPLETED")
+        self.assertEqual(self.cache.get("2"), "TIMEOUT")
+        self.assertEqual(self.commands[-1], "squeue -h -o '%i %T' -j 3")
+
+    def test_no_query_once_every_job_finished(self):
+        self.queue = {}
+        self.cache.register(["1"])
+        self.assertEqual(self.cache.get("1"), "COMPLETED")
+        calls = len(self.commands)
+
+        self.cache.invalidate()
+        self.assertEqual(self.cache.get("1"), "COMPLETED")
+        self.cache.register(["1"])
+        self.assertEqual(len(self.commands), calls)
+
+
+if __name__ == "__main__":
+    unittest.main()
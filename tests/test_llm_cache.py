@@ -0,0 +1,136 @@
+"""Tests for the on-disk LLM response cache."""
+
+import json
+import os
+import sys
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.conversation import ConversationManager
+from vasp_robot.llm_cache import LLMCache
+
+
+class _FakeCompletions:
+    """Answers every request with a numbered reply and records the messages sent."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.messages = []
+
+    def create(self, model, messages, temperature):
+        self.calls += 1
+        self.messages.append(messages)
+        message = SimpleNamespace(content=f"reply {self.calls}")
+        return SimpleNamespace(choices=[SimpleNamespace(message=message)], usage=None)
+
+
+class _CacheTestCase(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        # ConversationManager keeps its api_logs directory in the working directory
+        self._cwd = os.getcwd()
+        os.chdir(self.root)
+        self.cache = LLMCache(self.root / "cache", max_temperature=0.3)
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def conversation(self, model: str = "kimi-k2-0905-preview", prompt: str = "system") -> ConversationManager:
+        prompts = self.root / "system_prompts.yaml"
+        prompts.write_text(json.dumps({
+            "vasp_orchestrator_prompt": prompt,
+            "conversation": {"max_history_messages": 20},
+            "persistence": {"enable_logging": False},
+        }), encoding="utf-8")
+        secrets = self.root / "secrets.yaml"
+        secrets.write_text(json.dumps({"services": {"kimi": {"model": model}}}), encoding="utf-8")
+
+        with mock.patch.dict(os.environ, {"KIMI_API_KEY": "test-key"}):
+            manager = ConversationManager(str(prompts), secrets_path=str(secrets))
+        manager.completions = _FakeCompletions()
+        manager.client = SimpleNamespace(chat=SimpleNamespace(completions=manager.completions))
+        return manager
+
+
+class LLMCacheChatTest(_CacheTestCase):
+    def test_hit_appends_turns_to_history(self):
+        first = self.conversation()
+        miss = self.cache.chat(first, "analyse SiC", temperature=0.3)
+        second = self.conversation()
+        hit = self.cache.chat(second, "analyse SiC", temperature=0.3)
+
+        self.assertFalse(miss["cached"])
+        self.assertTrue(hit["cached"])
+        self.assertEqual(hit["response"], miss["response"])
+        self.assertEqual(second.completions.calls, 0)
+        self.assertEqual(second.api_history(), first.api_history())
+
+    def test_history_is_part_of_the_key(self):
+        manager = self.conversation()
+        self.cache.chat(manager, "analyse SiC", temperature=0.3)
+        again = self.cache.chat(manager, "analyse SiC", temperature=0.3)
+
+        self.assertFalse(again["cached"])
+        self.assertEqual(manager.completions.calls, 2)
+
+    def test_model_is_part_of_the_key(self):
+        self.cache.chat(self.conversation("model-a"), "analyse SiC", temperature=0.3)
+        other = self.conversation("model-b")
+        result = self.cache.chat(other, "analyse SiC", temperature=0.3)
+
+        self.assertFalse(result["cached"])
+        self.assertEqual(other.completions.calls, 1)
+
+    def test_edited_default_prompt_misses(self):
+        self.cache.chat(self.conversation(prompt="old prompt"), "analyse SiC", temperature=0.3)
+        edited = self.conversation(prompt="new prompt")
+        result = self.cache.chat(edited, "analyse SiC", temperature=0.3)
+
+        self.assertFalse(result["cached"])
+        self.assertEqual(edited.completions.messages[0][0]["content"], "new prompt")
+
+    def test_sampled_calls_bypass_the_cache(self):
+        manager = self.conversation()
+        for _ in range(2):
+            manager.clear_conversation(verbose=False)
+            result = self.cache.chat(manager, "analyse SiC", temperature=0.7)
+
+        self.assertFalse(result["cached"])
+        self.assertEqual(manager.completions.calls, 2)
+        self.assertFalse((self.root / "cache").exists())
+
+
+class LLMCacheSetTest(unittest.TestCase):
+    def test_directory_created_on_first_write(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMCache(Path(tmp) / "llm")
+            self.assertFalse(cache.cache_dir.exists())
+
+            key = LLMCache.make_key("system", "analyse SiC", 0.0)
+            cache.set(key, {"response": "reply", "status": "success"})
+
+            self.assertEqual(cache.get(key), {"response": "reply", "status": "success"})
+
+    def test_concurrent_writers_to_one_key(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            cache = LLMCache(tmp)
+            key = LLMCache.make_key(None, "analyse SiC", 0.3)
+            values = [{"response": f"reply {i}", "status": "success"} for i in range(16)]
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda value: cache.set(key, value), values * 10))
+
+            self.assertIn(cache.get(key), values)
+            self.assertEqual([p.name for p in Path(tmp).iterdir()], [f"{key}.json"])
+
+
+if __name__ == "__main__":
+    unittest.main()
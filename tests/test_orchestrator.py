@@ -0,0 +1,135 @@
+"""Tests for concurrent input preparation in the orchestrator."""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.orchestrator import (
+    JobSpec,
+    PreparationArtifact,
+    VASPOrchestrator,
+    VaspAgent,
+    create_vasp_agent,
+)
+
+REPO_CONFIG = Path(__file__).parent.parent / "config"
+
+
+def _job(case_id: str, local_dir: Path, encut: int) -> JobSpec:
+    return JobSpec(
+        case_id=case_id,
+        system="SiC",
+        params={"incar": {"ENCUT": encut}, "kpoints": {}},
+        hpc={},
+        paths={"local_dir": str(local_dir), "remote_dir": f"/remote/{case_id}"},
+    )
+
+
+class _RecordingOrchestrator:
+    """Stands in for VASPOrchestrator and records overlapping prepare_inputs calls."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._active = {}
+        self.max_active = {}
+        self.order = []
+
+    def prepare_inputs(self, job_spec: JobSpec) -> PreparationArtifact:
+        local_dir = job_spec.paths["local_dir"]
+        with self._lock:
+            self._active[local_dir] = self._active.get(local_dir, 0) + 1
+            self.max_active[local_dir] = max(self.max_active.get(local_dir, 0), self._active[local_dir])
+        time.sleep(0.02)
+        with self._lock:
+            self._active[local_dir] -= 1
+            self.order.append(job_spec.params["incar"]["ENCUT"])
+        return PreparationArtifact(job=job_spec, hashes={}, generated_files={})
+
+
+class PrepareAllTest(unittest.TestCase):
+    def test_jobs_sharing_case_dir_run_sequentially(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            shared = Path(tmp) / "SiC_scf"
+            other = Path(tmp) / "SiC_band"
+            jobs = [
+                _job("SiC_scf", shared, 400),
+                _job("SiC_band", other, 450),
+                _job("SiC_scf", shared, 500),
+            ]
+            orchestrator = _RecordingOrchestrator()
+            agent = VaspAgent(orchestrator)
+
+            artifacts = asyncio.run(agent._prepare_all(jobs))
+
+            self.assertEqual(orchestrator.max_active[str(shared)], 1)
+            self.assertEqual([a.job for a in artifacts], jobs)
+            shared_order = [encut for encut in orchestrator.order if encut != 450]
+            self.assertEqual(shared_order, [400, 500])
+
+
+class WriteBytesIfChangedTest(unittest.TestCase):
+    def test_concurrent_writers_to_one_target(self):
+        orchestrator = VASPOrchestrator.__new__(VASPOrchestrator)
+        with tempfile.TemporaryDirectory() as tmp:
+            target = Path(tmp) / "INCAR"
+            payloads = [f"ENCUT = {400 + i}\n".encode() for i in range(16)]
+
+            with ThreadPoolExecutor(max_workers=8) as pool:
+                list(pool.map(lambda data: orchestrator._write_bytes_if_changed(target, data), payloads * 10))
+
+            self.assertIn(target.read_bytes(), payloads)
+            self.assertEqual(sorted(p.name for p in Path(tmp).iterdir()), ["INCAR"])
+
+
+class CreateVaspAgentTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = Path(self._tmp.name)
+        shutil.copytree(REPO_CONFIG, self.root / "config")
+        self._cwd = os.getcwd()
+        os.chdir(self.root)
+        env = mock.patch.dict(os.environ, {"KIMI_API_KEY": "test-key", "HOME": str(self.root)})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_each_agent_has_its_own_conversation(self):
+        first = create_vasp_agent()
+        second = create_vasp_agent()
+
+        first_manager = first.orchestrator.conversation_manager
+        second_manager = second.orchestrator.conversation_manager
+        self.assertIsNot(first_manager, second_manager)
+        self.assertIs(first_manager.client, second_manager.client)
+
+        first_manager.record_exchange("analyse SiC", "ok")
+        self.assertEqual(second_manager.api_history(), [])
+
+    def test_config_edits_are_picked_up(self):
+        config = self.root / "config" / "vasp_config.yaml"
+        first = create_vasp_agent()
+        text = config.read_text(encoding="utf-8").replace("~/vasp-workspace", "~/edited-workspace")
+        config.write_text(text, encoding="utf-8")
+        os.utime(config, ns=(time.time_ns() + 10**9,) * 2)
+
+        second = create_vasp_agent()
+
+        self.assertEqual(first.orchestrator.config["paths"]["local_root"], "~/vasp-workspace")
+        self.assertEqual(second.orchestrator.config["paths"]["local_root"], "~/edited-workspace")
+
+
+if __name__ == "__main__":
+    unittest.main()
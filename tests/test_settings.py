@@ -0,0 +1,119 @@
+"""Tests for the shared YAML/settings loaders."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+import yaml
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot import settings
+from vasp_robot.settings import get_settings, load_yaml
+
+REPO_CONFIG = Path(__file__).parent.parent / "config"
+
+_EDGE_CASES = {
+    "scalars": "a: 1\nb: [1, 2.5, true, null, ~, 0x10, 2026-01-01, -1.5e3]\n",
+    "quoted": "k: \"1\"\ns: 'yes'\n",
+    "plain_keys": "1: int key\nyes: bool key\n~: null key\n",
+    "nested": "- a\n- {b: c, d: [e, {f: g}]}\n",
+    "empty_value": "empty:\nnext: 1\n",
+    "block_scalar": "x: |\n  line1\n  line2\ny: >\n  folded\n  text\n",
+    "bare_scalar": "plain",
+    "empty_document": "",
+    "anchors": "a: &x {k: 1}\nb: *x\n",
+    "tags": "a: !!str 12\n",
+}
+
+
+class MtimeCacheTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        self.root = Path(self._tmp.name)
+
+    def _write(self, name: str, text: str, mtime_ns: int) -> str:
+        path = self.root / name
+        path.write_text(text, encoding="utf-8")
+        os.utime(path, ns=(mtime_ns, mtime_ns))
+        return str(path)
+
+    def test_load_yaml_reuses_result_until_mtime_changes(self):
+        path = self._write("vasp_config.yaml", "defaults: {incar: {ENCUT: 520}}\n", 10**18)
+        first = load_yaml(path)
+        self.assertIs(load_yaml(path), first)
+
+        self._write("vasp_config.yaml", "defaults: {incar: {ENCUT: 600}}\n", 10**18 + 1)
+
+        self.assertEqual(load_yaml(path)["defaults"]["incar"]["ENCUT"], 600)
+
+    def test_get_settings_follows_each_file(self):
+        base = self._write("vasp_config.yaml", "defaults: {incar: {ENCUT: 520}}\n", 10**18)
+        prompts = self._write("system_prompts.yaml", "conversation: {max_history_messages: 20}\n", 10**18)
+        secrets = str(self.root / "missing_secrets.yaml")
+
+        first = get_settings(base, prompts, secrets)
+        self.assertIs(get_settings(base, prompts, secrets), first)
+        self.assertEqual(first.secrets, {})
+
+        # Same mtime, different size: the stat key still changes
+        self._write("system_prompts.yaml", "conversation: {max_history_messages: 200}\n", 10**18)
+        second = get_settings(base, prompts, secrets)
+
+        self.assertIsNot(second, first)
+        self.assertEqual(second.prompts["conversation"]["max_history_messages"], 200)
+        self.assertEqual(second.get_incar_defaults()["ENCUT"], 520)
+
+    def test_incar_defaults_are_read_only(self):
+        base = self._write("vasp_config.yaml", "defaults: {incar: {ENCUT: 520}}\n", 10**18)
+
+        defaults = get_settings(base, None, None).get_incar_defaults()
+
+        with self.assertRaises(TypeError):
+            defaults["ENCUT"] = 600
+
+
+@unittest.skipIf(settings.ryml is None, "rapidyaml is not installed")
+class RymlEngineTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self._tmp.cleanup)
+        env = mock.patch.dict(os.environ, {"VASP_ROBOT_YAML_ENGINE": "ryml"})
+        env.start()
+        self.addCleanup(env.stop)
+
+    def _load(self, text: str):
+        fd, path = tempfile.mkstemp(suffix=".yaml", dir=self._tmp.name)
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            handle.write(text)
+        return load_yaml(path)
+
+    def test_repo_configs_match_safe_load_without_fallback(self):
+        for path in sorted(REPO_CONFIG.glob("*.yaml")):
+            with self.subTest(config=path.name):
+                expected = yaml.safe_load(path.read_bytes())
+                # The repo configs use no tags or anchors, so PyYAML must not be consulted
+                with mock.patch.object(settings.yaml, "load", side_effect=AssertionError("fell back")):
+                    loaded = self._load(path.read_text(encoding="utf-8"))
+                self.assertEqual(loaded, expected)
+
+    def test_edge_cases_match_safe_load(self):
+        for name, text in _EDGE_CASES.items():
+            with self.subTest(case=name):
+                self.assertEqual(self._load(text), yaml.safe_load(text))
+
+    def test_scalar_types_match_safe_load(self):
+        loaded = self._load(_EDGE_CASES["scalars"])
+        expected = yaml.safe_load(_EDGE_CASES["scalars"])
+        self.assertEqual(
+            [type(value) for value in loaded["b"]],
+            [type(value) for value in expected["b"]],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+"""Tests for sub-agent JSON extraction."""
+
+import json
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.subagents import ClaudeSubagent, ClaudeSubagentManager, SubagentSpec
+
+
+class _FakeSession:
+    """Stands in for ConversationManager and answers every chat with one reply."""
+
+    def __init__(self, response: str) -> None:
+        self.response = response
+
+    def chat(self, input_text, system_prompt=None, temperature=0.7):
+        return {"status": "success", "response": self.response}
+
+
+def _run(response: str, expect_json: bool = True):
+    spec = SubagentSpec(
+        name="analysis", description="", system_prompt="", task_template="{instruction}",
+        expect_json=expect_json,
+    )
+    with mock.patch("builtins.print"):
+        return ClaudeSubagent(spec, lambda: _FakeSession(response)).run("analyse SiC")
+
+
+class ExtractJsonTest(unittest.TestCase):
+    def test_object_inside_markdown_fence(self):
+        result = _run('Here you go:\n```json\n{"material": "SiC", "layers": 6}\n```\nDone.')
+
+        self.assertEqual(result["parsed"], {"material": "SiC", "layers": 6})
+
+    def test_first_object_wins_and_braces_in_strings_are_ignored(self):
+        result = _run('{"note": "use {braces} and \\"quotes\\"", "k": 1} then {"other": 2}')
+
+        self.assertEqual(result["parsed"], {"note": 'use {braces} and "quotes"', "k": 1})
+
+    def test_truncated_string_is_repaired(self):
+        result = _run('{"material": "SiC", "goals": ["band gap", "2DEG densi')
+
+        self.assertEqual(result["parsed"], {"material": "SiC", "goals": ["band gap", "2DEG densi"]})
+
+    def test_truncation_after_key_or_comma_is_repaired(self):
+        cases = {
+            '{"material": "SiC", "layers": [1, 2,': {"material": "SiC", "layers": [1, 2]},
+            '{"material": "SiC", "surface":': {"material": "SiC", "surface": None},
+            '{"material": "SiC", "surface"': {"material": "SiC", "surface": None},
+            '{"plan": [{"step": "relax"}, {"step": "scf", "kpoints": [8, 8': {
+                "plan": [{"step": "relax"}, {"step": "scf", "kpoints": [8, 8]}],
+            },
+        }
+        for response, expected in cases.items():
+            with self.subTest(response=response):
+                self.assertEqual(_run(response)["parsed"], expected)
+
+    def test_unrepairable_object_reports_truncation(self):
+        result = _run('{"material": "SiC", "goals": {"a": [1, 2}')
+
+        self.assertIn("error", result["parsed"])
+        self.assertEqual(result["parsed"]["truncated_at"], len('{"material": "SiC", "goals": {"a": [1, 2}'))
+
+    def test_text_without_json_is_returned_as_content(self):
+        result = _run("No structured answer today.")
+
+        self.assertNotIn("parsed", result)
+        self.assertEqual(result["content"], "No structured answer today.")
+
+
+class AnalyzeInstructionTest(unittest.TestCase):
+    def test_manager_extracts_json_from_plain_content(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            config = Path(tmp) / "subagents.yaml"
+            config.write_text(json.dumps({"subagents": {"analysis": {
+                "task_template": "{instruction}", "expect_json": False,
+            }}}), encoding="utf-8")
+            session = _FakeSession('Analysis: {"material_system": "SiC", "calculation_goals": ["scf"]')
+            with mock.patch("builtins.print"):
+                manager = ClaudeSubagentManager(None, str(config), conversation_factory=lambda: session)
+                analysis = manager.analyze_instruction("analyse SiC")
+
+        self.assertEqual(analysis, {"material_system": "SiC", "calculation_goals": ["scf"]})
+
+
+if __name__ == "__main__":
+    unittest.main()
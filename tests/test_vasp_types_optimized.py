@@ -0,0 +1,47 @@
+"""Tests for the VASP domain types."""
+
+import sys
+import unittest
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "fermi_level"))
+
+from vasp_types_optimized import MaterialSystem, VASPCalculationFactory, VASPWorkflow
+
+_SIC = MaterialSystem(
+    name="3C-SiC Bulk",
+    chemical_formula="SiC",
+    elements=["Si", "C"],
+    crystal_structure="zincblende",
+    lattice_parameters={"a": 4.3596},
+)
+
+
+class CreatedAtTest(unittest.TestCase):
+    def test_created_at_is_accepted_as_datetime(self):
+        moment = datetime(2026, 10, 14, 12, 30, 15, 123456)
+
+        workflow = VASPWorkflow("sic_study", "SiC", created_at=moment)
+
+        self.assertEqual(workflow.created_at, moment)
+        self.assertIsInstance(workflow.created_at_ns, int)
+
+    def test_created_at_defaults_to_now(self):
+        before = datetime.now()
+        calc = VASPCalculationFactory.create_bulk_calculation("sic_bulk", _SIC)
+        after = datetime.now()
+
+        self.assertLessEqual(abs((calc.created_at - before).total_seconds()), 1)
+        self.assertLessEqual(calc.created_at, after)
+
+    def test_positional_created_at_keeps_its_slot(self):
+        moment = datetime(2026, 1, 1)
+
+        workflow = VASPWorkflow("sic_study", "SiC", [], [], moment)
+
+        self.assertEqual(workflow.created_at, moment)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+"""Tests for the simple workflow and its batch runner."""
+
+import asyncio
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from vasp_robot.workflow_simple import SimpleVASPWorkflow, WorkflowResult, run_vasp_batch, run_vasp_calculation
+
+REPO_CONFIG = Path(__file__).parent.parent / "config"
+
+
+class _SlowCache:
+    """Stands in for LLMCache; each chat blocks like a real API round trip."""
+
+    def __init__(self, delay: float = 0.2) -> None:
+        self.delay = delay
+        self._lock = threading.Lock()
+        self._active = 0
+        self.max_active = 0
+        self.conversations = []
+
+    def chat(self, conversation_manager, input_text, system_prompt=None, temperature=0.7):
+        with self._lock:
+            self._active += 1
+            self.max_active = max(self.max_active, self._active)
+            self.conversations.append(conversation_manager)
+        time.sleep(self.delay)
+        with self._lock:
+            self._active -= 1
+        return {"status": "success", "response": '{"material": "sic", "calculation_type": "scf"}'}
+
+
+class RunVaspBatchTest(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        shutil.copytree(REPO_CONFIG, Path(self._tmp.name) / "config")
+        self._cwd = os.getcwd()
+        os.chdir(self._tmp.name)
+        env = {"KIMI_API_KEY": "test-key", "HOME": self._tmp.name}
+        with mock.patch.dict(os.environ, env):
+            self.workflow = SimpleVASPWorkflow(workspace_dir="jobs")
+        self.cache = _SlowCache()
+        self.workflow.llm_cache = self.cache
+
+    def tearDown(self) -> None:
+        os.chdir(self._cwd)
+        self._tmp.cleanup()
+
+    def test_llm_parses_overlap(self):
+        specs = [{"user_input": f"SiC scf run {i}", "material": ""} for i in range(4)]
+
+        started = time.monotonic()
+        results = asyncio.run(run_vasp_batch(specs, concurrency=4, workflow=self.workflow))
+        elapsed = time.monotonic() - started
+
+        self.assertTrue(all(isinstance(r, WorkflowResult) and r.status == "success" for r in results))
+        self.assertEqual(self.cache.max_active, 4)
+        self.assertLess(elapsed, 4 * self.cache.delay)
+
+    def test_each_call_gets_its_own_conversation(self):
+        specs = [{"user_input": f"SiC scf run {i}", "material": ""} for i in range(3)]
+
+        asyncio.run(run_vasp_batch(specs, concurrency=3, workflow=self.workflow))
+
+        conversations = self.cache.conversations
+        self.assertEqual(len({id(c) for c in conversations}), 3)
+        self.assertNotIn(self.workflow.conversation_manager, conversations)
+
+    def test_results_keep_spec_order(self):
+        specs = [{"user_input": "SiC scf", "material": material} for material in ("sic", "graphene", "mos2")]
+
+        results = asyncio.run(run_vasp_batch(specs, concurrency=2, workflow=self.workflow))
+
+        self.assertEqual([r.job_id.split("_")[0] for r in results], ["sic", "graphene", "mos2"])
+
+    def test_files_created_is_a_list(self):
+        result = asyncio.run(run_vasp_calculation("SiC scf", material="sic", workflow=self.workflow))
+
+        self.assertIsInstance(result.files_created, list)
+        self.assertIn("INCAR", result.files_created)
+
+
+if __name__ == "__main__":
+    unittest.main()
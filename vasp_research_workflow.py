@@ -6,23 +6,32 @@ VASP Scientific Computing Workflow Script
 """
 
 import asyncio
+import hashlib
 import json
 import os
+import string
 import sys
 import time
+from collections import deque
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
-from dataclasses import dataclass, asdict
-import yaml
+from typing import Deque, Dict, Any, Optional
+from dataclasses import dataclass, asdict, fields
 from dotenv import load_dotenv
+try:  # 可选依赖：orjson 序列化速度是标准库的数倍，直接输出UTF-8字节
+    import orjson
+except ImportError:
+    orjson = None
 
 from src.vasp_robot import (
     ClaudeSubagentManager,
     ConversationManager,
     HPCAutomation,
+    LLMCache,
     create_vasp_agent,
 )
+from src.vasp_robot.settings import load_yaml
+from src.vasp_robot.utils import extract_json, unique_timestamp
 
 
 @dataclass
@@ -51,19 +60,165 @@ class VASPJobSpec:
     poscar_source: str
     potcar_sequence: list
     slurm_script: str
+    research_fingerprint: Optional[str] = None  # 科研需求指纹，用于复用历史方案
+
+
+def _dumps(obj: Any, indent: bool = False) -> bytes:
+    """序列化为UTF-8 JSON字节串（默认紧凑单行），无法序列化的值转为字符串"""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, default=str, option=option)
+    if indent:
+        return json.dumps(obj, ensure_ascii=False, indent=2, default=str).encode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"), default=str).encode("utf-8")
+
+
+def _loads(data: bytes) -> Any:
+    """解析JSON字节串"""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _plan_section(data: Dict[str, Any], key: str) -> Dict[str, Any]:
+    """取计算方案中的嵌套对象，缺失时为空字典，类型不符时报错"""
+    section = data.get(key)
+    if section is None:
+        return {}
+    if not isinstance(section, dict):
+        raise ValueError(f"计算方案字段 {key} 应为JSON对象，实际为 {type(section).__name__}")
+    return section
+
+
+# 提示词模板：不变的说明部分在前、每次请求的内容在最后，
+# 使相同前缀逐字节一致，便于服务端前缀缓存命中
+_ANALYSIS_SYSTEM_PROMPT = "你是材料科学专家，擅长分析科研需求并制定计算方案。"
+_ANALYSIS_TEMPLATE = string.Template("""
+请分析以下科研需求，提取关键信息并按标准格式返回。
+
+请返回JSON格式的分析结果，包含以下字段：
+- scientific_problem: 科学问题的具体描述
+- material_system: 材料体系（如SiC、石墨烯等）
+- properties_of_interest: 关注的性质（如能带结构、力学性质等）
+- calculation_goals: 计算目标（如几何优化、电子结构计算等）
+- constraints: 约束条件（如计算资源限制、精度要求等）
+- analysis_brief: 简要分析（50字以内）
+
+确保分析准确，为后续VASP计算提供清晰的指导。
+
+用户需求: $user_request
+""")
+
+_VASP_PLAN_SYSTEM_PROMPT = "你是VASP计算专家，请生成专业、完整的VASP计算方案。"
+_VASP_PLAN_TEMPLATE = string.Template("""
+请基于文末的科研需求生成完整的VASP计算方案。
+
+请生成JSON格式的VASP计算方案，包含：
+
+1. analysis_summary: 计算方案概述（100字以内）
+2. calculation_plan: 详细的计算步骤和逻辑
+3. vasp_parameters:
+   - incar: 完整的INCAR参数设置
+   - kpoints: K点设置方案
+   - poscar_source: POSCAR文件来源说明
+   - potcar_sequence: POTCAR元素顺序
+
+4. hpc_requirements:
+   - nodes: 节点数
+   - ntasks_per_node: 每节点任务数
+   - walltime: 预估计算时间
+   - partition: 计算分区
+
+5. estimated_runtime: 总预估运行时间
+6. success_criteria: 计算成功的判断标准
+
+要求：
+- 参数设置要科学合理，符合材料计算最佳实践
+- 考虑HPC资源效率
+- 确保计算收敛性和精度
+- 提供完整的技术参数
+
+请确保输出是有效的JSON格式。
+
+科研问题: $scientific_problem
+材料体系: $material_system
+关注性质: $properties_of_interest
+计算目标: $calculation_goals
+约束条件: $constraints
+""")
+
+# 内存中保留的工作流程日志条目数
+WORKFLOW_LOG_MEMORY = 256
+
+_INCAR_HEADER = "VASP INCAR file\n" + "=" * 20 + "\n"
+_INCAR_ORDER = (
+    "SYSTEM", "ENCUT", "ISMEAR", "SIGMA", "EDIFF", "EDIFFG", "NSW", "IBRION",
+    "ISIF", "PREC", "LREAL", "ALGO", "LWAVE", "LCHARG", "NELM", "NELMIN",
+)
+_INCAR_ORDER_SET = frozenset(_INCAR_ORDER)
+
+_JOB_SPEC_FIELDS = frozenset(f.name for f in fields(VASPJobSpec))
+
+
+def _research_fingerprint(research_request: ResearchRequest) -> str:
+    """按科研需求的关键字段计算内容哈希"""
+    payload = json.dumps(
+        {
+            "material_system": research_request.material_system,
+            "properties_of_interest": research_request.properties_of_interest,
+            "calculation_goals": research_request.calculation_goals,
+            "constraints": research_request.constraints,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
 
 
 class VASPResearchWorkflow:
     """VASP科研计算工作流程管理器"""
 
+    # 每个作业只需一次format调用
+    _SLURM_TEMPLATE = (
+        "#!/bin/bash\n"
+        "#SBATCH -p {partition}\n"
+        "#SBATCH -N {nodes}\n"
+        "#SBATCH --ntasks-per-node={ntasks}\n"
+        "#SBATCH -J {job_id}\n"
+        "#SBATCH -o vasp.out\n"
+        "#SBATCH -t {walltime}\n\n"
+        "module load {vasp_module}\n"
+        "export VASP_PP_PATH={potcar_path}\n\n"
+        "echo \"Starting VASP calculation for {job_id}\"\n"
+        "echo \"Start time: $(date)\"\n"
+        "echo \"Job ID: $SLURM_JOB_ID\"\n"
+        "echo \"Nodes: $SLURM_JOB_NUM_NODES\"\n"
+        "echo \"Tasks: $SLURM_NTASKS\"\n\n"
+        "# Build POTCAR (example - should be customized based on elements)\n"
+        "# cat $VASP_PP_PATH/*/POTCAR > POTCAR\n\n"
+        "mpirun -np $SLURM_NTASKS {vasp_exec}\n\n"
+        "echo \"VASP calculation completed\"\n"
+        "echo \"End time: $(date)\"\n"
+    )
+
     def __init__(self, config_path: str = "config/workflow_config.yaml"):
         self.config = self._load_config(config_path)
+
+        # Slurm脚本中不随作业变化的配置项，只查找一次
+        hpc_environment = self.config["hpc_environment"]
+        self._default_resources = hpc_environment["default_resources"]
+        self._slurm_env = {
+            "vasp_module": hpc_environment["vasp_module"]["name"],
+            "potcar_path": hpc_environment["vasp_module"]["potcar_path"],
+            "vasp_exec": hpc_environment["vasp_module"]["executable"],
+        }
         self.workflow_dir = Path("vasp_workflow_jobs")
-        self.workflow_dir.mkdir(exist_ok=True)
+        self.workflow_dir.mkdir(parents=True, exist_ok=True)
 
         # 初始化代理
         self.vasp_agent = create_vasp_agent()
         self.conversation_manager = ConversationManager("config/system_prompts.yaml")
+        # 需求分析以低温采样提取结构化字段，结果可以复用
+        self.llm_cache = LLMCache(max_temperature=0.3)
 
         self.subagent_manager: Optional[ClaudeSubagentManager] = None
         if Path("config/claude_subagents.yaml").exists():
@@ -74,14 +229,61 @@ class VASPResearchWorkflow:
 
         # 工作流程状态
         self.current_job = None
-        self.workflow_log = []
+        # 完整日志逐条追加到NDJSON文件；内存中只保留最近的条目，用于错误报告和作业日志
+        self.workflow_log: Deque[Dict[str, Any]] = deque(maxlen=WORKFLOW_LOG_MEMORY)
+        # 不带缓冲：每条日志一次write追加完整一行，同一进程内的多个实例共用该文件也不会交错截断
+        self._log_fp = (self.workflow_dir / f"workflow_{os.getpid()}.ndjson").open("ab", buffering=0)
         self.latest_analysis_payload: Optional[Dict[str, Any]] = None
         self.latest_plan_payload: Optional[Dict[str, Any]] = None
 
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """加载工作流程配置"""
-        with open(config_path, 'r') as f:
-            return yaml.safe_load(f)
+        # 历史方案缓存：科研需求指纹 -> job_specification
+        self._plan_cache: Dict[str, Dict[str, Any]] = self._scan_plan_cache()
+
+    def close(self) -> None:
+        """关闭NDJSON日志文件"""
+        self._log_fp.close()
+
+    def __enter__(self) -> "VASPResearchWorkflow":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    @staticmethod
+    def _load_config(config_path: str) -> Dict[str, Any]:
+        """加载工作流程配置（按文件mtime缓存解析结果，与HPCAutomation共享，不可修改）"""
+        return load_yaml(config_path)
+
+    def _scan_plan_cache(self) -> Dict[str, Dict[str, Any]]:
+        """扫描工作目录中已保存的作业规范，建立方案缓存"""
+        cache: Dict[str, Dict[str, Any]] = {}
+        for spec_path in self.workflow_dir.glob("*/job_specification.json"):
+            try:
+                payload = _loads(spec_path.read_bytes())
+            except (OSError, ValueError):
+                continue
+            fingerprint = payload.get("research_fingerprint") if isinstance(payload, dict) else None
+            if fingerprint:
+                cache[fingerprint] = payload
+        return cache
+
+    def _plan_from_cache(self, research_request: ResearchRequest, fingerprint: str) -> Optional[VASPJobSpec]:
+        """命中方案缓存时，以新的作业ID重建作业规范"""
+        payload = self._plan_cache.get(fingerprint)
+        if payload is None:
+            return None
+
+        timestamp = unique_timestamp()
+        job_id = f"{research_request.material_system}_{timestamp}" if research_request.material_system else timestamp
+
+        spec_data = {key: value for key, value in payload.items() if key in _JOB_SPEC_FIELDS}
+        spec_data["job_id"] = job_id
+        # HPC参数可能已变化，重新生成Slurm脚本
+        spec_data["slurm_script"] = self._generate_slurm_content(job_id, payload.get("hpc_requirements") or {})
+        try:
+            return VASPJobSpec(**spec_data)
+        except TypeError:
+            return None
 
     def _log_workflow(self, step: str, message: str, data: Any = None):
         """记录工作流程日志"""
@@ -92,13 +294,13 @@ class VASPResearchWorkflow:
             "data": data
         }
         self.workflow_log.append(log_entry)
+        self._log_fp.write(_dumps(log_entry) + b"\n")
         print(f"🔄 [{step}] {message}")
 
     def _save_workflow_log(self, job_id: str):
         """保存工作流程日志"""
         log_file = self.workflow_dir / f"{job_id}_workflow.json"
-        with open(log_file, 'w') as f:
-            json.dump(self.workflow_log, f, indent=2)
+        log_file.write_bytes(_dumps(list(self.workflow_log), indent=True))
 
     async def step1_analyze_research_request(self, user_request: str) -> ResearchRequest:
         """步骤1: 分析科研需求"""
@@ -107,7 +309,7 @@ class VASPResearchWorkflow:
         # 优先尝试使用Claude子代理进行结构化分析
         if self.subagent_manager and self.subagent_manager.has_agent("analysis"):
             try:
-                analysis_data = self.subagent_manager.analyze_instruction(user_request)
+                analysis_data = await asyncio.to_thread(self.subagent_manager.analyze_instruction, user_request)
             except Exception as exc:  # pragma: no cover - defensive logging
                 self._log_workflow("step1", f"Claude子代理分析失败: {exc}")
             else:
@@ -125,44 +327,27 @@ class VASPResearchWorkflow:
                     return research_request
 
         # 使用Kimi分析科研需求，生成标准格式
-        analysis_prompt = f"""
-请分析以下科研需求，提取关键信息并按标准格式返回：
-
-用户需求: {user_request}
-
-请返回JSON格式的分析结果，包含以下字段：
-- scientific_problem: 科学问题的具体描述
-- material_system: 材料体系（如SiC、石墨烯等）
-- properties_of_interest: 关注的性质（如能带结构、力学性质等）
-- calculation_goals: 计算目标（如几何优化、电子结构计算等）
-- constraints: 约束条件（如计算资源限制、精度要求等）
-- analysis_brief: 简要分析（50字以内）
-
-确保分析准确，为后续VASP计算提供清晰的指导。
-"""
+        analysis_prompt = _ANALYSIS_TEMPLATE.substitute(user_request=user_request)
 
         try:
-            result = self.conversation_manager.chat(
+            # LLM调用在线程中执行，等待响应期间事件循环可继续处理HPC连接测试等任务
+            result = await asyncio.to_thread(
+                self.llm_cache.chat,
+                self.conversation_manager,
                 input_text=analysis_prompt,
-                system_prompt="你是材料科学专家，擅长分析科研需求并制定计算方案。",
+                system_prompt=_ANALYSIS_SYSTEM_PROMPT,
                 temperature=0.3
             )
+            self._log_workflow(
+                "step1",
+                "LLM缓存命中" if result.get("cached") else "LLM缓存未命中",
+                {"hits": self.llm_cache.hits, "misses": self.llm_cache.misses},
+            )
 
             if result["status"] == "success":
-                # 提取JSON响应
-                import re
-                json_match = re.search(r'\{.*\}', result["response"], re.DOTALL)
-                if json_match:
-                    try:
-                        analysis_data = json.loads(json_match.group())
-                    except json.JSONDecodeError as e:
-                        print(f"⚠️ JSON解析错误: {e}")
-                        print(f"原始响应: {result['response']}")
-                        # 尝试修复常见的JSON问题
-                        json_str = json_match.group()
-                        json_str = json_str.replace('\n', '\\n').replace('\r', '\\r')
-                        analysis_data = json.loads(json_str)
-
+                # 提取JSON响应（容忍字符串中未转义的换行等控制字符）
+                analysis_data = extract_json(result["response"], strict=False)
+                if analysis_data is not None:
                     research_request = ResearchRequest(
                         scientific_problem=analysis_data.get("scientific_problem", ""),
                         material_system=analysis_data.get("material_system", ""),
@@ -176,6 +361,7 @@ class VASPResearchWorkflow:
                     self._log_workflow("step1", "科研需求分析完成", analysis_data)
                     return research_request
                 else:
+                    print(f"原始响应: {result['response']}")
                     raise ValueError("AI响应中未找到有效JSON")
             else:
                 raise RuntimeError(f"AI分析失败: {result.get('error')}")
@@ -184,16 +370,25 @@ class VASPResearchWorkflow:
             self._log_workflow("step1", f"科研需求分析失败: {e}")
             raise
 
-    async def step2_generate_vasp_plan(self, research_request: ResearchRequest) -> VASPJobSpec:
+    async def step2_generate_vasp_plan(self, research_request: ResearchRequest, cache: bool = True) -> VASPJobSpec:
         """步骤2: 生成VASP计算方案"""
         self._log_workflow("step2", "开始生成VASP计算方案")
 
+        fingerprint = _research_fingerprint(research_request)
+        if cache:
+            job_spec = self._plan_from_cache(research_request, fingerprint)
+            if job_spec is not None:
+                self.current_job = job_spec
+                self._log_workflow("step2", "cache hit", {"job_id": job_spec.job_id, "fingerprint": fingerprint})
+                return job_spec
+
         # 优先尝试使用Claude子代理生成计算方案
         if self.subagent_manager and self.subagent_manager.has_agent("planner"):
             try:
                 planner_input = research_request.user_request or research_request.scientific_problem
                 planner_context = self.latest_analysis_payload or asdict(research_request)
-                vasp_data = self.subagent_manager.plan_vasp_work(
+                vasp_data = await asyncio.to_thread(
+                    self.subagent_manager.plan_vasp_work,
                     planner_input,
                     analysis=planner_context,
                 )
@@ -202,35 +397,16 @@ class VASPResearchWorkflow:
                 vasp_data = {}
 
             if vasp_data:
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                timestamp = unique_timestamp()
                 job_id = f"{research_request.material_system}_{timestamp}" if research_request.material_system else timestamp
 
-                job_spec = VASPJobSpec(
-                    job_id=job_id,
-                    analysis_summary=vasp_data.get("analysis_summary", ""),
-                    calculation_plan=vasp_data.get("calculation_plan", ""),
-                    vasp_parameters=vasp_data.get("vasp_parameters", {}),
-                    hpc_requirements=vasp_data.get("hpc_requirements", {}),
-                    estimated_runtime=vasp_data.get("estimated_runtime", ""),
-                    success_criteria=vasp_data.get("success_criteria", ""),
-                    incar_content=self._generate_incar_content(
-                        vasp_data.get("vasp_parameters", {}).get("incar", {})
-                    ),
-                    kpoints_content=self._generate_kpoints_content(
-                        vasp_data.get("vasp_parameters", {}).get("kpoints", {})
-                    ),
-                    poscar_source=vasp_data.get("vasp_parameters", {}).get("poscar_source", ""),
-                    potcar_sequence=vasp_data.get("vasp_parameters", {}).get("potcar_sequence", []),
-                    slurm_script=self._generate_slurm_content(
-                        job_id,
-                        vasp_data.get("hpc_requirements", {}),
-                    ),
-                )
+                job_spec = self._build_job_spec(job_id, vasp_data, fingerprint)
+                self._plan_cache[fingerprint] = asdict(job_spec)
 
                 self.current_job = job_spec
                 self.latest_plan_payload = vasp_data
 
-                review_notes = self.subagent_manager.review_plan(vasp_data)
+                review_notes = await asyncio.to_thread(self.subagent_manager.review_plan, vasp_data)
                 if review_notes:
                     self._log_workflow("step2_review", "Claude reviewer反馈", review_notes)
 
@@ -238,89 +414,39 @@ class VASPResearchWorkflow:
                 return job_spec
 
         # 构建详细的VASP计算提示
-        vasp_prompt = f"""
-基于以下科研需求，请生成完整的VASP计算方案：
-
-科研问题: {research_request.scientific_problem}
-材料体系: {research_request.material_system}
-关注性质: {research_request.properties_of_interest}
-计算目标: {research_request.calculation_goals}
-约束条件: {research_request.constraints or "无"}
-
-请生成JSON格式的VASP计算方案，包含：
-
-1. analysis_summary: 计算方案概述（100字以内）
-2. calculation_plan: 详细的计算步骤和逻辑
-3. vasp_parameters:
-   - incar: 完整的INCAR参数设置
-   - kpoints: K点设置方案
-   - poscar_source: POSCAR文件来源说明
-   - potcar_sequence: POTCAR元素顺序
-
-4. hpc_requirements:
-   - nodes: 节点数
-   - ntasks_per_node: 每节点任务数
-   - walltime: 预估计算时间
-   - partition: 计算分区
-
-5. estimated_runtime: 总预估运行时间
-6. success_criteria: 计算成功的判断标准
-
-要求：
-- 参数设置要科学合理，符合材料计算最佳实践
-- 考虑HPC资源效率
-- 确保计算收敛性和精度
-- 提供完整的技术参数
-
-请确保输出是有效的JSON格式。
-"""
+        vasp_prompt = _VASP_PLAN_TEMPLATE.substitute(
+            scientific_problem=research_request.scientific_problem,
+            material_system=research_request.material_system,
+            properties_of_interest=research_request.properties_of_interest,
+            calculation_goals=research_request.calculation_goals,
+            constraints=research_request.constraints or "无",
+        )
 
         try:
-            result = self.conversation_manager.chat(
+            result = await asyncio.to_thread(
+                self.conversation_manager.chat,
                 input_text=vasp_prompt,
-                system_prompt="你是VASP计算专家，请生成专业、完整的VASP计算方案。",
+                system_prompt=_VASP_PLAN_SYSTEM_PROMPT,
                 temperature=0.2
             )
 
             if result["status"] == "success":
-                # 提取JSON响应
-                import re
-                json_match = re.search(r'\{.*\}', result["response"], re.DOTALL)
-                if json_match:
-                    try:
-                        vasp_data = json.loads(json_match.group())
-                    except json.JSONDecodeError as e:
-                        print(f"⚠️ JSON解析错误: {e}")
-                        print(f"原始响应片段: {result['response'][:500]}...")
-                        # 尝试修复常见的JSON问题
-                        json_str = json_match.group()
-                        json_str = json_str.replace('\n', '\\n').replace('\r', '\\r').replace('\t', '\\t')
-                        vasp_data = json.loads(json_str)
-
+                # 提取JSON响应（容忍字符串中未转义的换行等控制字符）
+                vasp_data = extract_json(result["response"], strict=False)
+                if vasp_data is not None:
                     # 生成唯一的作业ID
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    timestamp = unique_timestamp()
                     job_id = f"{research_request.material_system}_{timestamp}"
 
                     # 创建VASP作业规范
-                    job_spec = VASPJobSpec(
-                        job_id=job_id,
-                        analysis_summary=vasp_data.get("analysis_summary", ""),
-                        calculation_plan=vasp_data.get("calculation_plan", ""),
-                        vasp_parameters=vasp_data.get("vasp_parameters", {}),
-                        hpc_requirements=vasp_data.get("hpc_requirements", {}),
-                        estimated_runtime=vasp_data.get("estimated_runtime", ""),
-                        success_criteria=vasp_data.get("success_criteria", ""),
-                        incar_content=self._generate_incar_content(vasp_data.get("vasp_parameters", {}).get("incar", {})),
-                        kpoints_content=self._generate_kpoints_content(vasp_data.get("vasp_parameters", {}).get("kpoints", {})),
-                        poscar_source=vasp_data.get("vasp_parameters", {}).get("poscar_source", ""),
-                        potcar_sequence=vasp_data.get("vasp_parameters", {}).get("potcar_sequence", []),
-                        slurm_script=self._generate_slurm_content(job_id, vasp_data.get("hpc_requirements", {}))
-                    )
+                    job_spec = self._build_job_spec(job_id, vasp_data, fingerprint)
+                    self._plan_cache[fingerprint] = asdict(job_spec)
 
                     self.current_job = job_spec
                     self._log_workflow("step2", "VASP计算方案生成完成", {"job_id": job_id})
                     return job_spec
                 else:
+                    print(f"原始响应片段: {result['response'][:500]}...")
                     raise ValueError("AI响应中未找到有效JSON")
             else:
                 raise RuntimeError(f"VASP方案生成失败: {result.get('error')}")
@@ -329,12 +455,33 @@ class VASPResearchWorkflow:
             self._log_workflow("step2", f"VASP计算方案生成失败: {e}")
             raise
 
+    def _build_job_spec(self, job_id: str, vasp_data: Dict[str, Any], fingerprint: str) -> VASPJobSpec:
+        """由LLM返回的计算方案构建作业规范，嵌套字段先做类型校验"""
+        vasp_parameters = _plan_section(vasp_data, "vasp_parameters")
+        hpc_requirements = _plan_section(vasp_data, "hpc_requirements")
+
+        return VASPJobSpec(
+            job_id=job_id,
+            analysis_summary=vasp_data.get("analysis_summary", ""),
+            calculation_plan=vasp_data.get("calculation_plan", ""),
+            vasp_parameters=vasp_parameters,
+            hpc_requirements=hpc_requirements,
+            estimated_runtime=vasp_data.get("estimated_runtime", ""),
+            success_criteria=vasp_data.get("success_criteria", ""),
+            incar_content=self._generate_incar_content(_plan_section(vasp_parameters, "incar")),
+            kpoints_content=self._generate_kpoints_content(_plan_section(vasp_parameters, "kpoints")),
+            poscar_source=vasp_parameters.get("poscar_source", ""),
+            potcar_sequence=vasp_parameters.get("potcar_sequence", []),
+            slurm_script=self._generate_slurm_content(job_id, hpc_requirements),
+            research_fingerprint=fingerprint,
+        )
+
     def _generate_incar_content(self, incar_params: Dict[str, Any]) -> str:
         """生成INCAR文件内容"""
-        lines = ["VASP INCAR file", "=" * 20]
-        for key, value in incar_params.items():
-            lines.append(f"{key} = {value}")
-        return "\n".join(lines) + "\n"
+        # 常用参数按固定顺序输出，其余参数按字母排序，保证相同参数生成相同文件
+        ordered = [key for key in _INCAR_ORDER if key in incar_params]
+        ordered += sorted(key for key in incar_params if key not in _INCAR_ORDER_SET)
+        return "".join([_INCAR_HEADER, *(f"{key} = {incar_params[key]}\n" for key in ordered)])
 
     def _generate_kpoints_content(self, kpoints_params: Dict[str, Any]) -> str:
         """生成KPOINTS文件内容"""
@@ -354,73 +501,42 @@ class VASPResearchWorkflow:
 
     def _generate_slurm_content(self, job_id: str, hpc_params: Dict[str, Any]) -> str:
         """生成Slurm脚本内容"""
-        default_hpc = self.config["hpc_environment"]["default_resources"]
-
-        nodes = hpc_params.get("nodes", default_hpc["nodes"])
-        ntasks = hpc_params.get("ntasks_per_node", default_hpc["ntasks_per_node"])
-        walltime = hpc_params.get("walltime", default_hpc["walltime"])
-        partition = hpc_params.get("partition", default_hpc["partition"])
-
-        return f"""#!/bin/bash
-#SBATCH -p {partition}
-#SBATCH -N {nodes}
-#SBATCH --ntasks-per-node={ntasks}
-#SBATCH -J {job_id}
-#SBATCH -o vasp.out
-#SBATCH -t {walltime}
-
-module load {self.config["hpc_environment"]["vasp_module"]["name"]}
-export VASP_PP_PATH={self.config["hpc_environment"]["vasp_module"]["potcar_path"]}
-
-echo "Starting VASP calculation for {job_id}"
-echo "Start time: $(date)"
-echo "Job ID: $SLURM_JOB_ID"
-echo "Nodes: $SLURM_JOB_NUM_NODES"
-echo "Tasks: $SLURM_NTASKS"
-
-# Build POTCAR (example - should be customized based on elements)
-# cat $VASP_PP_PATH/*/POTCAR > POTCAR
-
-mpirun -np $SLURM_NTASKS {self.config["hpc_environment"]["vasp_module"]["executable"]}
-
-echo "VASP calculation completed"
-echo "End time: $(date)"
-"""
+        default_hpc = self._default_resources
+        return self._SLURM_TEMPLATE.format(
+            partition=hpc_params.get("partition", default_hpc["partition"]),
+            nodes=hpc_params.get("nodes", default_hpc["nodes"]),
+            ntasks=hpc_params.get("ntasks_per_node", default_hpc["ntasks_per_node"]),
+            walltime=hpc_params.get("walltime", default_hpc["walltime"]),
+            job_id=job_id,
+            **self._slurm_env,
+        )
+
+    @staticmethod
+    def _job_files(job_spec: VASPJobSpec) -> Dict[str, bytes]:
+        """作业目录中的文件名 -> 文件内容（UTF-8字节）"""
+        return {
+            "INCAR": job_spec.incar_content.encode("utf-8"),
+            "KPOINTS": job_spec.kpoints_content.encode("utf-8"),
+            "run.slurm": job_spec.slurm_script.encode("utf-8"),
+            "job_specification.json": _dumps(job_spec.__dict__, indent=True),
+        }
 
-    def step3_prepare_vasp_files(self, job_spec: VASPJobSpec) -> str:
+    async def step3_prepare_vasp_files(self, job_spec: VASPJobSpec) -> str:
         """步骤3: 准备VASP输入文件"""
         self._log_workflow("step3", "开始准备VASP输入文件")
 
         # 创建作业目录
         job_dir = self.workflow_dir / job_spec.job_id
-        job_dir.mkdir(exist_ok=True)
-
-        # 生成输入文件
-        files_created = {}
-
-        # INCAR
-        incar_path = job_dir / "INCAR"
-        with open(incar_path, 'w') as f:
-            f.write(job_spec.incar_content)
-        files_created["INCAR"] = str(incar_path)
-
-        # KPOINTS
-        kpoints_path = job_dir / "KPOINTS"
-        with open(kpoints_path, 'w') as f:
-            f.write(job_spec.kpoints_content)
-        files_created["KPOINTS"] = str(kpoints_path)
-
-        # Slurm脚本
-        slurm_path = job_dir / "run.slurm"
-        with open(slurm_path, 'w') as f:
-            f.write(job_spec.slurm_script)
-        files_created["run.slurm"] = str(slurm_path)
-
-        # 保存作业规范
-        job_spec_path = job_dir / "job_specification.json"
-        with open(job_spec_path, 'w') as f:
-            json.dump(job_spec.__dict__, f, indent=2, default=str)
-        files_created["job_specification"] = str(job_spec_path)
+        job_dir.mkdir(parents=True, exist_ok=True)
+
+        # 生成输入文件：INCAR、KPOINTS、Slurm脚本和作业规范
+        job_files = self._job_files(job_spec)
+
+        # 多个文件在线程池中并发写入，不阻塞事件循环
+        await asyncio.gather(
+            *(asyncio.to_thread((job_dir / name).write_bytes, content) for name, content in job_files.items())
+        )
+        files_created = {name: str(job_dir / name) for name in job_files}
 
         self._log_workflow("step3", "VASP输入文件准备完成", files_created)
         return str(job_dir)
@@ -442,8 +558,8 @@ echo "End time: $(date)"
         self._log_workflow("step5", "开始上传文件并提交HPC作业")
 
         try:
-            # 上传文件
-            if not self.hpc_automation.upload_job_files(self.workflow_dir / job_spec.job_id, job_spec.job_id):
+            # 上传文件（内容直接取自作业规范，不再从本地目录读取）
+            if not self.hpc_automation.upload_job_payload(job_spec.job_id, self._job_files(job_spec)):
                 raise Exception("文件上传失败")
             self._log_workflow("step5", "文件上传成功")
 
@@ -459,11 +575,12 @@ echo "End time: $(date)"
             self._log_workflow("step5", f"HPC作业提交失败: {e}")
             return None
 
-    def step6_monitor_job(self, slurm_job_id: str) -> bool:
+    async def step6_monitor_job(self, slurm_job_id: str) -> bool:
         """步骤6: 监控作业执行"""
         self._log_workflow("step6", f"开始监控作业: {slurm_job_id}")
 
-        success = self.hpc_automation.monitor_job(slurm_job_id, check_interval=30, max_wait=300)  # 短时间测试
+        # 指数退避轮询，等待期间不阻塞事件循环
+        success = await self.hpc_automation.monitor_job_async(slurm_job_id, max_wait=300)  # 短时间测试
         if success:
             self._log_workflow("step6", "作业执行成功")
         else:
@@ -475,6 +592,10 @@ echo "End time: $(date)"
         """运行完整的科研计算工作流程"""
         self._log_workflow("workflow_start", "开始VASP科研计算工作流程")
 
+        # 步骤4: 测试HPC连接 —— 与步骤1-3并行，SSH握手与LLM调用和文件写入重叠，
+        # 同时预热ControlMaster主连接供步骤5复用
+        hpc_check = asyncio.create_task(asyncio.to_thread(self.step4_test_hpc_connection))
+
         try:
             # 步骤1: 分析科研需求
             research_request = await self.step1_analyze_research_request(user_request)
@@ -483,10 +604,10 @@ echo "End time: $(date)"
             job_spec = await self.step2_generate_vasp_plan(research_request)
 
             # 步骤3: 准备VASP文件
-            job_dir = self.step3_prepare_vasp_files(job_spec)
+            job_dir = await self.step3_prepare_vasp_files(job_spec)
 
-            # 步骤4: 测试HPC连接
-            hpc_connection_ok = self.step4_test_hpc_connection()
+            # 等待HPC连接测试结果
+            hpc_connection_ok = await hpc_check
             if not hpc_connection_ok:
                 raise Exception("HPC连接失败，无法继续")
 
@@ -518,10 +639,11 @@ echo "End time: $(date)"
             return result
 
         except Exception as e:
+            hpc_check.cancel()
             error_result = {
                 "status": "error",
                 "error": str(e),
-                "workflow_log": self.workflow_log
+                "workflow_log": list(self.workflow_log)
             }
             self._log_workflow("workflow_error", f"工作流程失败: {e}")
             return error_result
@@ -538,7 +660,7 @@ echo "End time: $(date)"
             job_spec = await self.step2_generate_vasp_plan(research_request)
 
             # 步骤3: 准备VASP文件
-            job_dir = self.step3_prepare_vasp_files(job_spec)
+            job_dir = await self.step3_prepare_vasp_files(job_spec)
 
             # 保存工作流程日志
             self._save_workflow_log(job_spec.job_id)
@@ -568,7 +690,7 @@ echo "End time: $(date)"
             error_result = {
                 "status": "error",
                 "error": str(e),
-                "workflow_log": self.workflow_log
+                "workflow_log": list(self.workflow_log)
             }
             self._log_workflow("workflow_error", f"工作流程失败: {e}")
             return error_result
@@ -595,8 +717,8 @@ async def main():
     print(f"📋 科研需求: {user_request}")
     print("=" * 60)
 
-    workflow = VASPResearchWorkflow()
-    result = await workflow.run_complete_workflow(user_request)
+    with VASPResearchWorkflow() as workflow:
+        result = await workflow.run_complete_workflow(user_request)
 
     if result["status"] == "success":
         print("\n✅ 工作流程完成!")